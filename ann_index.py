@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+In-Process ANN Index for Product Embeddings
+===========================================
+A vector index for the product catalog that runs inside the app, for
+Lakebase instances without pgvector and to keep similarity scans off the
+primary. vector_search.py uses it when VECTOR_SEARCH_BACKEND=ann.
+
+Embeddings are computed with embeddings.py and stored in memory-mapped .npy
+files (float32 or float16) under ANN_INDEX_DIR, so every worker process
+shares one copy through the page cache. Catalogs below IVF_MIN_ROWS are
+searched by brute force; larger ones get an IVF index (spherical k-means
+centroids, nprobe lists scanned per query).
+
+One writer keeps the files current: `build` writes a new generation and
+`refresh` applies products changed since the last watermark
+(products.updated_at) in place, appends new products, and tombstones
+deleted ones. Readers notice manifest.json changing and reopen.
+
+Connection settings come from --dsn or the standard libpq environment
+variables (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT, PGSSLMODE).
+
+Usage:
+    python ann_index.py build --dtype float16
+    python ann_index.py refresh --interval 30
+    python ann_index.py status
+    python ann_index.py eval --k 10
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from embeddings import EMBEDDING_DIM, embed_text, embed_texts, get_embedder
+
+ANN_INDEX_DIR = os.getenv(
+    'ANN_INDEX_DIR', str(Path.home() / ".cache" / "lakebase_training" / "ann")
+)
+ANN_NPROBE = int(os.getenv('ANN_NPROBE', '8'))
+IVF_MIN_ROWS = 50_000
+BLOCK_ROWS = 65_536
+FETCH_ROWS = 10_000
+# Re-read rows updated slightly before the watermark: a transaction that
+# started earlier may commit after the previous refresh read its snapshot
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+PRODUCTS_QUERY = """
+    SELECT product_id, name, description, category, tags
+    FROM ecommerce.products
+    {where}
+    ORDER BY product_id
+"""
+
+
+# ========================================
+# Read side
+# ========================================
+class AnnIndex:
+    """Memory-mapped product vectors with an optional IVF index."""
+
+    def __init__(self, path=ANN_INDEX_DIR, check_interval=1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.manifest = None
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if self.manifest is not None and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._reload(now)
+
+    def _reload(self, now):
+        self._checked = now
+        try:
+            mtime = (self.path / "manifest.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            raise RuntimeError(f"No ANN index in {self.path}; run `python ann_index.py build`")
+        if mtime == self._mtime:
+            return
+
+        manifest = json.loads((self.path / "manifest.json").read_text())
+        generation = manifest["generation"]
+        if self.manifest is None or self.manifest["generation"] != generation:
+            self.vectors = np.load(self.path / f"vectors-{generation}.npy", mmap_mode="r")
+            self.ids = np.load(self.path / f"ids-{generation}.npy", mmap_mode="r")
+            self.lists = np.load(self.path / f"lists-{generation}.npy", mmap_mode="r")
+            self.centroids = (
+                np.load(self.path / f"centroids-{generation}.npy") if manifest["nlist"] else None
+            )
+        count = manifest["count"]
+        if manifest["nlist"]:
+            # Row numbers grouped by list; refresh may have reassigned rows
+            lists = np.asarray(self.lists[:count])
+            self.order = np.argsort(lists, kind="stable")
+            self.bounds = np.searchsorted(lists[self.order], np.arange(manifest["nlist"] + 1))
+        self.manifest = manifest
+        self._mtime = mtime
+
+    @property
+    def count(self):
+        self._reload_if_changed()
+        return self.manifest["count"]
+
+    def search(self, query, k=5, nprobe=ANN_NPROBE, exact=False):
+        """Return (product_ids, cosine similarities) of the top-k products."""
+        self._reload_if_changed()
+        query = np.asarray(query, dtype=np.float32)
+        count = self.manifest["count"]
+        if exact or self.centroids is None:
+            return self._brute_force(query, k, count)
+
+        probe = np.argpartition(-(self.centroids @ query), min(nprobe, len(self.centroids)) - 1)[:nprobe]
+        rows = np.sort(np.concatenate([self.order[self.bounds[l]:self.bounds[l + 1]] for l in probe]))
+        return self._top_k(rows, self.vectors[rows].astype(np.float32) @ query, k)
+
+    def _brute_force(self, query, k, count):
+        best_rows, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        for start in range(0, count, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, count)
+            scores = self.vectors[start:stop].astype(np.float32) @ query
+            rows, scores = self._partition(np.arange(start, stop), scores, k)
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+        return self._top_k(best_rows, best_scores, k)
+
+    def _partition(self, rows, scores, k):
+        scores = np.where(self.ids[rows] >= 0, scores, -np.inf)
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        return rows, scores
+
+    def _top_k(self, rows, scores, k):
+        rows, scores = self._partition(rows, scores, k)
+        order = np.argsort(-scores)
+        order = order[np.isfinite(scores[order])]
+        return np.asarray(self.ids[rows[order]]), scores[order]
+
+
+# ========================================
+# Write side
+# ========================================
+@contextmanager
+def _writer_lock(path):
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / "lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _write_manifest(path, manifest):
+    tmp = path / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, path / "manifest.json")
+
+
+def _read_manifest(path):
+    try:
+        return json.loads((path / "manifest.json").read_text())
+    except FileNotFoundError:
+        return None
+
+
+def _product_texts(rows):
+    from vector_search import product_text
+
+    return [product_text(r['name'], r['description'], r['category'], r['tags']) for r in rows]
+
+
+def _kmeans(sample, nlist, iterations=10, seed=0):
+    """Spherical k-means on unit vectors; returns (nlist, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        present, first = np.unique(assign[order], return_index=True)
+        centroids[present] = np.add.reduceat(sample[order], first, axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def _assign(vectors, centroids):
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def build(conn, path=ANN_INDEX_DIR, dtype="float32", nlist=None, headroom=1.25):
+    """Embed the whole catalog into a new index generation."""
+    path = Path(path)
+    with _writer_lock(path):
+        started = time.perf_counter()
+        previous = _read_manifest(path)
+        generation = previous["generation"] + 1 if previous else 1
+        watermark = conn.execute("SELECT now() AS now").fetchone()['now']
+        total = conn.execute("SELECT count(*) AS n FROM ecommerce.products").fetchone()['n']
+        capacity = max(1024, int(total * headroom))
+
+        vectors = np.lib.format.open_memmap(
+            path / f"vectors-{generation}.npy", mode="w+", dtype=dtype, shape=(capacity, EMBEDDING_DIM)
+        )
+        ids = np.lib.format.open_memmap(path / f"ids-{generation}.npy", mode="w+", dtype=np.int64, shape=(capacity,))
+        lists = np.lib.format.open_memmap(path / f"lists-{generation}.npy", mode="w+", dtype=np.int32, shape=(capacity,))
+        ids[:] = -1
+
+        count = 0
+        with conn.cursor(name="ann_build") as cur:
+            cur.execute(PRODUCTS_QUERY.format(where=""))
+            while rows := cur.fetchmany(FETCH_ROWS):
+                if count + len(rows) > capacity:
+                    raise RuntimeError("Catalog grew during build; run build again")
+                vectors[count:count + len(rows)] = embed_texts(_product_texts(rows))
+                ids[count:count + len(rows)] = [r['product_id'] for r in rows]
+                count += len(rows)
+
+        if nlist is None:
+            nlist = int(np.sqrt(count)) if count >= IVF_MIN_ROWS else 0
+        if nlist:
+            rng = np.random.default_rng(0)
+            sample = np.asarray(vectors[np.sort(rng.choice(count, min(count, 32 * nlist), replace=False))],
+                                dtype=np.float32)
+            centroids = _kmeans(sample, nlist)
+            np.save(path / f"centroids-{generation}.npy", centroids)
+            lists[:count] = _assign(vectors[:count], centroids)
+        for array in (vectors, ids, lists):
+            array.flush()
+
+        _write_manifest(path, {
+            "generation": generation,
+            "dim": EMBEDDING_DIM,
+            "dtype": dtype,
+            "count": count,
+            "capacity": capacity,
+            "nlist": nlist,
+            "embedder": get_embedder().cache_key,
+            "watermark": watermark.isoformat(),
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        # Readers that still map the old generation keep it until they reopen
+        for old in path.glob("*.npy"):
+            if not old.stem.endswith(f"-{generation}"):
+                old.unlink()
+
+    print(f"✅ Indexed {count:,} products ({dtype}, {'IVF ' + str(nlist) + ' lists' if nlist else 'brute force'}) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def refresh(conn, path=ANN_INDEX_DIR):
+    """Apply products changed since the last build/refresh. Returns stats."""
+    path = Path(path)
+    manifest = _read_manifest(path)
+    if manifest is None or manifest["embedder"] != get_embedder().cache_key or manifest["dim"] != EMBEDDING_DIM:
+        build(conn, path, manifest["dtype"] if manifest else "float32")
+        return {"rebuilt": True}
+
+    stats = _refresh_in_place(conn, path)
+    if stats is None:
+        # Out of headroom for new products
+        build(conn, path, manifest["dtype"])
+        return {"rebuilt": True}
+    return stats
+
+
+def _refresh_in_place(conn, path):
+    with _writer_lock(path):
+        manifest = _read_manifest(path)
+        generation, count = manifest["generation"], manifest["count"]
+        watermark = conn.execute("SELECT now() AS now").fetchone()['now']
+        changed = conn.execute(
+            PRODUCTS_QUERY.format(where="WHERE updated_at > %s"),
+            (datetime.fromisoformat(manifest["watermark"]) - REFRESH_OVERLAP,)
+        ).fetchall()
+
+        vectors = np.load(path / f"vectors-{generation}.npy", mmap_mode="r+")
+        ids = np.load(path / f"ids-{generation}.npy", mmap_mode="r+")
+        lists = np.load(path / f"lists-{generation}.npy", mmap_mode="r+")
+        centroids = np.load(path / f"centroids-{generation}.npy") if manifest["nlist"] else None
+
+        # Map changed product ids to existing rows; the rest are appended
+        changed_ids = np.array([r['product_id'] for r in changed], dtype=np.int64)
+        live = np.asarray(ids[:count])
+        sorter = np.argsort(live)
+        pos = np.clip(np.searchsorted(live, changed_ids, sorter=sorter), 0, max(count - 1, 0))
+        rows = sorter[pos] if count else np.empty(0, dtype=np.int64)
+        found = (live[rows] == changed_ids) if count else np.zeros(len(changed_ids), dtype=bool)
+        appended = int((~found).sum())
+        if count + appended > manifest["capacity"]:
+            return None
+        rows = np.where(found, rows, count + np.cumsum(~found) - 1)
+
+        if len(changed):
+            new_vectors = embed_texts(_product_texts(changed))
+            vectors[rows] = new_vectors
+            ids[rows] = changed_ids
+            if centroids is not None:
+                lists[rows] = _assign(new_vectors, centroids)
+        count += appended
+
+        # Deleted products: the live row count no longer matches
+        deleted = 0
+        total = conn.execute("SELECT count(*) AS n FROM ecommerce.products").fetchone()['n']
+        if total != int((ids[:count] >= 0).sum()):
+            existing = np.array(
+                [r['product_id'] for r in conn.execute("SELECT product_id FROM ecommerce.products").fetchall()],
+                dtype=np.int64,
+            )
+            gone = (np.asarray(ids[:count]) >= 0) & ~np.isin(ids[:count], existing)
+            deleted = int(gone.sum())
+            ids[:count][gone] = -1
+
+        for array in (vectors, ids, lists):
+            array.flush()
+        manifest.update(count=count, watermark=watermark.isoformat(),
+                        refreshed_at=datetime.now().isoformat(timespec="seconds"))
+        _write_manifest(path, manifest)
+
+    return {"rebuilt": False, "updated": int(found.sum()), "added": appended, "deleted": deleted}
+
+
+# ========================================
+# CLI
+# ========================================
+def evaluate(conn, index, k, queries):
+    """Print recall@k and latency of IVF search per nprobe against brute force."""
+    if not queries:
+        queries = [r['name'] for r in conn.execute(
+            "SELECT name FROM ecommerce.products ORDER BY random() LIMIT 20"
+        ).fetchall()]
+    vectors = [embed_text(q) for q in queries]
+
+    def run(**kwargs):
+        results, latencies = [], []
+        for vector in vectors:
+            start = time.perf_counter()
+            results.append(set(index.search(vector, k, **kwargs)[0].tolist()))
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, float(np.median(latencies))
+
+    truth, exact_ms = run(exact=True)
+    print(f"\nRecall@{k} over {len(queries)} queries, {index.count:,} rows "
+          f"(brute force p50 {exact_ms:.2f}ms)")
+    if index.centroids is None:
+        print("   Index is brute force only (fewer than IVF_MIN_ROWS products)")
+        return True
+    print(f"{'nprobe':>8} {'recall':>8} {'p50 ms':>8}")
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        found, latency = run(nprobe=nprobe)
+        recall = np.mean([len(f & t) / max(1, len(t)) for f, t in zip(found, truth)])
+        print(f"{nprobe:>8} {recall:>8.1%} {latency:>8.2f}")
+    return True
+
+
+def main():
+    import psycopg
+    from psycopg.rows import dict_row
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default="", help="libpq connection string (default: PG* environment)")
+    parser.add_argument("--path", default=ANN_INDEX_DIR, help="Index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="Embed the catalog into a new index generation")
+    build_cmd.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    build_cmd.add_argument("--nlist", type=int, help="IVF lists (default: sqrt(rows), 0 = brute force)")
+
+    refresh_cmd = commands.add_parser("refresh", help="Apply changed products")
+    refresh_cmd.add_argument("--interval", type=float, help="Keep refreshing every N seconds")
+
+    commands.add_parser("status", help="Show the index manifest")
+
+    eval_cmd = commands.add_parser("eval", help="Report recall/latency for each nprobe")
+    eval_cmd.add_argument("--query", action="append", default=[], help="Query text (repeatable)")
+    eval_cmd.add_argument("--k", type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == "status":
+        manifest = _read_manifest(Path(args.path))
+        print(json.dumps(manifest, indent=2) if manifest else f"No index in {args.path}")
+        return manifest is not None
+
+    with psycopg.connect(args.dsn, row_factory=dict_row) as conn:
+        if args.command == "build":
+            build(conn, args.path, args.dtype, args.nlist)
+        elif args.command == "refresh":
+            while True:
+                stats = refresh(conn, args.path)
+                conn.commit()
+                if not stats["rebuilt"]:
+                    print(f"🔄 {stats['updated']} updated, {stats['added']} added, {stats['deleted']} deleted")
+                if not args.interval:
+                    break
+                time.sleep(args.interval)
+        elif args.command == "eval":
+            return evaluate(conn, AnnIndex(args.path), args.k, args.query)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
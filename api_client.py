@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+"""
+HTTP Client for the API Testing Tabs
+====================================
+Sends real requests to a PostgREST (or any HTTP) endpoint through one
+process-wide httpcore connection pool, so repeated requests to the same host
+reuse a keep-alive connection instead of paying for DNS, TCP and TLS again.
+
+Every response carries a per-phase timing breakdown taken from httpcore's
+trace hooks: DNS lookup, TCP connect, TLS handshake, time to first byte
+(request sent until response headers arrive) and body download. Connection
+phases are zero when the request reused a pooled connection. Bodies are
+requested compressed and the compressed (wire) and decoded sizes are both
+reported.
+
+Load mode (LoadTest) fires a burst of requests from an asyncio httpx client
+on a background thread: N requests at concurrency C, or a fixed request rate
+for D seconds. Its latency percentiles, histogram and error breakdown can be
+read while it runs.
+
+For local testing without PostgREST, the CLI includes a small stand-in that
+serves sample products with PostgREST-style filters:
+
+Usage:
+    python api_client.py mock --port 3000
+    python api_client.py request GET "http://localhost:3000/products?category=eq.Electronics" --repeat 3
+    python api_client.py load GET http://localhost:3000/products --requests 2000 --concurrency 50
+    python api_client.py load GET http://localhost:3000/products --rate 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import contextvars
+import gzip
+import json
+import math
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+import httpcore
+import httpx
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '10'))
+API_MAX_CONNECTIONS = int(os.getenv('API_MAX_CONNECTIONS', '20'))
+API_KEEPALIVE_EXPIRY = float(os.getenv('API_KEEPALIVE_EXPIRY', '30'))
+
+ACCEPT_ENCODING = "gzip, deflate" + (", br" if brotli else "")
+
+PHASES = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+PHASE_LABELS = {
+    "dns_ms": "DNS",
+    "connect_ms": "Connect",
+    "tls_ms": "TLS",
+    "ttfb_ms": "Time to first byte",
+    "download_ms": "Download",
+}
+
+# Timings of the request in flight on this thread, filled in by the backend
+_timings = contextvars.ContextVar("api_client_timings", default=None)
+
+
+class _TimedBackend(httpcore.SyncBackend):
+    """Resolves the host itself so the lookup is timed apart from the connect."""
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        start = time.perf_counter()
+        address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+        timings = _timings.get()
+        if timings is not None:
+            timings["dns_ms"] = (time.perf_counter() - start) * 1000
+        return super().connect_tcp(address, port, timeout=timeout, local_address=local_address,
+                                   socket_options=socket_options)
+
+
+def decode_body(content, encoding):
+    """Decompress a response body according to its Content-Encoding."""
+    encoding = (encoding or "").strip().lower()
+    if encoding in ("", "identity"):
+        return content
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(content)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(content)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli:
+        return brotli.decompress(content)
+    raise ValueError(f"Unsupported Content-Encoding '{encoding}'")
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def build_url(base_url, endpoint="", params=None):
+    """Join base URL, endpoint and a query string (or dict of parameters)."""
+    url = base_url.rstrip("/") + "/" + (endpoint or "").lstrip("/") if endpoint else base_url
+    if params:
+        query = params if isinstance(params, str) else urlencode(params)
+        url += ("&" if "?" in url else "?") + query.lstrip("?")
+    return url
+
+
+class APIClient:
+    """Keep-alive HTTP client that reports where each request spent its time."""
+
+    def __init__(self, max_connections=API_MAX_CONNECTIONS, keepalive_expiry=API_KEEPALIVE_EXPIRY,
+                 timeout=API_TIMEOUT):
+        self.timeout = timeout
+        self.pool = httpcore.ConnectionPool(
+            max_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+            network_backend=_TimedBackend(),
+        )
+
+    def request(self, method, url, body=None, headers=None):
+        """Send one request and return a result dict.
+
+        `body` may be a str/bytes payload or any JSON-serializable object.
+        The result has status, headers, the decoded body (parsed as `json`
+        when it is JSON), wire and decoded sizes, the compression ratio,
+        whether the connection was reused, and per-phase `timings`.
+        """
+        request_headers = {"Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING}
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode()
+        if body:
+            request_headers["Content-Type"] = "application/json"
+        request_headers.update(headers or {})
+
+        marks = {}
+
+        def trace(event, info):
+            marks.setdefault(event.split(".", 1)[1], time.perf_counter())
+
+        timings = dict.fromkeys(PHASES, 0.0)
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.pool.request(
+                method.upper(), url,
+                headers=list(request_headers.items()),
+                content=body or b"",
+                extensions={"trace": trace, "timeout": dict.fromkeys(("connect", "read", "write", "pool"),
+                                                                     self.timeout)},
+            )
+        finally:
+            _timings.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        def span(name):
+            started, completed = marks.get(f"{name}.started"), marks.get(f"{name}.complete")
+            return (completed - started) * 1000 if started and completed else 0.0
+
+        reused = "connect_tcp.started" not in marks
+        timings["connect_ms"] = max(0.0, span("connect_tcp") - timings["dns_ms"])
+        timings["tls_ms"] = span("start_tls")
+        if "send_request_headers.started" in marks and "receive_response_headers.complete" in marks:
+            timings["ttfb_ms"] = (marks["receive_response_headers.complete"]
+                                  - marks["send_request_headers.started"]) * 1000
+        timings["download_ms"] = span("receive_response_body")
+        timings["total_ms"] = total_ms
+
+        response_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in response.headers}
+        encoding = response_headers.get("content-encoding")
+        content = decode_body(response.content, encoding)
+        try:
+            parsed = json.loads(content) if content else None
+        except ValueError:
+            parsed = None
+
+        return {
+            "method": method.upper(),
+            "url": url,
+            "status": response.status,
+            "reason": response.extensions.get("reason_phrase", b"").decode("latin-1"),
+            "http_version": response.extensions.get("http_version", b"").decode("latin-1"),
+            "headers": response_headers,
+            "body": content.decode("utf-8", "replace"),
+            "json": parsed,
+            "content_encoding": encoding or "identity",
+            "wire_bytes": len(response.content),
+            "body_bytes": len(content),
+            "compression_ratio": len(content) / len(response.content) if response.content else 1.0,
+            "reused_connection": reused,
+            "timings": timings,
+        }
+
+    def close(self):
+        self.pool.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide pooled client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = APIClient()
+    return _client
+
+
+def send(method, base_url, endpoint="", params=None, body=None, headers=None):
+    """Send a request through the shared pool; see APIClient.request().
+
+    A `body` string must be valid JSON (raises ValueError otherwise); bodies
+    are only sent for POST, PUT and PATCH.
+    """
+    if method.upper() not in ("POST", "PUT", "PATCH"):
+        body = None
+    elif isinstance(body, str):
+        body = body.strip() or None
+        if body:
+            json.loads(body)
+    return get_client().request(method, build_url(base_url, endpoint, params), body, headers)
+
+
+# ========================================
+# Load mode
+# ========================================
+HISTOGRAM_BUCKETS_MS = [5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+LOAD_PERCENTILES = (50, 90, 95, 99)
+# Finished load tests kept for the apps to read back
+MAX_LOAD_TESTS = 16
+# Set by gunicorn.conf.py: running tests publish snapshots here for the other workers
+LOAD_TEST_DIR = os.getenv('LOAD_TEST_DIR')
+LOAD_TEST_PUBLISH_INTERVAL = 0.25
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadTest:
+    """Fires requests from an asyncio loop on a background thread.
+
+    With `rate` unset it is a closed loop: `concurrency` workers send
+    `requests` requests between them as fast as the server answers. With
+    `rate` it is an open loop: requests start on a fixed schedule for
+    `duration` seconds whether or not earlier ones have finished (at most
+    `concurrency` in flight), and latency is measured from the scheduled
+    start, so a slow server cannot hide queueing by slowing the client down.
+
+    snapshot() can be called from any thread while the test runs. With
+    `state_path` set, the test also writes its snapshot to that file every
+    LOAD_TEST_PUBLISH_INTERVAL and stops when `state_path`.stop appears, so
+    other processes can follow and stop it (see SharedLoadTest).
+    """
+
+    def __init__(self, method, url, body=None, headers=None, requests=100, concurrency=10,
+                 rate=None, duration=10.0, timeout=API_TIMEOUT, state_path=None):
+        self.method = method.upper()
+        self.url = url
+        self.headers = {"Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        if body and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if body:
+            self.headers["Content-Type"] = "application/json"
+        self.body = body.encode() if isinstance(body, str) else body
+        self.requests = int(requests)
+        self.concurrency = max(1, int(concurrency))
+        self.rate = float(rate) if rate else None
+        self.duration = float(duration)
+        self.timeout = timeout
+        self.state_path = state_path
+
+        self.planned = int(self.rate * self.duration) if self.rate else self.requests
+        self.sent = 0
+        self.latencies = []
+        self.errors = Counter()
+        self.wire_bytes = 0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+
+    def publish(self):
+        """Write the current snapshot to `state_path`, atomically for readers."""
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp_path, self.state_path)
+
+    async def _publish_loop(self):
+        while True:
+            if os.path.exists(self.state_path + ".stop"):
+                self.stop()
+            self.publish()
+            await asyncio.sleep(LOAD_TEST_PUBLISH_INTERVAL)
+
+    async def _run(self):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        publisher = asyncio.create_task(self._publish_loop()) if self.state_path else None
+        try:
+            async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+                if self.rate:
+                    await self._open_loop(client)
+                else:
+                    await asyncio.gather(*(self._closed_loop_worker(client) for _ in range(self.concurrency)))
+        finally:
+            self.finished_at = time.perf_counter()
+            if publisher:
+                publisher.cancel()
+                self.publish()
+
+    async def _send(self, client, started):
+        try:
+            response = await client.request(self.method, self.url, headers=self.headers, content=self.body)
+        except httpx.HTTPError as e:
+            with self._lock:
+                self.errors[type(e).__name__] += 1
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.wire_bytes += response.num_bytes_downloaded
+            if response.status_code >= 400:
+                self.errors[f"HTTP {response.status_code}"] += 1
+
+    async def _closed_loop_worker(self, client):
+        while not self._stop.is_set():
+            with self._lock:
+                if self.sent >= self.planned:
+                    return
+                self.sent += 1
+            await self._send(client, time.perf_counter())
+
+    async def _open_loop(self, client):
+        in_flight = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def scheduled_request(scheduled):
+            async with in_flight:
+                await self._send(client, scheduled)
+
+        start = time.perf_counter()
+        for i in range(self.planned):
+            if self._stop.is_set():
+                break
+            scheduled = start + i / self.rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            with self._lock:
+                self.sent += 1
+            task = asyncio.create_task(scheduled_request(scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    def snapshot(self):
+        """Progress, latency percentiles (ms), histogram and error counts so far."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            errors = dict(self.errors)
+            sent, wire_bytes = self.sent, self.wire_bytes
+        end = self.finished_at or time.perf_counter()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        completed = len(latencies) + sum(v for k, v in errors.items() if not k.startswith("HTTP "))
+
+        buckets = Counter()
+        for latency in latencies:
+            ms = latency * 1000
+            buckets[next(b for b in HISTOGRAM_BUCKETS_MS if ms <= b)] += 1
+
+        return {
+            "done": self.done,
+            "stopped": self._stop.is_set(),
+            "planned": self.planned,
+            "sent": sent,
+            "completed": completed,
+            "elapsed_s": elapsed,
+            "requests_per_sec": completed / elapsed if elapsed else 0.0,
+            "target_rps": self.rate,
+            "latency_ms": {
+                **{f"p{pct}": percentile(latencies, pct) * 1000 for pct in LOAD_PERCENTILES},
+                "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                "max": (latencies[-1] if latencies else 0.0) * 1000,
+            },
+            "histogram": [
+                ["≤" + (f"{b:g} ms" if b != float("inf") else "∞"), buckets[b]] for b in HISTOGRAM_BUCKETS_MS
+            ],
+            "errors": errors,
+            "error_count": sum(errors.values()),
+            "wire_bytes": wire_bytes,
+        }
+
+
+class SharedLoadTest:
+    """A load test running in another app worker, read from the snapshots it publishes."""
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+
+    def snapshot(self):
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    @property
+    def done(self):
+        return self.snapshot()["done"]
+
+    def stop(self):
+        # Picked up by the owning worker's publisher within LOAD_TEST_PUBLISH_INTERVAL
+        open(self.state_path + ".stop", "w").close()
+
+
+_load_tests = OrderedDict()
+
+
+def _state_path(test_id):
+    return os.path.join(LOAD_TEST_DIR, f"{test_id}.json")
+
+
+def _remove_state(test_id):
+    for path in (_state_path(test_id), _state_path(test_id) + ".stop"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def start_load_test(method, base_url, endpoint="", params=None, body=None, **options):
+    """Start a LoadTest in the background and return its id.
+
+    Read it back with get_load_test(). Under gunicorn (LOAD_TEST_DIR set)
+    that works from any worker; otherwise only in this process.
+    """
+    if method.upper() not in ("POST", "PUT", "PATCH"):
+        body = None
+    elif isinstance(body, str):
+        body = body.strip() or None
+        if body:
+            json.loads(body)
+    test_id = uuid.uuid4().hex
+    test = LoadTest(method, build_url(base_url, endpoint, params), body,
+                    state_path=_state_path(test_id) if LOAD_TEST_DIR else None, **options)
+    with _client_lock:
+        _load_tests[test_id] = test
+        # Forget the oldest finished tests
+        for old_id in [k for k, t in _load_tests.items() if t.done][:max(0, len(_load_tests) - MAX_LOAD_TESTS)]:
+            del _load_tests[old_id]
+            if LOAD_TEST_DIR:
+                _remove_state(old_id)
+    if LOAD_TEST_DIR:
+        # Readable by the other workers before the first poll
+        test.publish()
+    test.start()
+    return test_id
+
+
+def get_load_test(test_id):
+    """The LoadTest started in this process, a SharedLoadTest from another worker, or None."""
+    with _client_lock:
+        test = _load_tests.get(test_id)
+    if test is None and LOAD_TEST_DIR and re.fullmatch(r"[0-9a-f]{32}", test_id or ""):
+        if os.path.exists(_state_path(test_id)):
+            return SharedLoadTest(_state_path(test_id))
+    return test
+
+
+# ========================================
+# PostgREST stand-in
+# ========================================
+def _mock_products(count=200):
+    categories = ["Electronics", "Books", "Clothing", "Home & Garden", "Sports"]
+    return [
+        {
+            "product_id": i,
+            "name": f"Sample Product {i}",
+            "description": f"Sample {categories[i % len(categories)].lower()} product number {i}",
+            "price": round(5 + (i * 37 % 500) + 0.99, 2),
+            "stock_quantity": i * 13 % 250,
+            "category": categories[i % len(categories)],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def serve_mock(port=3000, products=200):
+    """Serve sample products with a subset of PostgREST's filter syntax."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qsl, urlsplit
+
+    rows = _mock_products(products)
+    operators = {
+        "eq": lambda a, b: str(a) == b,
+        "neq": lambda a, b: str(a) != b,
+        "gt": lambda a, b: float(a) > float(b),
+        "gte": lambda a, b: float(a) >= float(b),
+        "lt": lambda a, b: float(a) < float(b),
+        "lte": lambda a, b: float(a) <= float(b),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes
+        disable_nagle_algorithm = True
+
+        def _send(self, status, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            if body:
+                self.send_header("Content-Type", "application/json")
+                if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024:
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.rstrip("/") != "/products":
+                return self._send(404, {"message": f"relation {url.path.strip('/')} does not exist"})
+            result, limit, offset = rows, None, 0
+            for key, value in parse_qsl(url.query):
+                if key == "limit":
+                    limit = int(value)
+                elif key == "offset":
+                    offset = int(value)
+                elif key in ("select", "order"):
+                    continue
+                else:
+                    op, _, operand = value.partition(".")
+                    if op not in operators:
+                        return self._send(400, {"message": f"unknown operator {op}"})
+                    result = [r for r in result if key in r and operators[op](r[key], operand)]
+            result = result[offset:offset + limit if limit is not None else None]
+            self._send(200, result)
+
+        def do_POST(self):
+            self._send(201, self._read_json())
+
+        def do_PATCH(self):
+            self._send(200, self._read_json())
+
+        def do_DELETE(self):
+            self._send(204)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🧪 Mock PostgREST serving {len(rows)} products on http://127.0.0.1:{port}/products")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    mock_cmd = commands.add_parser("mock", help="Run a local PostgREST stand-in")
+    mock_cmd.add_argument("--port", type=int, default=3000)
+    mock_cmd.add_argument("--products", type=int, default=200)
+
+    request_cmd = commands.add_parser("request", help="Send a request and print its timings")
+    request_cmd.add_argument("method")
+    request_cmd.add_argument("url")
+    request_cmd.add_argument("--body", help="JSON request body")
+    request_cmd.add_argument("--repeat", type=int, default=1, help="Send it N times over the pool")
+
+    load_cmd = commands.add_parser("load", help="Run a load test and print its results")
+    load_cmd.add_argument("method")
+    load_cmd.add_argument("url")
+    load_cmd.add_argument("--body", help="JSON request body")
+    load_cmd.add_argument("--requests", type=int, default=1000, help="Requests to send (closed loop)")
+    load_cmd.add_argument("--concurrency", type=int, default=20, help="Maximum requests in flight")
+    load_cmd.add_argument("--rate", type=float, help="Requests/sec for --duration seconds (open loop)")
+    load_cmd.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.command == "mock":
+        return serve_mock(args.port, args.products)
+
+    if args.command == "load":
+        test = LoadTest(args.method, args.url, args.body, requests=args.requests,
+                        concurrency=args.concurrency, rate=args.rate, duration=args.duration).start()
+        while not test.done:
+            test.wait(1.0)
+            result = test.snapshot()
+            print(f"   {result['completed']:,}/{result['planned']:,} done, "
+                  f"{result['requests_per_sec']:,.1f} req/s, p95 {result['latency_ms']['p95']:.1f} ms", flush=True)
+        latency = result["latency_ms"]
+        print(f"\n{result['completed']:,} requests in {result['elapsed_s']:.2f}s "
+              f"({result['requests_per_sec']:,.1f} req/s), {result['error_count']:,} errors")
+        print("   " + "  ".join(f"{key} {value:.1f}" for key, value in latency.items()) + " ms")
+        total = max(1, sum(count for _, count in result["histogram"]))
+        for label, count in result["histogram"]:
+            if count:
+                print(f"   {label:>9} {'█' * max(1, round(40 * count / total))} {count:,}")
+        for error, count in sorted(result["errors"].items(), key=lambda item: -item[1]):
+            print(f"   ❌ {error}: {count:,}")
+        return result["error_count"] == 0
+
+    for _ in range(args.repeat):
+        result = send(args.method, args.url, body=args.body)
+        phases = "  ".join(f"{key[:-3]} {result['timings'][key]:.2f}" for key in PHASES)
+        print(f"{result['status']} {result['reason']}  {phases}  total {result['timings']['total_ms']:.2f} ms  "
+              f"{result['wire_bytes']:,} B on the wire ({result['content_encoding']}, "
+              f"{result['compression_ratio']:.1f}x)  {'reused' if result['reused_connection'] else 'new'} connection")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -10,8 +10,16 @@ from psycopg2.extras import RealDictCursor
 import pandas as pd
 import plotly.express as px
 import os
+import time
 from datetime import datetime
 import json
+from orders import PAYMENT_METHODS, create_order, is_insufficient_stock, parse_order_items
+import api_client
+import queries
+import query_stats
+import text_search
+import tracing
+import vector_search
 
 # ========================================
 # Database Configuration
@@ -46,25 +54,43 @@ class LakebaseConnection:
     def connect(self):
         """Establish connection to Lakebase"""
         try:
-            self.connection = psycopg2.connect(**self.config)
+            with tracing.span("db.connect", kind="client"):
+                self.connection = psycopg2.connect(**self.config)
             self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
             return True
         except Exception as e:
             st.error(f"Connection failed: {e}")
             return False
     
-    def execute_query(self, query, params=None):
-        """Execute a query and return results"""
+    def execute_query(self, query, params=None, commit=False):
+        """Execute a query and return results
+        
+        Set commit=True for SELECTs that call data-modifying functions
+        such as ecommerce.create_order().
+        """
+        start, rows, error = time.perf_counter(), 0, None
         try:
-            self.cursor.execute(query, params)
-            if query.strip().upper().startswith('SELECT'):
-                return self.cursor.fetchall()
-            else:
-                self.connection.commit()
-                return self.cursor.rowcount
+            with tracing.span("db.query", kind="client", **{"db.statement": " ".join(query.split()),
+                                                            "db.query_id": query_stats.fingerprint(query)[0]}) as span:
+                self.cursor.execute(query, params)
+                if query.strip().upper().startswith('SELECT'):
+                    result = self.cursor.fetchall()
+                    rows = len(result)
+                    span.set("db.rows", rows)
+                    if commit:
+                        self.connection.commit()
+                    return result
+                else:
+                    self.connection.commit()
+                    rows = self.cursor.rowcount
+                    span.set("db.rows", rows)
+                    return self.cursor.rowcount
         except Exception as e:
+            error = e
             self.connection.rollback()
             raise e
+        finally:
+            query_stats.record(query, (time.perf_counter() - start) * 1000, rows, params, error)
     
     def close(self):
         """Close database connection"""
@@ -93,7 +119,7 @@ def main():
         
         operation = st.selectbox(
             "Select Operation",
-            ["Dashboard", "Data Entry", "Query Builder", "Vector Search", "API Testing"]
+            ["Dashboard", "Data Entry", "Query Builder", "Vector Search", "API Testing", "Traces"]
         )
         
         st.markdown("---")
@@ -102,17 +128,67 @@ def main():
         st.markdown("[💻 GitHub Examples](https://github.com/neondatabase)")
         st.markdown("[🎥 Video Tutorials](https://youtube.com/neondatabase)")
     
-    # Main content area
-    if operation == "Dashboard":
-        show_dashboard()
-    elif operation == "Data Entry":
-        show_data_entry()
-    elif operation == "Query Builder":
-        show_query_builder()
-    elif operation == "Vector Search":
-        show_vector_search()
-    elif operation == "API Testing":
-        show_api_testing()
+    # Main content area; each rerun of a section is one trace
+    if operation == "Traces":
+        show_traces()
+        return
+    with tracing.span(f"streamlit {operation}", kind="server"):
+        if operation == "Dashboard":
+            show_dashboard()
+        elif operation == "Data Entry":
+            show_data_entry()
+        elif operation == "Query Builder":
+            show_query_builder()
+        elif operation == "Vector Search":
+            show_vector_search()
+        elif operation == "API Testing":
+            show_api_testing()
+
+def show_traces():
+    """Show the slowest recent section reruns and per-statement query statistics"""
+    st.header("⏱️ Slowest Recent Traces")
+    st.caption("Self time per category, in ms. Set TRACE_EXPORTER=file to also write OTLP/JSON to TRACE_FILE.")
+    traces = [tracing.summary(t) for t in tracing.slowest(50)]
+    if not traces:
+        st.info("No traces yet: open another section first.")
+        return
+    st.dataframe(
+        pd.DataFrame([
+            {"started": t["started"], "trace": t["name"], "total": round(t["duration_ms"], 1),
+             **{k: round(ms, 1) for k, ms in t["breakdown_ms"].items()}}
+            for t in traces
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+    for t in traces[:10]:
+        with st.expander(f"{t['name']} — {t['duration_ms']:.1f} ms at {t['started']}"):
+            st.dataframe(
+                pd.DataFrame([
+                    {"span": "\u00a0\u00a0" * s["depth"] + s["name"], "start ms": round(s["offset_ms"], 1),
+                     "ms": round(s["duration_ms"], 1), "attributes": json.dumps(s["attributes"], default=str),
+                     "error": s["error"] or ""}
+                    for s in t["spans"]
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+
+    st.subheader("🐢 Query Statistics")
+    st.caption(f"Per statement fingerprint, measured in the app including network time; "
+               f"slow means over {query_stats.SLOW_QUERY_MS:,.0f} ms.")
+    stats = query_stats.snapshot()
+    if stats:
+        st.dataframe(
+            pd.DataFrame([{k: v for k, v in r.items() if k not in ("slow", "last_seen")} for r in stats]),
+            use_container_width=True,
+            hide_index=True
+        )
+        for r in stats:
+            if r["slow"]:
+                with st.expander(f"Slow executions of {r['fingerprint']}"):
+                    st.code(r["query"], language="sql")
+                    st.json(r["slow"])
 
 def show_dashboard():
     """Display main dashboard with metrics and charts"""
@@ -124,23 +200,13 @@ def show_dashboard():
     with LakebaseConnection() as db:
         # Get metrics
         try:
-            users_count = db.execute_query(
-                "SELECT COUNT(*) as count FROM ecommerce.users"
-            )[0]['count']
+            users_count = db.execute_query(queries.USERS_COUNT)[0]['count']
             
-            products_count = db.execute_query(
-                "SELECT COUNT(*) as count FROM ecommerce.products"
-            )[0]['count']
+            products_count = db.execute_query(queries.PRODUCTS_COUNT)[0]['count']
             
-            orders_count = db.execute_query(
-                "SELECT COUNT(*) as count FROM ecommerce.orders"
-            )[0]['count']
+            orders_count = db.execute_query(queries.ORDERS_COUNT)[0]['count']
             
-            revenue = db.execute_query("""
-                SELECT COALESCE(SUM(total_amount), 0) as revenue 
-                FROM ecommerce.orders 
-                WHERE status='completed'
-            """)[0]['revenue']
+            revenue = db.execute_query(queries.COMPLETED_REVENUE)[0]['revenue']
             
             with col1:
                 st.metric("Total Users", f"{users_count:,}")
@@ -153,38 +219,25 @@ def show_dashboard():
             
             # Product inventory chart
             st.subheader("📦 Product Inventory")
-            products_df = pd.DataFrame(db.execute_query("""
-                SELECT name, stock_quantity, category 
-                FROM ecommerce.products 
-                ORDER BY stock_quantity DESC 
-                LIMIT 10
-            """))
+            products = db.execute_query(queries.TOP_STOCK_PRODUCTS)
+            with tracing.span("pandas.dataframe", rows=len(products)):
+                products_df = pd.DataFrame(products)
             
             if not products_df.empty:
-                fig = px.bar(
-                    products_df, 
-                    x='name', 
-                    y='stock_quantity', 
-                    color='category',
-                    title="Top 10 Products by Stock",
-                    labels={'stock_quantity': 'Stock Quantity', 'name': 'Product Name'}
-                )
+                with tracing.span("plotly.figure"):
+                    fig = px.bar(
+                        products_df, 
+                        x='name', 
+                        y='stock_quantity', 
+                        color='category',
+                        title="Top 10 Products by Stock",
+                        labels={'stock_quantity': 'Stock Quantity', 'name': 'Product Name'}
+                    )
                 st.plotly_chart(fig, use_container_width=True)
             
             # Recent orders
             st.subheader("🛒 Recent Orders")
-            orders_df = pd.DataFrame(db.execute_query("""
-                SELECT 
-                    o.order_id,
-                    u.username,
-                    o.order_date,
-                    o.status,
-                    o.total_amount
-                FROM ecommerce.orders o
-                JOIN ecommerce.users u ON o.user_id = u.user_id
-                ORDER BY o.order_date DESC
-                LIMIT 10
-            """))
+            orders_df = pd.DataFrame(db.execute_query(queries.RECENT_ORDERS))
             
             if not orders_df.empty:
                 st.dataframe(
@@ -228,11 +281,10 @@ def show_data_entry():
                         try:
                             tags_array = [tag.strip() for tag in tags.split(',')] if tags else []
                             
-                            db.execute_query("""
-                                INSERT INTO ecommerce.products 
-                                (name, description, price, stock_quantity, category, tags)
-                                VALUES (%s, %s, %s, %s, %s, %s)
-                            """, (name, description, price, stock, category, tags_array))
+                            db.execute_query(
+                                queries.INSERT_PRODUCT,
+                                (name, description, price, stock, category, tags_array)
+                            )
                             
                             st.success("✅ Product added successfully!")
                             st.balloons()
@@ -255,17 +307,60 @@ def show_data_entry():
                     with LakebaseConnection() as db:
                         try:
                             metadata = json.dumps({"role": role})
-                            db.execute_query("""
-                                INSERT INTO ecommerce.users 
+                            db.execute_query(
+                                queries.INSERT_USER,
                                 (email, username, full_name, metadata)
-                                VALUES (%s, %s, %s, %s::jsonb)
-                            """, (email, username, full_name, metadata))
+                            )
                             
                             st.success("✅ User added successfully!")
                         except Exception as e:
                             st.error(f"Error adding user: {e}")
                 else:
                     st.error("Please fill in required fields")
+    
+    with tab3:
+        with st.form("order_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                user_id = st.number_input("User ID*", min_value=1, step=1)
+                items_text = st.text_area(
+                    "Items* (product_id:quantity, one per line)",
+                    placeholder="1:1\n2:2"
+                )
+                payment_method = st.selectbox("Payment Method", PAYMENT_METHODS)
+            
+            with col2:
+                street = st.text_input("Street")
+                city = st.text_input("City")
+                state = st.text_input("State")
+                zip_code = st.text_input("Zip")
+            
+            submitted = st.form_submit_button("Create Order", type="primary")
+            
+            if submitted:
+                try:
+                    items = parse_order_items(items_text)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    address = {"street": street, "city": city, "state": state, "zip": zip_code}
+                    shipping_address = {k: v for k, v in address.items() if v} or None
+                    
+                    with LakebaseConnection() as db:
+                        try:
+                            order = create_order(
+                                db, int(user_id), items, shipping_address, payment_method
+                            )
+                            st.success(
+                                f"✅ Order #{order['order_id']} created "
+                                f"(total ${float(order['total_amount']):,.2f})"
+                            )
+                        except Exception as e:
+                            if is_insufficient_stock(e):
+                                st.warning(f"Out of stock: {e.diag.message_primary}")
+                            else:
+                                st.error(f"Error creating order: {e}")
 
 def show_query_builder():
     """Interactive query builder"""
@@ -274,39 +369,17 @@ def show_query_builder():
     # Predefined queries
     st.subheader("Sample Queries")
     
-    queries = {
-        "Top selling products": """
-            SELECT p.name, COUNT(oi.order_item_id) as times_ordered, 
-                   SUM(oi.quantity) as total_quantity
-            FROM ecommerce.products p
-            JOIN ecommerce.order_items oi ON p.product_id = oi.product_id
-            GROUP BY p.product_id, p.name
-            ORDER BY times_ordered DESC
-            LIMIT 10
-        """,
-        "User purchase history": """
-            SELECT u.username, COUNT(o.order_id) as total_orders,
-                   SUM(o.total_amount) as lifetime_value
-            FROM ecommerce.users u
-            LEFT JOIN ecommerce.orders o ON u.user_id = o.user_id
-            GROUP BY u.user_id, u.username
-            ORDER BY lifetime_value DESC
-        """,
-        "Low stock alert": """
-            SELECT name, stock_quantity, category
-            FROM ecommerce.products
-            WHERE stock_quantity < 10
-            ORDER BY stock_quantity ASC
-        """
+    sample_queries = {
+        sample["label"]: sample["sql"] for sample in queries.SAMPLE_QUERIES.values()
     }
     
-    selected_query = st.selectbox("Select a sample query", list(queries.keys()))
+    selected_query = st.selectbox("Select a sample query", list(sample_queries.keys()))
     
     # Custom query input
     st.subheader("Custom Query")
     custom_query = st.text_area(
         "Enter your SQL query",
-        value=queries[selected_query],
+        value=sample_queries[selected_query],
         height=150
     )
     
@@ -335,71 +408,115 @@ def show_query_builder():
                 st.error(f"Query error: {e}")
 
 def show_vector_search():
-    """Vector search demonstration"""
+    """Semantic search over product embeddings with pg_vector"""
     st.header("🔮 Vector Search with pg_vector")
     
     st.info("""
     This section demonstrates semantic search using pg_vector extension.
     Vector embeddings enable AI-powered search based on meaning rather than exact matches.
+    Results come from an HNSW index; raise ef_search for better recall at higher latency.
     """)
     
     # Search interface
     search_query = st.text_input("Enter your search query", placeholder="e.g., laptop for AI development")
+    if search_query:
+        try:
+            suggestions, _ = text_search.typeahead(LakebaseConnection, search_query)
+        except Exception:
+            suggestions = []
+        if suggestions:
+            st.caption("Suggestions: " + " · ".join(row['name'] for row in suggestions))
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         search_type = st.radio("Search Type", ["Semantic", "Hybrid", "Traditional"])
     with col2:
         top_k = st.slider("Number of results", min_value=1, max_value=20, value=5)
+    with col3:
+        ef_search = st.number_input("ef_search", min_value=1, max_value=1000, value=vector_search.DEFAULT_EF_SEARCH)
     
-    if st.button("Search", type="primary"):
-        if search_query:
-            # Simulate vector search results
-            st.subheader("Search Results")
-            
-            # In a real implementation, this would call the embedding service
-            # and perform actual vector similarity search
-            
-            sample_results = [
-                {
-                    "title": "AI Development Laptop Pro",
-                    "description": "High-performance laptop with GPU for machine learning",
-                    "similarity": 0.95,
-                    "price": 1999.99
-                },
-                {
-                    "title": "Data Science Workstation",
-                    "description": "Powerful workstation for data analysis and AI",
-                    "similarity": 0.87,
-                    "price": 2499.99
-                },
-                {
-                    "title": "Machine Learning Book Bundle",
-                    "description": "Complete guide to AI and deep learning",
-                    "similarity": 0.72,
-                    "price": 99.99
-                }
-            ]
-            
-            for i, result in enumerate(sample_results[:top_k], 1):
-                with st.container():
-                    col1, col2, col3 = st.columns([3, 1, 1])
-                    with col1:
-                        st.markdown(f"**{i}. {result['title']}**")
-                        st.text(result['description'])
-                    with col2:
-                        st.metric("Similarity", f"{result['similarity']:.2%}")
-                    with col3:
-                        st.metric("Price", f"${result['price']:.2f}")
-                    st.divider()
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        run_search = st.button("Search", type="primary")
+    with col2:
+        run_tradeoff = st.button("Recall vs Latency")
+    
+    if not (run_search or run_tradeoff):
+        return
+    if not search_query:
+        st.warning("Please enter a search query")
+        return
+    
+    if run_search:
+        try:
+            with LakebaseConnection() as db:
+                if search_type == "Traditional":
+                    results, latency_ms = text_search.traditional_search(db, search_query, top_k)
+                elif search_type == "Hybrid":
+                    # Each ranking contributes ef_search candidates to the fusion
+                    results, timings = vector_search.hybrid_search(db, search_query, top_k, int(ef_search))
+                else:
+                    results, latency_ms = vector_search.search(db, search_query, top_k, int(ef_search))
+        except Exception as e:
+            st.error(f"Search error: {e}")
+            return
+        
+        if not results:
+            st.info("No matching products found. Run `python embedding_backfill.py` "
+                    "if products have no embeddings yet.")
+            return
+        
+        st.subheader("Search Results")
+        if search_type == "Hybrid":
+            stage_cols = st.columns(len(timings))
+            for col, (key, value) in zip(stage_cols, timings.items()):
+                col.metric(key.replace('_ms', '').replace('_', ' ').title(), f"{value:.1f} ms")
+        elif search_type == "Traditional":
+            st.caption(f"Found {len(results)} results in {latency_ms:.1f} ms")
         else:
-            st.warning("Please enter a search query")
+            st.caption(f"Found {len(results)} results in {latency_ms:.1f} ms (ef_search={ef_search})")
+        for i, result in enumerate(results, 1):
+            with st.container():
+                col1, col2, col3 = st.columns([3, 1, 1])
+                with col1:
+                    st.markdown(f"**{i}. {result['name']}**")
+                    st.text(result['description'] or "")
+                with col2:
+                    if search_type == "Hybrid":
+                        st.metric("RRF Score", f"{result['score']:.4f}")
+                    elif search_type == "Traditional":
+                        st.metric("Match", f"{result['score']:.2f}")
+                    else:
+                        st.metric("Similarity", f"{result['similarity']:.2%}")
+                with col3:
+                    st.metric("Price", f"${float(result['price']):.2f}")
+                st.divider()
+    else:
+        try:
+            with LakebaseConnection() as db:
+                points, exact_ms = vector_search.recall_tradeoff(db, search_query, top_k)
+        except Exception as e:
+            st.error(f"Search error: {e}")
+            return
+        
+        st.subheader("Recall vs Latency")
+        st.caption(f"Exact scan (ground truth): {exact_ms:.1f} ms")
+        df = pd.DataFrame(points)
+        fig = px.line(
+            df, x='latency_ms', y='recall', text='ef_search', markers=True,
+            labels={'latency_ms': 'Latency (ms)', 'recall': f'Recall@{top_k}'}
+        )
+        fig.update_traces(textposition='top left')
+        fig.update_yaxes(range=[0, 1.05], tickformat='.0%')
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(df, use_container_width=True)
 
 def show_api_testing():
     """PostgREST API testing interface"""
     st.header("🔌 API Testing")
     
-    st.info("Test PostgREST API endpoints for your Lakebase database")
+    st.info("Test PostgREST API endpoints for your Lakebase database. "
+            "No PostgREST running? Start a local stand-in with `python api_client.py mock --port 3000`.")
     
     # API endpoint configuration
     api_base = st.text_input("API Base URL", value="http://localhost:3000")
@@ -412,6 +529,7 @@ def show_api_testing():
         endpoint = st.text_input("Endpoint", value="/products")
     
     with col2:
+        request_body = None
         if method in ["POST", "PATCH"]:
             request_body = st.text_area(
                 "Request Body (JSON)",
@@ -422,30 +540,123 @@ def show_api_testing():
         params = st.text_input("Query Parameters", placeholder="e.g., category=eq.Electronics")
     
     if st.button("Send Request", type="primary"):
-        url = f"{api_base}{endpoint}"
-        if params:
-            url += f"?{params}"
-        
-        st.code(f"{method} {url}", language="http")
-        
-        # In a real implementation, this would make actual API calls
-        st.success("✅ Request sent successfully")
-        
-        # Sample response
-        st.subheader("Response")
-        sample_response = {
-            "status": 200,
-            "data": [
-                {
-                    "product_id": 1,
-                    "name": "Sample Product",
-                    "price": 99.99,
-                    "category": "Electronics"
-                }
-            ]
-        }
-        
-        st.json(sample_response)
+        send_api_request(method, api_base, endpoint, params, request_body)
+    
+    show_load_test(method, api_base, endpoint, params, request_body)
+
+def send_api_request(method, api_base, endpoint, params, request_body):
+    """Send one request and show its timings and response"""
+    url = api_client.build_url(api_base, endpoint, params)
+    st.code(f"{method} {url}", language="http")
+    
+    try:
+        result = api_client.send(method, api_base, endpoint, params, request_body)
+    except ValueError as e:
+        st.warning(f"Invalid request: {str(e)}")
+        return
+    except Exception as e:
+        st.error(f"Request failed: {type(e).__name__}: {str(e)}")
+        return
+    
+    timings = result['timings']
+    message = f"{result['status']} {result['reason']} in {timings['total_ms']:.1f} ms"
+    if result['status'] < 400:
+        st.success(f"✅ {message}")
+    else:
+        st.error(f"❌ {message}")
+    
+    cols = st.columns(len(api_client.PHASE_LABELS) + 1)
+    for col, (key, label) in zip(cols, api_client.PHASE_LABELS.items()):
+        col.metric(label, f"{timings[key]:.2f} ms")
+    cols[-1].metric(
+        "Size",
+        api_client.format_size(result['wire_bytes']),
+        f"{result['compression_ratio']:.1f}x {result['content_encoding']}",
+        delta_color="off"
+    )
+    st.caption(
+        f"{api_client.format_size(result['body_bytes'])} decoded · "
+        f"{'reused' if result['reused_connection'] else 'new'} connection · "
+        f"{result['http_version']}"
+    )
+    
+    st.subheader("Response")
+    if result['json'] is not None:
+        st.json(result['json'])
+    else:
+        st.code(result['body'][:20000])
+
+def show_load_test(method, api_base, endpoint, params, request_body):
+    """Load test the configured request, updating the results while it runs"""
+    st.subheader("Load Test")
+    
+    col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
+    with col1:
+        mode = st.radio("Mode", ["N requests", "Fixed rate"], horizontal=True)
+    with col2:
+        requests_count = st.number_input("Requests", min_value=1, max_value=100000, value=500)
+    with col3:
+        concurrency = st.number_input("Concurrency", min_value=1, max_value=500, value=20)
+    with col4:
+        rate = st.number_input("Rate (req/s)", min_value=1, max_value=5000, value=50)
+    with col5:
+        duration = st.number_input("Duration (s)", min_value=1, max_value=300, value=10)
+    
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        start = st.button("Start Load Test", type="primary")
+    with col2:
+        stop = st.button("Stop")
+    
+    test = api_client.get_load_test(st.session_state.get('load_test_id', ''))
+    if stop and test:
+        test.stop()
+    if start:
+        try:
+            st.session_state['load_test_id'] = api_client.start_load_test(
+                method, api_base, endpoint, params, request_body,
+                requests=int(requests_count),
+                concurrency=int(concurrency),
+                rate=float(rate) if mode == "Fixed rate" else None,
+                duration=float(duration),
+            )
+        except ValueError as e:
+            st.warning(f"Invalid request: {str(e)}")
+            return
+        test = api_client.get_load_test(st.session_state['load_test_id'])
+    if test is None:
+        return
+    
+    placeholder = st.empty()
+    while True:
+        result = test.snapshot()
+        with placeholder.container():
+            render_load_test(result)
+        if result['done']:
+            break
+        time.sleep(0.5)
+
+def render_load_test(result):
+    latency = result['latency_ms']
+    status = ("Stopped" if result['stopped'] else "Finished") if result['done'] else "Running"
+    target = f" (target {result['target_rps']:g})" if result['target_rps'] else ""
+    st.info(
+        f"{status}: {result['completed']:,} / {result['planned']:,} requests in {result['elapsed_s']:.1f} s · "
+        f"{result['requests_per_sec']:,.1f} req/s{target} · {result['error_count']:,} errors"
+    )
+    cols = st.columns(5)
+    for col, key in zip(cols, ("p50", "p90", "p95", "p99", "max")):
+        col.metric(key if key != "max" else "Max", f"{latency[key]:.1f} ms")
+    
+    df = pd.DataFrame(result['histogram'], columns=['Latency', 'Requests'])
+    fig = px.bar(df, x='Latency', y='Requests')
+    fig.update_traces(marker_color='#667eea')
+    st.plotly_chart(fig, use_container_width=True)
+    if result['errors']:
+        st.dataframe(
+            pd.DataFrame(sorted(result['errors'].items(), key=lambda item: -item[1]), columns=['Error', 'Count']),
+            use_container_width=True
+        )
 
 # ========================================
 # Run the application
@@ -0,0 +1 @@
+"""Performance benchmarks for the Lakebase training apps (run against a local Postgres)."""
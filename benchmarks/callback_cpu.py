@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Dashboard Callback CPU Benchmark
+================================
+CPU time and allocations of the dashboard's chart and table callbacks once
+their rows are fetched, before and after the pandas-free rendering path:
+
+- before: rows -> pandas DataFrame -> Plotly Express / DataFrame.to_dict
+- after:  rows -> column lists -> go.Bar / go.Scatter traces and DataTable
+          records (dash_app.inventory_figure, revenue_figure, orders_records)
+
+Each callback is timed building its output and then serializing it the way
+Dash does (plotly's to_json_plotly), with thread CPU time, so the database
+and network are left out. Rows are synthetic and shaped like
+queries.TOP_STOCK_PRODUCTS (10), DAILY_REVENUE (30) and RECENT_ORDERS (10);
+--scale multiplies them to see where a DataFrame starts paying off.
+
+--budget-ms fails the run when an "after" median exceeds it. Needs no
+database.
+
+Usage:
+    python -m benchmarks.callback_cpu --repeat 200
+    python -m benchmarks.callback_cpu --scale 100 --budget-ms 50
+"""
+
+import argparse
+import datetime
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dash import dash_table
+from plotly.io.json import to_json_plotly
+
+import dash_app
+from benchmarks.common import print_header
+
+CATEGORIES = ["Electronics", "Books", "Clothing", "Home"]
+
+
+def inventory_rows(count):
+    rng = random.Random(0)
+    return [{"name": f"Product {i}", "stock_quantity": rng.randrange(50, 500), "category": rng.choice(CATEGORIES)}
+            for i in range(count)]
+
+
+def revenue_rows(count):
+    start = datetime.date(2025, 1, 1)
+    return [{"date": start + datetime.timedelta(days=count - i), "daily_revenue": 1000 + i * 37.5}
+            for i in range(count)]
+
+
+def order_rows(count):
+    rng = random.Random(0)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [{"order_id": i, "username": f"user_{rng.randrange(10_000)}",
+             "order_date": start + datetime.timedelta(minutes=i), "status": rng.choice(["pending", "completed"]),
+             "total_amount": round(rng.uniform(5, 500), 2)}
+            for i in range(count)]
+
+
+def orders_table(records, columns):
+    return dash_table.DataTable(
+        data=records,
+        columns=[{"name": i.replace('_', ' ').title(), "id": i} for i in columns],
+        style_cell={'textAlign': 'left', 'padding': '12px'},
+    )
+
+
+# The callbacks as they were before the fast path
+def inventory_before(rows):
+    import pandas as pd
+    import plotly.express as px
+    df = pd.DataFrame(rows)
+    fig = px.bar(df, x='name', y='stock_quantity', color='category', title="",
+                 labels={'stock_quantity': 'Stock Quantity', 'name': 'Product'},
+                 color_discrete_sequence=px.colors.qualitative.Set3)
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', font=dict(family="Arial, sans-serif"),
+                      xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='#f0f0f0'))
+    return fig
+
+
+def revenue_before(rows):
+    import pandas as pd
+    import plotly.express as px
+    df = pd.DataFrame(rows)
+    fig = px.line(df, x='date', y='daily_revenue', title="",
+                  labels={'daily_revenue': 'Revenue ($)', 'date': 'Date'}, line_shape='spline')
+    fig.update_traces(line_color='#667eea', line_width=3)
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', font=dict(family="Arial, sans-serif"),
+                      xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='#f0f0f0'))
+    return fig
+
+
+def orders_before(rows):
+    import pandas as pd
+    df = pd.DataFrame(rows)
+    df['order_date'] = pd.to_datetime(df['order_date']).dt.strftime('%Y-%m-%d %H:%M')
+    df['total_amount'] = df['total_amount'].apply(lambda x: f"${float(x):.2f}")
+    return orders_table(df.to_dict('records'), df.columns)
+
+
+def orders_after(rows):
+    return orders_table(dash_app.orders_records(rows), rows[0])
+
+
+CALLBACKS = {
+    "update_inventory_chart": (inventory_rows, 10, inventory_before, dash_app.inventory_figure),
+    "update_revenue_chart": (revenue_rows, 30, revenue_before, dash_app.revenue_figure),
+    "update_orders_table": (order_rows, 10, orders_before, orders_after),
+}
+
+
+def measure(render, rows, repeat):
+    """Median thread-CPU ms to build, and to build and serialize; peak KB allocated for one call."""
+    to_json_plotly(render(rows))  # warm up imports, templates and validators
+    build, total = [], []
+    for _ in range(repeat):
+        start = time.thread_time()
+        output = render(rows)
+        built = time.thread_time()
+        to_json_plotly(output)
+        build.append((built - start) * 1000)
+        total.append((time.thread_time() - start) * 1000)
+    tracemalloc.start()
+    to_json_plotly(render(rows))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"build_ms": statistics.median(build), "total_ms": statistics.median(total), "peak_kb": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply every callback's row count")
+    parser.add_argument("--budget-ms", type=float, help="Fail if an 'after' median (build + serialize) exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for name, (make_rows, count, before, after) in CALLBACKS.items():
+        rows = make_rows(count * args.scale)
+        report[name] = {"rows": len(rows), "before": measure(before, rows, args.repeat),
+                        "after": measure(after, rows, args.repeat)}
+
+    over_budget = [name for name, r in report.items()
+                   if args.budget_ms is not None and r["after"]["total_ms"] > args.budget_ms]
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return not over_budget
+
+    print_header(f"Dashboard Callback CPU (median of {args.repeat}, thread CPU time)")
+    print(f"{'callback':24} {'rows':>5} {'before ms':>10} {'after ms':>9} {'speedup':>8} "
+          f"{'before KB':>10} {'after KB':>9}")
+    for name, r in report.items():
+        before, after = r["before"], r["after"]
+        print(f"{name:24} {r['rows']:>5} {before['total_ms']:>10.2f} {after['total_ms']:>9.2f} "
+              f"{before['total_ms'] / after['total_ms']:>7.1f}x {before['peak_kb']:>10,.0f} {after['peak_kb']:>9,.0f}")
+    print("\nms = build + serialize; build alone: "
+          + ", ".join(f"{name} {r['before']['build_ms']:.2f} -> {r['after']['build_ms']:.2f}"
+                      for name, r in report.items()))
+    if args.budget_ms is not None:
+        if over_budget:
+            print(f"\n❌ Over budget {args.budget_ms:,.1f}ms: {', '.join(over_budget)}")
+        else:
+            print(f"\n✅ Every callback within budget {args.budget_ms:,.1f}ms")
+    return not over_budget
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
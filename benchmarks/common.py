@@ -0,0 +1,66 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks connect to a local (or disposable remote) Postgres that has been
+initialised with setup_database.sql. The DSN comes from --dsn or BENCH_DSN.
+"""
+
+import math
+import os
+import socket
+
+from psycopg.conninfo import conninfo_to_dict
+
+DEFAULT_DSN = "postgresql://postgres@localhost:5432/postgres"
+
+
+def default_dsn():
+    """Return the benchmark DSN from the environment."""
+    return os.environ.get("BENCH_DSN", DEFAULT_DSN)
+
+
+def app_environment(dsn):
+    """Environment for running an app (dash_app.py, a template) against `dsn`."""
+    params = conninfo_to_dict(dsn)
+    env = dict(os.environ)
+    env.update({
+        "PGHOST": params.get("host", "localhost"),
+        "PGPORT": str(params.get("port", "5432")),
+        "PGDATABASE": params.get("dbname", "postgres"),
+        "PGUSER": params.get("user", "postgres"),
+        "PGPASSWORD": params.get("password", ""),
+        "PGSSLMODE": params.get("sslmode", "prefer"),
+    })
+    return env
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies):
+    """Summarise latencies (seconds) as milliseconds."""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def print_header(title):
+    print("=" * 80)
+    print(title)
+    print("=" * 80)
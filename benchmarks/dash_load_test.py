@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Dash Callback HTTP Load Test
+============================
+Replays recorded /_dash-update-component payloads with N concurrent
+simulated sessions against a running dash_app.py, so the measurement
+includes Flask, JSON serialization and the figure build, not just SQL.
+
+Recording a scenario:
+    DASH_RECORD_FILE=/tmp/session.jsonl python dash_app.py
+    # click through the dashboard in a browser, then stop the app
+
+Replaying it:
+    python -m benchmarks.dash_load_test --scenario /tmp/session.jsonl \\
+        --concurrency 1,5,10,25,50 --duration 20
+
+Each simulated session loads the page (/, /_dash-layout, /_dash-dependencies)
+and then sends the recorded callbacks in order, sleeping for the recorded
+think time multiplied by --think-scale (0 = closed loop, as fast as the
+server answers). The default scenario is a dashboard viewer: initial load,
+an interval tick, a Query Builder run and a return to the dashboard.
+Recorded form submits write to the database; drop them with --exclude.
+Callbacks catch database errors and still answer 200, so responses with an
+X-DB-Error header (set by dash_app.py) count as errors too; the capacity
+estimate uses successful callbacks only.
+
+Comparing servers:
+    python -m benchmarks.dash_load_test --serve dev,gunicorn --workers 4 --threads 4
+
+--serve starts dash_app.py itself on a free port against --dsn, once per
+listed server ("dev" is `python dash_app.py`, "gunicorn" uses
+gunicorn.conf.py), runs every level against each and reports the gain.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import app_environment, default_dsn, free_port, latency_summary, print_header
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SERVERS = {
+    "dev": [sys.executable, "dash_app.py"],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+}
+DEFAULT_SCENARIO = Path(__file__).parent / "scenarios" / "dashboard_viewer.jsonl"
+CALLBACK_PATH = "/_dash-update-component"
+PAGE_LOAD_PATHS = ["/", "/_dash-layout", "/_dash-dependencies"]
+HISTOGRAM_BUCKETS_MS = [5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+
+def load_scenario(path, exclude=None):
+    """Return [(delay_seconds, payload)] from a recorded JSONL file."""
+    pattern = re.compile(exclude) if exclude else None
+    steps, previous = [], None
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record["body"]
+            if pattern and pattern.search(body.get("output", "")):
+                continue
+            delay = 0.0 if previous is None else max(0.0, record["t"] - previous)
+            previous = record["t"]
+            steps.append((delay, body))
+    return steps
+
+
+class LevelStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.failures = Counter()
+        # Callbacks that answered 200 but hit a database error (X-DB-Error)
+        self.db_errors = Counter()
+        self.bytes = 0
+        # Successful callbacks alone, without the page-load GETs, for the capacity estimate
+        self.callback_latencies = []
+
+    def record(self, elapsed, response=None, error=None, callback=False):
+        if error is not None:
+            self.failures[type(error).__name__] += 1
+            return
+        self.latencies.append(elapsed)
+        self.statuses[response.status_code] += 1
+        self.bytes += len(response.content)
+        db_error = response.headers.get("X-DB-Error")
+        if db_error and response.status_code < 400:
+            self.db_errors[db_error] += 1
+        elif callback and response.status_code < 300:
+            self.callback_latencies.append(elapsed)
+
+    @property
+    def requests(self):
+        return len(self.latencies) + sum(self.failures.values())
+
+    @property
+    def errors(self):
+        return sum(self.failures.values()) + sum(self.db_errors.values()) + sum(
+            count for status, count in self.statuses.items() if status >= 400
+        )
+
+
+async def timed(stats, request, callback=False):
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as e:
+        stats.record(time.perf_counter() - start, error=e, callback=callback)
+        return
+    stats.record(time.perf_counter() - start, response=response, callback=callback)
+
+
+async def session(client, steps, deadline, think_scale, page_load, stats):
+    while time.perf_counter() < deadline:
+        if page_load:
+            for path in PAGE_LOAD_PATHS:
+                await timed(stats, client.get(path))
+        for delay, body in steps:
+            if delay and think_scale:
+                await asyncio.sleep(min(delay * think_scale, max(0.0, deadline - time.perf_counter())))
+            if time.perf_counter() >= deadline:
+                return
+            await timed(stats, client.post(CALLBACK_PATH, json=body), callback=True)
+
+
+async def run_level(url, steps, concurrency, duration, think_scale, page_load, timeout):
+    stats = LevelStats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            session(client, steps, deadline, think_scale, page_load, stats)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    summary = latency_summary(stats.latencies)
+    summary.update({
+        "concurrency": concurrency,
+        "requests": stats.requests,
+        "requests_per_sec": stats.requests / elapsed if elapsed else 0.0,
+        "error_rate": stats.errors / stats.requests if stats.requests else 0.0,
+        "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+        "failures": dict(stats.failures),
+        "kib_per_request": stats.bytes / 1024 / max(1, len(stats.latencies)),
+        "histogram": histogram(stats.latencies),
+        "db_errors": dict(stats.db_errors),
+        "callbacks_per_sec": len(stats.callback_latencies) / elapsed if elapsed else 0.0,
+        "callback_p95_ms": latency_summary(stats.callback_latencies)["p95_ms"],
+    })
+    return summary
+
+
+def start_app(server, dsn, workers, threads):
+    """Run dash_app.py under `server`; returns (process, base_url)."""
+    env = app_environment(dsn)
+    env.pop("DATABRICKS_APP_PORT", None)
+    port = free_port()
+    env.update({"PORT": str(port), "GUNICORN_WORKERS": str(workers), "GUNICORN_THREADS": str(threads)})
+    process = subprocess.Popen(SERVERS[server], cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline and process.poll() is None:
+        try:
+            if httpx.get(f"{url}/_dash-layout").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"dash_app.py did not start under {server} within 60s")
+
+
+def histogram(latencies):
+    counts = Counter()
+    for latency in latencies:
+        ms = latency * 1000
+        counts[next(b for b in HISTOGRAM_BUCKETS_MS if ms <= b)] += 1
+    return [["≤" + (f"{b:g}ms" if b != float("inf") else "∞"), counts[b]] for b in HISTOGRAM_BUCKETS_MS]
+
+
+def print_level(result):
+    print(f"\nConcurrency {result['concurrency']}: {result['requests_per_sec']:,.1f} req/s, "
+          f"p50 {result['p50_ms']:.1f}ms  p95 {result['p95_ms']:.1f}ms  p99 {result['p99_ms']:.1f}ms, "
+          f"errors {result['error_rate']:.1%}, {result['kib_per_request']:.1f} KiB/req")
+    if result["callbacks_per_sec"] != result["requests_per_sec"]:
+        print(f"   Successful callbacks: {result['callbacks_per_sec']:,.1f} req/s, "
+              f"p95 {result['callback_p95_ms']:.1f}ms")
+    if result["failures"]:
+        print(f"   Failures: {result['failures']}")
+    if result["db_errors"]:
+        print(f"   Database errors behind 200s: {result['db_errors']}")
+    if any(int(status) >= 400 for status in result["statuses"]):
+        print(f"   Statuses: {result['statuses']}")
+    total = max(1, sum(count for _, count in result["histogram"]))
+    for label, count in result["histogram"]:
+        if count:
+            print(f"   {label:>9} {'█' * max(1, round(40 * count / total))} {count:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the running app")
+    parser.add_argument("--serve", help=f"Start the app under each of these servers instead "
+                                        f"(comma-separated: {', '.join(SERVERS)})")
+    parser.add_argument("--dsn", default=default_dsn(), help="Database for --serve")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers for --serve")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker for --serve")
+    parser.add_argument("--scenario", default=str(DEFAULT_SCENARIO), help="Recorded JSONL payloads")
+    parser.add_argument("--exclude", help="Skip callbacks whose output matches this regex")
+    parser.add_argument("--concurrency", default="1,5,10,25,50", help="Comma-separated session counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--think-scale", type=float, default=0.0,
+                        help="Multiplier for recorded think time (0 = closed loop)")
+    parser.add_argument("--no-page-load", action="store_true", help="Only replay callbacks")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p95 target for the capacity estimate")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    steps = load_scenario(args.scenario, args.exclude)
+    if not steps:
+        print("❌ Scenario contains no callbacks")
+        return False
+    levels = [int(c) for c in args.concurrency.split(",")]
+    servers = args.serve.split(",") if args.serve else [None]
+    unknown = [server for server in servers if server and server not in SERVERS]
+    if unknown:
+        print(f"❌ Unknown server(s) {', '.join(unknown)}; expected {', '.join(SERVERS)}")
+        return False
+
+    results = []
+    for server in servers:
+        process, url = start_app(server, args.dsn, args.workers, args.threads) if server else (None, args.url)
+        try:
+            for level in levels:
+                result = asyncio.run(run_level(url, steps, level, args.duration, args.think_scale,
+                                               not args.no_page_load, args.timeout))
+                result["server"] = server or url
+                results.append(result)
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return True
+
+    server = None
+    for result in results:
+        if result["server"] != server:
+            server = result["server"]
+            print_header(f"Dash Callback Load Test: {server} ({len(steps)} callbacks per session)")
+        print_level(result)
+
+    if len(servers) > 1:
+        best = {s: max(r["requests_per_sec"] for r in results if r["server"] == s) for s in servers}
+        print("\n🚀 Peak throughput: " + ", ".join(
+            f"{s} {rps:,.1f} req/s ({rps / max(best[servers[0]], 1e-9):.1f}x)" for s, rps in best.items()
+        ))
+        return True
+
+    # A real viewer sends the scenario's callbacks over the recorded wall-clock span
+    recorded_span = sum(delay for delay, _ in steps)
+    # Page-load GETs are left out of both sides: per_viewer counts callbacks only
+    healthy = [r for r in results if r["error_rate"] < 0.01 and r["callback_p95_ms"] <= args.slo_ms]
+    if healthy and recorded_span:
+        best = max(healthy, key=lambda r: r["callbacks_per_sec"])
+        per_viewer = len(steps) / recorded_span
+        print(f"\n👥 Capacity: {best['callbacks_per_sec']:,.1f} callbacks/sec within p95 ≤ {args.slo_ms:g}ms "
+              f"≈ {best['callbacks_per_sec'] / per_viewer:,.0f} concurrent viewers "
+              f"at the recorded pace ({per_viewer:.2f} callbacks/sec each)")
+    elif not healthy:
+        print(f"\n⚠️  No concurrency level met p95 ≤ {args.slo_ms:g}ms with <1% errors")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+FastAPI Data API Benchmark
+==========================
+Requests/sec and latency of the Lakebase data API in
+dbapps/templates/fastapi/app.py against the benchmark Postgres.
+
+Unless --url points at a running instance, the template is started with
+uvicorn on a free local port, connected to --dsn with a static password.
+Each scenario runs for --duration seconds at every --concurrency level; the
+NDJSON scenario streams a whole table per request and reports rows/sec.
+
+Usage:
+    python -m benchmarks.data_api --concurrency 1,10,50 --duration 10
+    python -m benchmarks.data_api --url http://localhost:8080 --scenario page --scenario by_id
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import psycopg
+
+from benchmarks.common import app_environment, default_dsn, free_port, latency_summary, print_header
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "dbapps" / "templates" / "fastapi"
+
+# name -> function(ids) returning the path of the next request
+SCENARIOS = {
+    "page": lambda ids: "/api/products?limit=100",
+    "fields_filter": lambda ids: "/api/products?fields=product_id,name,price&price=lt.100&limit=100",
+    "keyset_deep": lambda ids: f"/api/products?after={ids[len(ids) * 9 // 10]}&limit=100",
+    "by_id": lambda ids: f"/api/products/{random.choice(ids)}",
+    "orders_desc": lambda ids: "/api/orders?order=desc&limit=100",
+    "ndjson": lambda ids: "/api/orders?format=ndjson",
+}
+
+
+def start_server(dsn, workers):
+    """Run the template with uvicorn; returns (process, base_url)."""
+    env = app_environment(dsn)
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", str(TEMPLATE_DIR),
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("FastAPI template did not start within 30s")
+
+
+async def run_level(url, scenario, ids, concurrency, duration, timeout):
+    latencies, statuses, failures = [], Counter(), Counter()
+    rows = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal rows
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(SCENARIOS[scenario](ids))
+                except httpx.HTTPError as e:
+                    failures[type(e).__name__] += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+                if scenario == "ndjson":
+                    rows += response.content.count(b"\n")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    summary = latency_summary(latencies)
+    errors = sum(failures.values()) + sum(v for k, v in statuses.items() if k >= 400)
+    summary.update({
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "failures": dict(failures),
+    })
+    return summary
+
+
+def print_result(result):
+    rows = f", {result['rows_per_sec']:,.0f} rows/s" if result["scenario"] == "ndjson" else ""
+    print(f"   c={result['concurrency']:<4} {result['requests_per_sec']:>9,.1f} req/s{rows}  "
+          f"p50 {result['p50_ms']:.1f}ms  p95 {result['p95_ms']:.1f}ms  p99 {result['p99_ms']:.1f}ms"
+          f"{'  errors ' + str(result['errors']) if result['errors'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=default_dsn())
+    parser.add_argument("--url", help="Benchmark an already running app instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), action="append",
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn) as conn:
+        ids = [row[0] for row in conn.execute(
+            "SELECT product_id FROM ecommerce.products ORDER BY product_id"
+        ).fetchall()]
+    if not ids:
+        print("❌ No products; run generate_data.py first")
+        return False
+
+    process, url = (None, args.url) if args.url else start_server(args.dsn, args.workers)
+    try:
+        levels = [int(c) for c in args.concurrency.split(",")]
+        results = [
+            asyncio.run(run_level(url, scenario, ids, level, args.duration, args.timeout))
+            for scenario in (args.scenario or list(SCENARIOS))
+            for level in levels
+        ]
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_header(f"FastAPI Data API Benchmark: {url} ({len(ids):,} products)")
+        scenario = None
+        for result in results:
+            if result["scenario"] != scenario:
+                scenario = result["scenario"]
+                print(f"\n{scenario}: {SCENARIOS[scenario](ids)}")
+            print_result(result)
+    return not any(r["errors"] for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
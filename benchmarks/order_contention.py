@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Order Contention Benchmark
+==========================
+Many concurrent buyers check out the same hot product and we measure
+orders/sec, latency and correctness of the stock decrement.
+
+Modes:
+- function: one round trip per order through ecommerce.create_order()
+- naive:    the multi-statement version (lock, read, insert header, insert
+            items, decrement, update total) with the row lock held across
+            every round trip
+- slots:    ecommerce.create_order() with the hot product split into
+            reservation slots (see inventory_slots.py), rebalanced
+            periodically while the benchmark runs
+
+Usage:
+    python -m benchmarks.order_contention --buyers 64 --duration 20
+    python -m benchmarks.order_contention --mode function --mode slots --slots 32
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import psycopg
+
+from benchmarks.common import default_dsn, latency_summary, print_header
+from orders import CREATE_ORDER_QUERY, is_insufficient_stock
+
+HOT_PRODUCT_NAME = "Benchmark Hot Product"
+BENCH_USERNAME = "bench_buyer"
+
+
+def prepare(dsn, stock, slots=0):
+    """Create (or restock) the hot product and a buyer; return their ids."""
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        user_id = conn.execute("""
+            INSERT INTO ecommerce.users (email, username, full_name)
+            VALUES ('bench_buyer@example.com', %s, 'Benchmark Buyer')
+            ON CONFLICT (username) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+            RETURNING user_id
+        """, (BENCH_USERNAME,)).fetchone()[0]
+
+        row = conn.execute(
+            "SELECT product_id FROM ecommerce.products WHERE name = %s", (HOT_PRODUCT_NAME,)
+        ).fetchone()
+        if row:
+            product_id = row[0]
+            conn.execute("SELECT ecommerce.disable_stock_slots(%s)", (product_id,))
+            conn.execute(
+                "UPDATE ecommerce.products SET stock_quantity = %s WHERE product_id = %s",
+                (stock, product_id),
+            )
+        else:
+            product_id = conn.execute("""
+                INSERT INTO ecommerce.products (name, description, price, stock_quantity, category, tags)
+                VALUES (%s, 'Contention benchmark product', 9.99, %s, 'Benchmark', ARRAY['benchmark'])
+                RETURNING product_id
+            """, (HOT_PRODUCT_NAME, stock)).fetchone()[0]
+        if slots:
+            conn.execute("SELECT ecommerce.enable_stock_slots(%s, %s)", (product_id, slots))
+    return user_id, product_id
+
+
+def visible_stock(dsn, product_id):
+    with psycopg.connect(dsn) as conn:
+        return conn.execute(
+            "SELECT stock_quantity FROM ecommerce.product_inventory WHERE product_id = %s",
+            (product_id,),
+        ).fetchone()[0]
+
+
+def order_via_function(conn, user_id, product_id):
+    """Single round trip: the database function does everything."""
+    items = json.dumps([{"product_id": product_id, "quantity": 1}])
+    conn.execute(CREATE_ORDER_QUERY, (user_id, items, None, "credit_card")).fetchone()
+
+
+def order_naive(conn, user_id, product_id):
+    """Seven round trips (BEGIN .. COMMIT) holding the product row lock throughout."""
+    with conn.transaction():
+        price, stock = conn.execute(
+            "SELECT price, stock_quantity FROM ecommerce.products WHERE product_id = %s FOR UPDATE",
+            (product_id,),
+        ).fetchone()
+        if stock < 1:
+            raise psycopg.errors.CheckViolation("Insufficient stock")
+        order_id = conn.execute("""
+            INSERT INTO ecommerce.orders (user_id, status, payment_method)
+            VALUES (%s, 'pending', 'credit_card') RETURNING order_id
+        """, (user_id,)).fetchone()[0]
+        conn.execute(
+            "INSERT INTO ecommerce.order_items (order_id, product_id, quantity, unit_price) "
+            "VALUES (%s, %s, 1, %s)",
+            (order_id, product_id, price),
+        )
+        conn.execute(
+            "UPDATE ecommerce.products SET stock_quantity = stock_quantity - 1 WHERE product_id = %s",
+            (product_id,),
+        )
+        conn.execute(
+            "UPDATE ecommerce.orders SET total_amount = %s WHERE order_id = %s", (price, order_id)
+        )
+
+
+# mode -> (order function, uses reservation slots)
+MODES = {
+    "function": (order_via_function, False),
+    "naive": (order_naive, False),
+    "slots": (order_via_function, True),
+}
+
+
+def buyer(dsn, place_order, user_id, product_id, deadline, stats, lock):
+    latencies, stockouts, errors = [], 0, 0
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                place_order(conn, user_id, product_id)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                if is_insufficient_stock(e) or isinstance(e, psycopg.errors.CheckViolation):
+                    stockouts += 1
+                else:
+                    errors += 1
+    with lock:
+        stats["latencies"].extend(latencies)
+        stats["stockouts"] += stockouts
+        stats["errors"] += errors
+
+
+def rebalancer(dsn, product_id, deadline, interval):
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        while time.perf_counter() < deadline:
+            time.sleep(interval)
+            conn.execute("SELECT ecommerce.rebalance_stock_slots(%s)", (product_id,))
+
+
+def run(dsn, mode, buyers, duration, stock, slots, rebalance_interval):
+    place_order, uses_slots = MODES[mode]
+    user_id, product_id = prepare(dsn, stock, slots if uses_slots else 0)
+    stats = {"latencies": [], "stockouts": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=buyer,
+            args=(dsn, place_order, user_id, product_id, deadline, stats, lock),
+        )
+        for _ in range(buyers)
+    ]
+    if uses_slots:
+        threads.append(threading.Thread(
+            target=rebalancer, args=(dsn, product_id, deadline, rebalance_interval)
+        ))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    orders = len(stats["latencies"])
+    final_stock = visible_stock(dsn, product_id)
+    return {
+        "mode": mode,
+        "buyers": buyers,
+        "elapsed_s": elapsed,
+        "orders": orders,
+        "orders_per_sec": orders / elapsed if elapsed else 0.0,
+        "stockouts": stats["stockouts"],
+        "errors": stats["errors"],
+        "latency": latency_summary(stats["latencies"]),
+        "stock_consistent": final_stock == stock - orders,
+    }
+
+
+def print_result(result):
+    latency = result["latency"]
+    print(f"\nMode: {result['mode']}  Buyers: {result['buyers']}")
+    print(f"   Orders:      {result['orders']:,} in {result['elapsed_s']:.1f}s "
+          f"({result['orders_per_sec']:,.0f} orders/sec)")
+    print(f"   Stock-outs:  {result['stockouts']:,}   Errors: {result['errors']:,}")
+    print(f"   Latency:     p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  "
+          f"p99 {latency['p99_ms']:.1f}ms  max {latency['max_ms']:.1f}ms")
+    print(f"   Stock check: {'✅ consistent' if result['stock_consistent'] else '❌ MISMATCH'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=default_dsn())
+    parser.add_argument("--mode", choices=list(MODES), action="append",
+                        help="Mode to run (repeatable, default: all)")
+    parser.add_argument("--buyers", type=int, default=32, help="Concurrent buyers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode")
+    parser.add_argument("--stock", type=int, default=10_000_000, help="Starting stock of the hot product")
+    parser.add_argument("--slots", type=int, default=16, help="Reservation slots in slots mode")
+    parser.add_argument("--rebalance-interval", type=float, default=1.0,
+                        help="Seconds between slot rebalances in slots mode")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [
+        run(args.dsn, mode, args.buyers, args.duration, args.stock, args.slots, args.rebalance_interval)
+        for mode in (args.mode or list(MODES))
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_header("Hot Product Order Contention Benchmark")
+        for result in results:
+            print_result(result)
+        by_mode = {r["mode"]: r["orders_per_sec"] for r in results}
+        baseline = by_mode.get("function")
+        for mode in ("naive", "slots"):
+            if baseline and mode in by_mode:
+                print(f"\n{mode} vs function: {by_mode[mode] / baseline:.2f}x orders/sec")
+    return all(r["stock_consistent"] and not r["errors"] for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Page Weight Benchmark
+=====================
+Bytes on the wire for a first and a repeat visit to a running dash_app.py.
+
+The first visit fetches the page, every stylesheet, script and icon it links
+and the layout/dependency JSON the renderer loads. The repeat visit acts
+like a browser cache: responses still fresh under their Cache-Control
+max-age cost nothing, and the rest are revalidated with If-None-Match /
+If-Modified-Since, so an unchanged resource costs only a 304. Resources
+from another origin (CDNs) are listed separately.
+
+Usage:
+    python dash_app.py &
+    python -m benchmarks.page_weight --url http://localhost:8080
+"""
+
+import argparse
+import json
+import re
+import sys
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from benchmarks.common import print_header
+
+RENDERER_PATHS = ["/_dash-layout", "/_dash-dependencies"]
+ACCEPT_ENCODING = "br, gzip"
+
+
+def linked_urls(page_url, html):
+    return [urljoin(page_url, url) for url in re.findall(r'(?:href|src)="([^"]+)"', html)]
+
+
+def fetch(client, url, headers=None):
+    response = client.get(url, headers=headers or {})
+    return {
+        "url": url,
+        "status": response.status_code,
+        "bytes": response.num_bytes_downloaded,
+        "encoding": response.headers.get("content-encoding", ""),
+        "cache_control": response.headers.get("cache-control", ""),
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+    }
+
+
+def fresh(result):
+    match = re.search(r"max-age=(\d+)", result["cache_control"])
+    return bool(match and int(match.group(1)) > 0 and "no-cache" not in result["cache_control"])
+
+
+def revisit(client, first):
+    if fresh(first):
+        return dict(first, status="cached", bytes=0)
+    headers = {}
+    if first["etag"]:
+        headers["If-None-Match"] = first["etag"]
+    if first["last_modified"]:
+        headers["If-Modified-Since"] = first["last_modified"]
+    return fetch(client, first["url"], headers)
+
+
+def run(url, timeout):
+    origin = urlsplit(url).netloc
+    with httpx.Client(timeout=timeout, headers={"Accept-Encoding": ACCEPT_ENCODING},
+                      follow_redirects=True) as client:
+        page = client.get(url)
+        page.raise_for_status()
+        urls = [url] + linked_urls(url, page.text) + [urljoin(url, path) for path in RENDERER_PATHS]
+        first = [fetch(client, u) for u in urls]
+        repeat = [revisit(client, result) for result in first]
+    external = sorted({urlsplit(r["url"]).netloc for r in first if urlsplit(r["url"]).netloc != origin})
+    return {
+        "first_visit_bytes": sum(r["bytes"] for r in first),
+        "repeat_visit_bytes": sum(r["bytes"] for r in repeat),
+        "requests": len(first),
+        "repeat_requests": sum(1 for r in repeat if r["status"] != "cached"),
+        "external_origins": external,
+        "resources": [
+            {"url": f["url"], "first_bytes": f["bytes"], "repeat_bytes": r["bytes"], "repeat_status": r["status"],
+             "encoding": f["encoding"], "cache_control": f["cache_control"]}
+            for f, r in zip(first, repeat)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the running app")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    report = run(args.url, args.timeout)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return not report["external_origins"]
+
+    print_header(f"Page Weight: {args.url}")
+    print(f"{'resource':58} {'first':>9} {'repeat':>9}  cache")
+    for r in report["resources"]:
+        path = urlsplit(r["url"]).path or "/"
+        name = path if len(path) <= 58 else "…" + path[-57:]
+        print(f"{name:58} {r['first_bytes']:>9,} {r['repeat_bytes']:>9,}  {r['repeat_status']}")
+    print(f"\nFirst visit:  {report['first_visit_bytes']:>9,} bytes in {report['requests']} requests")
+    print(f"Repeat visit: {report['repeat_visit_bytes']:>9,} bytes in {report['repeat_requests']} requests")
+    if report["external_origins"]:
+        print(f"⚠️  Loaded from other origins: {', '.join(report['external_origins'])}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
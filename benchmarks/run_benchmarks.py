@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Data-Access Benchmark Suite
+===========================
+Runs every data-access path of the apps against a seeded local Postgres,
+without a browser:
+
+- dash.*  the Dash callbacks in dash_app.py, called directly
+          (dashboard refresh, both insert paths, Query Builder execute/export)
+- sql.*   the statements in queries.py that app.py and dash_app.py run
+
+For each case it reports p50/p95/p99 latency, rows/sec and memory allocated
+(tracemalloc peak), and can save the results as a JSON baseline. Comparing
+against a baseline fails the run when p50/p95 latency or peak allocation
+regress beyond --tolerance.
+
+Usage:
+    python generate_data.py --dsn $BENCH_DSN --truncate      # seed once
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import psycopg
+
+from benchmarks.common import app_environment, default_dsn, latency_summary, print_header
+
+# Differences smaller than this are noise regardless of --tolerance
+MIN_REGRESSION_MS = 0.5
+MIN_REGRESSION_KIB = 64
+
+
+def configure_app_environment(dsn):
+    """Point dash_app.py at the benchmark database before importing it."""
+    os.environ.update(app_environment(dsn))
+
+
+class QueryCounter:
+    """Counts rows and failures seen by LakebaseConnection.execute_query."""
+
+    def __init__(self):
+        self.rows = 0
+        self.errors = 0
+
+    def install(self, connection_class):
+        original = connection_class.execute_query
+        counter = self
+
+        def execute_query(db, query, params=None, **kwargs):
+            try:
+                result = original(db, query, params, **kwargs)
+            except Exception:
+                counter.errors += 1
+                raise
+            counter.rows += len(result) if isinstance(result, list) else max(result, 0)
+            return result
+
+        connection_class.execute_query = execute_query
+
+
+def build_cases(dash_app, queries, run_id):
+    """Return (name, callable) pairs for every benchmarked path."""
+    seq = itertools.count()
+
+    def run_sql(sql):
+        def case():
+            with dash_app.LakebaseConnection() as db:
+                return db.execute_query(sql)
+        return case
+
+    def add_user():
+        username = f"bench_user_{run_id}_{next(seq)}"
+        return dash_app.add_user(1, f"{username}@example.com", username, "Benchmark User", "customer")
+
+    cases = [
+        ("dash.update_metrics", lambda: dash_app.update_metrics(0)),
+        ("dash.update_inventory_chart", lambda: dash_app.update_inventory_chart(0)),
+        ("dash.update_revenue_chart", lambda: dash_app.update_revenue_chart(0)),
+        ("dash.update_orders_table", lambda: dash_app.update_orders_table(0)),
+        ("dash.add_product", lambda: dash_app.add_product(
+            1, f"bench-product-{run_id}-{next(seq)}", "Benchmark product", 9.99, 10, "Other", "bench, load"
+        )),
+        ("dash.add_user", add_user),
+    ]
+    for value, sample in queries.SAMPLE_QUERIES.items():
+        cases.append((f"dash.execute_query.{value}",
+                      lambda sql=sample["sql"]: dash_app.execute_custom_query(1, sql)))
+        cases.append((f"dash.export_csv.{value}",
+                      lambda sql=sample["sql"]: dash_app.download_query_csv(1, sql)))
+
+    for name in ("USERS_COUNT", "PRODUCTS_COUNT", "ORDERS_COUNT", "COMPLETED_REVENUE",
+                 "TOP_STOCK_PRODUCTS", "DAILY_REVENUE", "RECENT_ORDERS"):
+        cases.append((f"sql.{name.lower()}", run_sql(getattr(queries, name))))
+    for value, sample in queries.SAMPLE_QUERIES.items():
+        cases.append((f"sql.sample.{value}", run_sql(sample["sql"])))
+    return cases
+
+
+def measure(fn, counter, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+
+    counter.rows = counter.errors = 0
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    rows, errors = counter.rows, counter.errors
+
+    # One extra call under tracemalloc so tracing overhead stays out of the timings
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = latency_summary(latencies)
+    result.update({
+        "rows_per_call": rows / iterations,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "calls_per_sec": iterations / elapsed if elapsed else 0.0,
+        "peak_alloc_kib": peak / 1024,
+        "retained_kib": current / 1024,
+        "errors": errors,
+    })
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions against a baseline."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for metric, floor in (("p50_ms", MIN_REGRESSION_MS), ("p95_ms", MIN_REGRESSION_MS),
+                              ("peak_alloc_kib", MIN_REGRESSION_KIB)):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - base[metric] > floor:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.2f} > {base[metric]:.2f} (+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def cleanup(dsn, run_id):
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute("DELETE FROM ecommerce.products WHERE name LIKE %s", (f"bench-product-{run_id}-%",))
+        conn.execute("DELETE FROM ecommerce.users WHERE username LIKE %s", (f"bench\\_user\\_{run_id}\\_%",))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=default_dsn())
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail on regressions against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    configure_app_environment(args.dsn)
+    import dash_app
+    import queries
+
+    counter = QueryCounter()
+    counter.install(dash_app.LakebaseConnection)
+    run_id = str(int(time.time()))
+
+    print_header("Lakebase Training Data-Access Benchmarks")
+    print(f"{'case':44} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rows/s':>10} {'peak KiB':>9}")
+    results = {}
+    try:
+        for name, fn in build_cases(dash_app, queries, run_id):
+            if args.filter not in name:
+                continue
+            result = measure(fn, counter, args.iterations, args.warmup)
+            results[name] = result
+            flag = "  ❌ errors" if result["errors"] else ""
+            print(f"{name:44} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f} "
+                  f"{result['rows_per_sec']:10,.0f} {result['peak_alloc_kib']:9,.0f}{flag}")
+    finally:
+        cleanup(args.dsn, run_id)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    ok = not any(r["errors"] for r in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions:")
+            for line in regressions:
+                print(f"   - {line}")
+            ok = False
+        else:
+            print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
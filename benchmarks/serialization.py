@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Callback Serialization Benchmark
+================================
+Serialization time and payload bytes of representative Dash callback
+responses, before and after the fast JSON path in serialization.py:
+
+- before:         plotly's stdlib json engine, NUMERIC columns as Decimal
+- orjson+Decimal: orjson engine, but Decimals force plotly's clean-up pass
+- after:          orjson engine with NUMERIC loaded as float (dash_app.py)
+
+Each payload is also compressed with gzip (level 6) and brotli (level 4),
+the settings serialization.configure() gives flask-compress. No database is
+needed; the payloads are synthetic rows shaped like the app's queries.
+
+Usage:
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+import plotly.graph_objects as go
+from dash import dash_table
+from plotly.io.json import to_json_plotly
+
+from benchmarks.common import print_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+VARIANTS = {
+    "before": ("json", Decimal),
+    "orjson+Decimal": ("orjson", Decimal),
+    "after": ("orjson", float),
+}
+
+
+def order_rows(count, numeric):
+    """Rows shaped like queries.RECENT_ORDERS."""
+    rng = random.Random(0)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            "order_id": i,
+            "username": f"user_{rng.randrange(10_000)}",
+            "order_date": start + datetime.timedelta(minutes=i),
+            "status": rng.choice(["pending", "shipped", "completed"]),
+            "total_amount": numeric(f"{rng.uniform(5, 500):.2f}"),
+        }
+        for i in range(count)
+    ]
+
+
+def payloads(rows, numeric):
+    """Callback responses as Dash builds them: {output id: {property: value}}."""
+    records = order_rows(rows, numeric)
+    table = dash_table.DataTable(
+        data=records,
+        columns=[{"name": key, "id": key} for key in records[0]],
+        page_size=20,
+    )
+    days = [datetime.date(2025, 1, 1) + datetime.timedelta(days=i) for i in range(30)]
+    revenue = go.Figure(go.Bar(x=days, y=[numeric(f"{1000 + i * 37.5:.2f}") for i in range(30)]))
+    points = np.random.default_rng(0).standard_normal((rows * 4, 2))
+    scatter = go.Figure(go.Scattergl(x=points[:, 0], y=points[:, 1], mode="markers"))
+    return {
+        f"datatable_{rows}_rows": {"multi": True, "response": {"query-results": {"children": table}}},
+        "revenue_figure": {"multi": True, "response": {"revenue-chart": {"figure": revenue}}},
+        f"scatter_{rows * 4}_points": {"multi": True, "response": {"scatter": {"figure": scatter}}},
+    }
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings) * 1000
+
+
+def run(rows, repeat):
+    results = []
+    for variant, (engine, numeric) in VARIANTS.items():
+        for name, payload in payloads(rows, numeric).items():
+            body, serialize_ms = measure(lambda: to_json_plotly(payload, engine=engine).encode(), repeat)
+            gzipped, gzip_ms = measure(lambda: gzip.compress(body, 6), repeat)
+            result = {
+                "payload": name,
+                "variant": variant,
+                "serialize_ms": serialize_ms,
+                "bytes": len(body),
+                "gzip_bytes": len(gzipped),
+                "gzip_ms": gzip_ms,
+            }
+            if brotli:
+                compressed, brotli_ms = measure(lambda: brotli.compress(body, quality=4), repeat)
+                result.update({"brotli_bytes": len(compressed), "brotli_ms": brotli_ms})
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="DataTable rows (scatter uses 4x points)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return True
+
+    print_header("Dash Callback Serialization Benchmark")
+    print(f"{'payload':<24} {'variant':<15} {'serialize':>10} {'bytes':>11} {'gzip':>18} {'brotli':>18}")
+    for r in sorted(results, key=lambda r: r["payload"]):
+        br = f"{r['brotli_bytes']:>9,} {r['brotli_ms']:>6.1f}ms" if "brotli_bytes" in r else f"{'-':>18}"
+        print(f"{r['payload']:<24} {r['variant']:<15} {r['serialize_ms']:>8.2f}ms {r['bytes']:>11,} "
+              f"{r['gzip_bytes']:>9,} {r['gzip_ms']:>6.1f}ms {br}")
+
+    by_key = {(r["payload"], r["variant"]): r for r in results}
+    print()
+    for payload in dict.fromkeys(r["payload"] for r in results):
+        before, after = by_key[(payload, "before")], by_key[(payload, "after")]
+        wire = after.get("brotli_bytes", after["gzip_bytes"])
+        print(f"{payload}: serialization {before['serialize_ms'] / max(after['serialize_ms'], 1e-6):.1f}x faster, "
+              f"{before['bytes'] / wire:.1f}x fewer bytes on the wire")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
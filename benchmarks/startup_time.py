@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Benchmark
+====================
+How long a restarted dash_app.py takes before it can answer, which is how
+long the Databricks Apps proxy returns 502 after a deploy or restart:
+
+- import:  `import dash_app` in a fresh interpreter (median of --repeat
+           runs), with the slowest top-level imports from -X importtime
+- serve:   per server ("dev" = `python dash_app.py`, "gunicorn" =
+           gunicorn.conf.py), seconds from process start until the port
+           accepts connections and until the first /_dash-layout response
+
+--budget-ms fails the run when the median import time exceeds it. The run
+also fails if a module that dash_app.py loads lazily (LAZY_MODULES) is
+imported at module import, or a server never answers, so it can gate CI.
+
+Usage:
+    python -m benchmarks.startup_time --budget-ms 2500
+    python -m benchmarks.startup_time --serve dev,gunicorn --repeat 3
+"""
+
+import argparse
+import json
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import app_environment, default_dsn, free_port, print_header
+from benchmarks.dash_load_test import SERVERS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_TIMER = "import time; t = time.perf_counter(); import dash_app; print(time.perf_counter() - t)"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_seconds(env):
+    result = subprocess.run([sys.executable, "-c", IMPORT_TIMER], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(env):
+    """Return ({module: (cumulative_ms, depth)}, LAZY_MODULES) for `import dash_app`."""
+    code = "import json, dash_app; print(json.dumps(dash_app.LAZY_MODULES))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                            env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Nesting is two spaces per level; dash_app itself is level 0
+        if match and match.group(4) not in modules:
+            modules[match.group(4)] = (int(match.group(2)) / 1000, (len(match.group(3)) - 1) // 2)
+    # LAZY_MODULES was printed after the import, so the profile doesn't include json's first use
+    return modules, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def serve_timings(server, env, timeout=120):
+    """Seconds from launch until the port is bound and until the first response."""
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    env.pop("DATABRICKS_APP_PORT", None)
+    started = time.perf_counter()
+    process = subprocess.Popen(SERVERS[server], cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    bound = first_byte = None
+    try:
+        while time.perf_counter() - started < timeout and process.poll() is None:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            except OSError:
+                time.sleep(0.01)
+                continue
+            bound = time.perf_counter() - started
+            break
+        if bound is not None:
+            # Waits in the listen backlog until a worker is ready to answer
+            response = httpx.get(f"http://127.0.0.1:{port}/_dash-layout", timeout=timeout)
+            if response.status_code == 200:
+                first_byte = time.perf_counter() - started
+    except httpx.HTTPError:
+        pass
+    finally:
+        process.terminate()
+        process.wait()
+    return {"bind_s": bound, "first_byte_s": first_byte}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=default_dsn(), help="Database the app is pointed at (not needed to start)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--serve", help=f"Also time server startup (comma-separated: {', '.join(SERVERS)})")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    env = app_environment(args.dsn)
+    samples = [import_seconds(env) * 1000 for _ in range(args.repeat)]
+    profile, lazy = import_profile(env)
+    eager = [name for name in lazy if name in profile]
+    top = sorted(((name, ms) for name, (ms, depth) in profile.items() if depth == 1),
+                 key=lambda item: -item[1])[:args.top]
+    report = {
+        "import_ms": {"median": statistics.median(samples), "min": min(samples), "max": max(samples)},
+        "top_imports_ms": dict(top),
+        "eager_lazy_modules": eager,
+        "servers": {},
+    }
+    for server in (args.serve.split(",") if args.serve else []):
+        runs = [serve_timings(server, env) for _ in range(args.repeat)]
+        report["servers"][server] = runs
+
+    over_budget = args.budget_ms is not None and report["import_ms"]["median"] > args.budget_ms
+    unanswered = [server for server, runs in report["servers"].items()
+                  if not any(r["first_byte_s"] for r in runs)]
+    ok = not (over_budget or eager or unanswered)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return ok
+
+    print_header("dash_app.py Cold Start")
+    print(f"import dash_app: median {report['import_ms']['median']:,.0f}ms "
+          f"(min {report['import_ms']['min']:,.0f}, max {report['import_ms']['max']:,.0f}, {args.repeat} runs)")
+    print("\nSlowest imports made by dash_app.py (cumulative, one -X importtime run):")
+    for name, ms in top:
+        print(f"   {name:32} {ms:8,.0f}ms")
+    for server, runs in report["servers"].items():
+        bound = [r["bind_s"] for r in runs if r["bind_s"] is not None]
+        first_byte = [r["first_byte_s"] for r in runs if r["first_byte_s"] is not None]
+        if server in unanswered:
+            print(f"\n❌ {server}: no response in any of {len(runs)} runs")
+            continue
+        print(f"\n{server}: port bound after {statistics.median(bound):.2f}s, "
+              f"first response after {statistics.median(first_byte):.2f}s "
+              f"(median of {len(first_byte)}/{len(runs)} runs)")
+
+    if eager:
+        print(f"\n❌ Imported eagerly, expected lazy: {', '.join(eager)}")
+    if args.budget_ms is not None:
+        if over_budget:
+            print(f"\n❌ Median import {report['import_ms']['median']:,.0f}ms exceeds budget {args.budget_ms:,.0f}ms")
+        else:
+            print(f"\n✅ Median import within budget {args.budget_ms:,.0f}ms")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
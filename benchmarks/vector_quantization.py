@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Vector Quantization Benchmark
+=============================
+Compares the full-precision HNSW index on ecommerce.products.embedding with
+the halfvec and binary quantized indexes (see setup_vector_search.sql). For
+each level it reports the index size, build time, and recall@k and latency of
+ecommerce.quantized_search() at several over-fetch factors, against an exact
+scan of the full-precision vectors.
+
+Products must already be embedded (python embedding_backfill.py). Missing
+indexes are built with `vector_search.create_index()`; --rebuild rebuilds
+them all so build times are comparable.
+
+Usage:
+    python -m benchmarks.vector_quantization --k 10 --queries 50
+    python -m benchmarks.vector_quantization --level halfvec --overfetch 1 --overfetch 4
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+
+from benchmarks.common import default_dsn, latency_summary, print_header
+from embeddings import EMBEDDING_DIM, embed_texts
+from vector_search import (
+    DEFAULT_EF_SEARCH,
+    EXACT_SEARCH_QUERY,
+    INDEXES,
+    QUANTIZED_SEARCH_QUERY,
+    SEMANTIC_SEARCH_QUERY,
+    create_index,
+    recall,
+    to_vector_literal,
+)
+
+OVERFETCH_SWEEP = [1, 2, 4, 8]
+
+
+def index_size(conn, name):
+    """Return the index size in bytes, or None if it does not exist."""
+    row = conn.execute(
+        "SELECT pg_relation_size(to_regclass(%s)) AS size", (f"ecommerce.{name}",)
+    ).fetchone()
+    return row['size']
+
+
+def sample_queries(conn, count):
+    return [row['name'] for row in conn.execute(
+        "SELECT name FROM ecommerce.products WHERE embedding IS NOT NULL ORDER BY random() LIMIT %s",
+        (count,),
+    ).fetchall()]
+
+
+def timed(conn, query, params):
+    start = time.perf_counter()
+    rows = conn.execute(query, params).fetchall()
+    return rows, time.perf_counter() - start
+
+
+def run_level(conn, level, literals, exact, k, overfetch_values, ef_search, rebuild):
+    name = INDEXES[level][0]
+    build_s = None
+    if rebuild or index_size(conn, name) is None:
+        build_s = create_index(conn, level, EMBEDDING_DIM)
+    conn.execute("ANALYZE ecommerce.products")
+
+    # Full precision has nothing to re-rank, so over-fetch does not apply
+    points = []
+    for overfetch in ([None] if level == "none" else overfetch_values):
+        latencies, recalls = [], []
+        for literal, truth in zip(literals, exact):
+            if overfetch is None:
+                rows, elapsed = timed(conn, SEMANTIC_SEARCH_QUERY, (literal, k, ef_search))
+            else:
+                rows, elapsed = timed(conn, QUANTIZED_SEARCH_QUERY, (literal, k, level, overfetch, ef_search))
+            latencies.append(elapsed)
+            recalls.append(recall(rows, truth))
+        points.append({
+            "overfetch": overfetch,
+            "recall": statistics.mean(recalls),
+            "latency": latency_summary(latencies),
+        })
+    return {
+        "level": level,
+        "index": name,
+        "index_bytes": index_size(conn, name),
+        "build_s": build_s,
+        "points": points,
+    }
+
+
+def print_result(result, k, baseline_bytes):
+    size_mb = result["index_bytes"] / 1024 ** 2
+    ratio = f" ({result['index_bytes'] / baseline_bytes:.0%} of full precision)" if baseline_bytes else ""
+    build = f", built in {result['build_s']:.1f}s" if result["build_s"] is not None else ""
+    print(f"\n{result['level']:>8}: {result['index']} {size_mb:,.1f} MB{ratio}{build}")
+    print(f"{'overfetch':>12} {'recall@' + str(k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for point in result["points"]:
+        overfetch = "-" if point["overfetch"] is None else f"{point['overfetch']}x"
+        print(f"{overfetch:>12} {point['recall']:>10.1%} {point['latency']['p50_ms']:>8.2f} "
+              f"{point['latency']['p95_ms']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=default_dsn())
+    parser.add_argument("--level", choices=list(INDEXES), action="append",
+                        help="Quantization level to run (repeatable, default: all)")
+    parser.add_argument("--overfetch", type=int, action="append",
+                        help=f"Over-fetch factor (repeatable, default: {OVERFETCH_SWEEP})")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50, help="Random product names to search for")
+    parser.add_argument("--ef-search", type=int, default=DEFAULT_EF_SEARCH)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild every index to time the builds")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True, row_factory=dict_row) as conn:
+        queries = sample_queries(conn, args.queries)
+        if not queries:
+            print("❌ No embedded products; run `python embedding_backfill.py` first")
+            return False
+        literals = [to_vector_literal(vector) for vector in embed_texts(queries)]
+        exact = [conn.execute(EXACT_SEARCH_QUERY, (literal, literal, args.k)).fetchall() for literal in literals]
+        results = [
+            run_level(conn, level, literals, exact, args.k, args.overfetch or OVERFETCH_SWEEP,
+                      args.ef_search, args.rebuild)
+            for level in (args.level or list(INDEXES))
+        ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_header(f"Vector Quantization Benchmark (k={args.k}, {len(queries)} queries, "
+                     f"ef_search={args.ef_search})")
+        baseline = next((r["index_bytes"] for r in results if r["level"] == "none"), None)
+        for result in results:
+            print_result(result, args.k, baseline)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
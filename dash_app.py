@@ -3,21 +3,50 @@ Databricks Lakebase Training Dashboard - Dash Application with Framer Motion UI
 A comprehensive training application showcasing Lakebase integration with modern UI
 """
 
+import importlib
 import os
 import dash
-from dash import dcc, html, Input, Output, State, callback, dash_table
+from dash import dcc, html, Input, Output, State, ALL, callback, ctx, dash_table
 import dash_bootstrap_components as dbc
 from dash.exceptions import PreventUpdate
-import plotly.express as px
+from flask import Flask, g, has_request_context, jsonify, request
 import plotly.graph_objects as go
 import psycopg
 from psycopg import sql
+from psycopg.adapt import AdaptersMap
 from psycopg.rows import dict_row
-import pandas as pd
+from psycopg.types.numeric import FloatLoader
+from psycopg_pool import ConnectionPool
 from datetime import datetime
 import json
+import threading
 import time
-from databricks import sdk
+import api_client
+import metrics
+import profiling
+from orders import PAYMENT_METHODS, create_order, is_insufficient_stock, parse_order_items
+import queries
+import query_stats
+import serialization
+import static_assets
+import text_search
+import tracing
+import vector_search
+from vector_search import DEFAULT_EF_SEARCH
+
+# pandas (only needed for Query Builder CSV exports) and the Databricks SDK
+# take seconds to import together, so they load on first use; until this
+# module has been imported the server has not bound its port and the Apps
+# proxy answers 502. preload_modules() imports them ahead of the first
+# request once the port is bound (see gunicorn.conf.py).
+LAZY_MODULES = ["pandas", "databricks.sdk"]
+
+def preload_modules():
+    """Import the lazily loaded modules now rather than on first use."""
+    for name in LAZY_MODULES:
+        if name == "databricks.sdk" and PGPASSWORD is not None:
+            continue
+        importlib.import_module(name)
 
 # ========================================
 # OAuth Token Management
@@ -33,13 +62,17 @@ def get_oauth_token():
     # Refresh token every 15 minutes (tokens expire after 1 hour)
     if postgres_password is None or time.time() - last_password_refresh > 900:
         print("Refreshing OAuth token...")
+        start = time.perf_counter()
         try:
             if workspace_client is None:
+                from databricks import sdk
                 workspace_client = sdk.WorkspaceClient()
             postgres_password = workspace_client.config.oauth_token().access_token
             last_password_refresh = time.time()
+            metrics.oauth_refresh(time.perf_counter() - start)
             print("OAuth token refreshed successfully")
         except Exception as e:
+            metrics.oauth_refresh(time.perf_counter() - start, error=e)
             print(f"Failed to get OAuth token: {e}")
             raise
     return postgres_password
@@ -59,25 +92,91 @@ def _get_required_env(name: str) -> str:
                         f"Please configure it in app.yaml using Databricks Secrets.")
     return value
 
-# Required - no hardcoded defaults for sensitive values
-PGHOST = _get_required_env('PGHOST')
-PGUSER = _get_required_env('PGUSER')
+# Required - no hardcoded defaults for sensitive values. Checked when the
+# pool is created, so a misconfigured app still starts and reports the error
+PGHOST = os.getenv('PGHOST')
+PGUSER = os.getenv('PGUSER')
 # Less sensitive - can have defaults
 PGDATABASE = os.getenv('PGDATABASE', 'databricks_postgres')
 PGPORT = os.getenv('PGPORT', '5432')
+PGSSLMODE = os.getenv('PGSSLMODE', 'require')
+# Local development / benchmarking only: a static password skips OAuth
+PGPASSWORD = os.getenv('PGPASSWORD')
+
+# NUMERIC columns load as float: the dashboard only displays them, and a
+# single Decimal in a callback response knocks plotly's orjson encoder onto
+# its slow clean-up path (see serialization.py)
+DISPLAY_ADAPTERS = AdaptersMap(psycopg.adapters)
+DISPLAY_ADAPTERS.register_loader("numeric", FloatLoader)
+
+# Connections per worker process; keep DB_POOL_MAX_SIZE >= GUNICORN_THREADS
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+
+class TokenConnection(psycopg.Connection):
+    """Connection that supplies a current OAuth token each time the pool connects."""
+
+    @classmethod
+    def connect(cls, conninfo="", **kwargs):
+        kwargs["password"] = PGPASSWORD if PGPASSWORD is not None else get_oauth_token()
+        return super().connect(conninfo, **kwargs)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return this process's connection pool, opening it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                kwargs={
+                    "dbname": PGDATABASE,
+                    "user": _get_required_env('PGUSER'),
+                    "host": _get_required_env('PGHOST'),
+                    "port": PGPORT,
+                    "sslmode": PGSSLMODE,
+                    "row_factory": dict_row,
+                    "context": DISPLAY_ADAPTERS,
+                    # Reads hand connections back idle instead of in a transaction
+                    # the pool must roll back; writes still commit explicitly
+                    "autocommit": True,
+                },
+                connection_class=TokenConnection,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                # Recycle connections well before their OAuth token would expire
+                max_lifetime=45 * 60,
+                open=False,
+            )
+            # Don't block startup on the database; callbacks wait in getconn()
+            _pool.open(wait=False)
+    return _pool
+
+def init_worker():
+    """Open this worker's connection pool right after it is forked.
+
+    gunicorn.conf.py imports the app once in the master and forks workers
+    from it. Sockets (the SDK client's, pooled connections) must not be
+    shared between processes, so anything the master created is dropped and
+    each worker fetches its own token and connections.
+    """
+    global workspace_client, postgres_password, last_password_refresh, _pool
+    workspace_client, postgres_password, last_password_refresh = None, None, 0
+    _pool = None
+    try:
+        get_pool()
+    except ValueError as e:
+        print(f"Database not configured: {e}")
 
-def get_db_connection():
-    """Get a fresh database connection."""
-    token = get_oauth_token()
-    conn_string = (
-        f"dbname={PGDATABASE} "
-        f"user={PGUSER} "
-        f"password={token} "
-        f"host={PGHOST} "
-        f"port={PGPORT} "
-        f"sslmode=require"
-    )
-    return psycopg.connect(conn_string, row_factory=dict_row)
+def flag_db_error(error):
+    """Mark the current request as having hit a database error.
+
+    Callbacks catch these and still answer 200 with an alert, so the flag
+    becomes an X-DB-Error header that load tests can count as a failure.
+    """
+    if has_request_context():
+        g.db_error = type(error).__name__
 
 # ========================================
 # Database Connection Manager
@@ -99,38 +198,61 @@ class LakebaseConnection:
     def connect(self):
         """Establish connection to Lakebase"""
         try:
-            self.connection = get_db_connection()
+            pool, start = get_pool(), time.perf_counter()
+            with tracing.span("db.pool.checkout", kind="client"):
+                self.connection = pool.getconn()
+            metrics.pool_checkout(pool, time.perf_counter() - start)
             self.cursor = self.connection.cursor()
             return True
         except Exception as e:
+            metrics.db_error("connect", e)
+            flag_db_error(e)
             print(f"Connection failed: {e}")
             return False
 
-    def execute_query(self, query, params=None):
-        """Execute a query and return results"""
+    def execute_query(self, query, params=None, commit=False):
+        """Execute a query and return results
+
+        Set commit=True for SELECTs that call data-modifying functions
+        such as ecommerce.create_order().
+        """
         if not self.connection or not self.cursor:
             raise Exception("Database connection not established")
+        start, result, error = time.perf_counter(), 0, None
         try:
-            self.cursor.execute(query, params)
-            if query.strip().upper().startswith('SELECT'):
-                return self.cursor.fetchall()
-            elif 'RETURNING' in query.upper():
-                result = self.cursor.fetchall()
-                self.connection.commit()
+            with tracing.span("db.query", kind="client", **{"db.statement": " ".join(query.split()),
+                                                            "db.query_id": query_stats.fingerprint(query)[0]}) as span:
+                self.cursor.execute(query, params)
+                if query.strip().upper().startswith('SELECT'):
+                    result = self.cursor.fetchall()
+                    if commit:
+                        self.connection.commit()
+                elif 'RETURNING' in query.upper():
+                    result = self.cursor.fetchall()
+                    self.connection.commit()
+                else:
+                    self.connection.commit()
+                    result = self.cursor.rowcount
+                span.set("db.rows", len(result) if isinstance(result, list) else result)
                 return result
-            else:
-                self.connection.commit()
-                return self.cursor.rowcount
         except Exception as e:
+            error = e
+            if not is_insufficient_stock(e):
+                flag_db_error(e)
             if self.connection:
                 try:
                     self.connection.rollback()
                 except Exception:
                     pass
             raise e
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.query(elapsed, error)
+            query_stats.record(query, elapsed * 1000, len(result) if isinstance(result, list) else result,
+                               params, error)
 
     def close(self):
-        """Close database connection"""
+        """Return the connection to the pool (autocommit, so no transaction is left open)"""
         try:
             if self.cursor:
                 self.cursor.close()
@@ -138,7 +260,9 @@ class LakebaseConnection:
             pass
         try:
             if self.connection:
-                self.connection.close()
+                pool = get_pool()
+                pool.putconn(self.connection)
+                metrics.pool_state(pool)
         except Exception:
             pass
         self.cursor = None
@@ -154,151 +278,120 @@ def convert_for_datatable(df):
             df[col] = df[col].apply(lambda x: json.dumps(x) if isinstance(x, (dict, list)) else x)
     return df
 
+def datatable_records(rows):
+    """Query rows as DataTable records, with JSONB values as JSON strings."""
+    return [
+        {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()}
+        for row in rows
+    ]
+
+# ========================================
+# Dashboard charts and tables
+# The dashboard queries return tens of rows, so traces and records are built
+# straight from the rows: a DataFrame plus Plotly Express costs several times
+# the query itself (python -m benchmarks.callback_cpu). pandas is left to
+# ad-hoc Query Builder exports.
+# ========================================
+CHART_LAYOUT = dict(
+    plot_bgcolor='white',
+    paper_bgcolor='white',
+    font=dict(family="Arial, sans-serif"),
+    margin=dict(t=60),
+)
+
+def column_lists(rows, *names):
+    """Column-major lists of the named columns of `rows`."""
+    return [[row[name] for row in rows] for name in names]
+
+def inventory_figure(rows):
+    """Stock per product, one colored trace per category like px.bar(color='category')."""
+    from plotly.colors import qualitative
+
+    colors = qualitative.Set3
+    groups = {}
+    for name, quantity, category in zip(*column_lists(rows, 'name', 'stock_quantity', 'category')):
+        x, y = groups.setdefault(category, ([], []))
+        x.append(name)
+        y.append(quantity)
+    return go.Figure(
+        data=[
+            go.Bar(
+                x=x, y=y, name=str(category), legendgroup=str(category), marker_color=colors[i % len(colors)],
+                hovertemplate="Category=%{fullData.name}<br>Product=%{x}<br>Stock Quantity=%{y}<extra></extra>",
+            )
+            for i, (category, (x, y)) in enumerate(groups.items())
+        ],
+        layout=dict(
+            CHART_LAYOUT,
+            barmode='relative',
+            legend=dict(title=dict(text='category')),
+            xaxis=dict(title=dict(text='Product'), showgrid=False),
+            yaxis=dict(title=dict(text='Stock Quantity'), showgrid=True, gridcolor='#f0f0f0'),
+        ),
+    )
+
+def revenue_figure(rows):
+    """Completed-order revenue per day as a spline."""
+    dates, revenue = column_lists(rows, 'date', 'daily_revenue')
+    return go.Figure(
+        data=[go.Scatter(
+            x=dates, y=revenue, mode='lines', line=dict(shape='spline', color='#667eea', width=3),
+            hovertemplate="Date=%{x}<br>Revenue ($)=%{y}<extra></extra>",
+        )],
+        layout=dict(
+            CHART_LAYOUT,
+            xaxis=dict(title=dict(text='Date'), showgrid=False),
+            yaxis=dict(title=dict(text='Revenue ($)'), showgrid=True, gridcolor='#f0f0f0'),
+        ),
+    )
+
+def orders_records(rows):
+    """Recent orders as DataTable records with display-formatted date and amount."""
+    return [
+        dict(
+            row,
+            order_date=row['order_date'].strftime('%Y-%m-%d %H:%M') if row['order_date'] else None,
+            total_amount=f"${float(row['total_amount']):.2f}",
+        )
+        for row in rows
+    ]
+
 # ========================================
-# Initialize Dash App with Bootstrap and custom CSS
+# Initialize Dash App with self-hosted Bootstrap and custom CSS
 # ========================================
+# Fast JSON and brotli/gzip compression for callbacks and endpoints, and the
+# fingerprinted CSS bundle (Bootstrap, icons and the Framer Motion-like
+# animations) built from assets/src/ by static_assets.py
+server = Flask(__name__)
+serialization.configure(server)
+static_assets.configure(server)
+
 app = dash.Dash(
     __name__,
-    external_stylesheets=[
-        dbc.themes.BOOTSTRAP,
-        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css'
-    ],
+    server=server,
+    compress=serialization.compression_available(),
+    external_stylesheets=[static_assets.stylesheet_url()],
+    # assets/ holds the bundle sources; only the built bundle is linked
+    include_assets_files=False,
     suppress_callback_exceptions=True,
     title="Lakebase Training Dashboard"
 )
-
-# Custom CSS for Framer Motion-like animations
-app.index_string = '''
-<!DOCTYPE html>
-<html>
-    <head>
-        {%metas%}
-        <title>{%title%}</title>
-        {%favicon%}
-        {%css%}
-        <style>
-            @keyframes fadeIn {
-                from { opacity: 0; transform: translateY(20px); }
-                to { opacity: 1; transform: translateY(0); }
-            }
-
-            @keyframes slideInRight {
-                from { opacity: 0; transform: translateX(100px); }
-                to { opacity: 1; transform: translateX(0); }
-            }
-
-            @keyframes scaleIn {
-                from { opacity: 0; transform: scale(0.8); }
-                to { opacity: 1; transform: scale(1); }
-            }
-
-            .animate-fade-in {
-                animation: fadeIn 0.6s ease-out;
-            }
-
-            .animate-slide-in {
-                animation: slideInRight 0.8s ease-out;
-            }
-
-            .animate-scale-in {
-                animation: scaleIn 0.5s ease-out;
-            }
-
-            .metric-card {
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                border-radius: 12px;
-                padding: 24px;
-                background: white;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }
-
-            .metric-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 12px 24px rgba(0, 0, 0, 0.15);
-            }
-
-            .nav-tab {
-                transition: all 0.3s ease;
-                border-radius: 8px;
-                padding: 12px 24px;
-                margin: 0 8px;
-            }
-
-            .nav-tab:hover {
-                background: #f0f0f0;
-                transform: scale(1.05);
-            }
-
-            .form-control, .form-select {
-                transition: all 0.3s ease;
-                border-radius: 8px;
-            }
-
-            .form-control:focus, .form-select:focus {
-                transform: scale(1.02);
-                box-shadow: 0 0 0 3px rgba(66, 153, 225, 0.5);
-            }
-
-            .btn {
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                border-radius: 8px;
-            }
-
-            .btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
-            }
-
-            .btn:active {
-                transform: translateY(0);
-            }
-
-            body {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-            }
-
-            .main-container {
-                background: white;
-                border-radius: 16px;
-                margin: 20px;
-                padding: 32px;
-                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-            }
-
-            .header-container {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 32px;
-                border-radius: 12px;
-                margin-bottom: 32px;
-                animation: fadeIn 0.8s ease-out;
-            }
-
-            .chart-container {
-                background: white;
-                border-radius: 12px;
-                padding: 24px;
-                margin: 16px 0;
-                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
-                transition: all 0.3s ease;
-            }
-
-            .chart-container:hover {
-                box-shadow: 0 8px 24px rgba(0, 0, 0, 0.15);
-            }
-        </style>
-    </head>
-    <body>
-        {%app_entry%}
-        <footer>
-            {%config%}
-            {%scripts%}
-            {%renderer%}
-        </footer>
-    </body>
-</html>
-'''
+# Spans for every callback below; the slowest recent ones are at /debug/traces.
+# Like /debug/queries, it shows the worker that answers the request only
+tracing.instrument_dash(app)
+# Per-statement latency and the slow-query log at /debug/queries (per worker)
+query_stats.configure(server)
+# Pool, cache, callback and OAuth metrics for Prometheus at /metrics
+metrics.configure(server, app)
+# CPU flamegraphs and tracemalloc snapshots of this worker (needs DEBUG_TOKEN)
+profiling.configure(server)
+
+@server.after_request
+def add_db_error_header(response):
+    error = g.pop("db_error", None)
+    if error:
+        response.headers["X-DB-Error"] = error
+    return response
 
 # ========================================
 # Layout Components
@@ -396,6 +489,7 @@ data_entry_content = html.Div([
     dbc.Tabs([
         dbc.Tab(label="Add Product", tab_id="add-product"),
         dbc.Tab(label="Add User", tab_id="add-user"),
+        dbc.Tab(label="Create Order", tab_id="create-order"),
     ], id="data-entry-tabs", active_tab="add-product", className="mb-4"),
 
     html.Div(id="data-entry-form-container")
@@ -478,6 +572,52 @@ user_form = html.Div([
     html.Div(id="user-form-feedback", className="mt-3")
 ], className="animate-fade-in p-4")
 
+# Order Form
+order_form = html.Div([
+    dbc.Row([
+        dbc.Col([
+            dbc.Label("User ID *"),
+            dbc.Input(id="order-user-id", type="number", placeholder="1", min=1),
+        ], width=6),
+        dbc.Col([
+            dbc.Label("Payment Method"),
+            dbc.Select(id="order-payment-method", options=[
+                {"label": method.replace('_', ' ').title(), "value": method}
+                for method in PAYMENT_METHODS
+            ], value=PAYMENT_METHODS[0]),
+        ], width=6),
+    ], className="mb-3"),
+
+    dbc.Row([
+        dbc.Col([
+            dbc.Label("Items * (product_id:quantity, one per line)"),
+            dbc.Textarea(id="order-items", placeholder="1:1\n2:2", rows=4),
+        ]),
+    ], className="mb-3"),
+
+    dbc.Row([
+        dbc.Col([
+            dbc.Label("Street"),
+            dbc.Input(id="order-street", type="text", placeholder="123 Main St"),
+        ], width=6),
+        dbc.Col([
+            dbc.Label("City"),
+            dbc.Input(id="order-city", type="text", placeholder="Denver"),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("State"),
+            dbc.Input(id="order-state", type="text", placeholder="CO"),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("Zip"),
+            dbc.Input(id="order-zip", type="text", placeholder="80202"),
+        ], width=2),
+    ], className="mb-3"),
+
+    dbc.Button("Create Order", id="submit-order", color="info", className="mt-3"),
+    html.Div(id="order-form-feedback", className="mt-3")
+], className="animate-fade-in p-4")
+
 # Query Builder Tab Content
 query_builder_content = html.Div([
     dbc.Row([
@@ -486,10 +626,8 @@ query_builder_content = html.Div([
             dbc.Select(
                 id="sample-queries",
                 options=[
-                    {"label": "Top selling products", "value": "top_products"},
-                    {"label": "User purchase history", "value": "user_history"},
-                    {"label": "Low stock alert", "value": "low_stock"},
-                    {"label": "Revenue by category", "value": "revenue_category"},
+                    {"label": sample["label"], "value": value}
+                    for value, sample in queries.SAMPLE_QUERIES.items()
                 ],
                 value="top_products"
             ),
@@ -515,12 +653,19 @@ vector_search_content = html.Div([
     dbc.Row([
         dbc.Col([
             dbc.Label("Search Query"),
-            dbc.Input(id="vector-search-query", type="text", placeholder="e.g., laptop for AI development"),
+            # Debounced: type-ahead requests go out 250 ms after typing stops
+            dcc.Input(id="vector-search-query", type="text", placeholder="e.g., laptop for AI development",
+                      debounce=0.25, className="form-control", autoComplete="off"),
+            dbc.ListGroup(id="vector-typeahead", className="mt-1"),
         ], width=8),
         dbc.Col([
             dbc.Label("Number of Results"),
             dbc.Input(id="vector-top-k", type="number", value=5, min=1, max=20),
-        ], width=4),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("ef_search"),
+            dbc.Input(id="vector-ef-search", type="number", value=DEFAULT_EF_SEARCH, min=1, max=1000),
+        ], width=2),
     ], className="mb-3"),
 
     dbc.Row([
@@ -539,9 +684,11 @@ vector_search_content = html.Div([
         ]),
     ], className="mb-3"),
 
-    dbc.Button("Search", id="execute-vector-search", color="primary", className="mb-4"),
+    dbc.Button("Search", id="execute-vector-search", color="primary", className="mb-4 me-2"),
+    dbc.Button("Recall vs Latency", id="vector-tradeoff", color="secondary", className="mb-4"),
 
-    html.Div(id="vector-search-results")
+    html.Div(id="vector-search-results"),
+    html.Div(id="vector-tradeoff-results", className="mt-4")
 ], className="animate-fade-in p-4")
 
 # API Testing Tab Content
@@ -586,10 +733,46 @@ api_testing_content = html.Div([
 
     dbc.Button("Send Request", id="send-api-request", color="primary", className="mb-4"),
 
-    html.Div([
-        html.H5("Response", className="mb-3"),
-        html.Pre(id="api-response", className="bg-light p-3 rounded")
-    ])
+    html.Div(id="api-response"),
+
+    html.Hr(className="my-4"),
+    html.H5("Load Test", className="mb-3"),
+    dbc.Row([
+        dbc.Col([
+            dbc.Label("Mode"),
+            dbc.RadioItems(
+                id="api-load-mode",
+                options=[
+                    {"label": "N requests", "value": "count"},
+                    {"label": "Fixed rate", "value": "rate"},
+                ],
+                value="count",
+                inline=True
+            ),
+        ], width=4),
+        dbc.Col([
+            dbc.Label("Requests"),
+            dbc.Input(id="api-load-requests", type="number", value=500, min=1, max=100000),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("Concurrency"),
+            dbc.Input(id="api-load-concurrency", type="number", value=20, min=1, max=500),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("Rate (req/s)"),
+            dbc.Input(id="api-load-rate", type="number", value=50, min=1, max=5000),
+        ], width=2),
+        dbc.Col([
+            dbc.Label("Duration (s)"),
+            dbc.Input(id="api-load-duration", type="number", value=10, min=1, max=300),
+        ], width=2),
+    ], className="mb-3"),
+
+    dbc.Button("Start Load Test", id="api-load-start", color="primary", className="mb-4 me-2"),
+    dbc.Button("Stop", id="api-load-stop", color="secondary", className="mb-4"),
+    dcc.Store(id="api-load-id"),
+    dcc.Interval(id="api-load-interval", interval=500, disabled=True),
+    html.Div(id="api-load-results")
 ], className="animate-fade-in p-4")
 
 # Main Layout
@@ -601,6 +784,17 @@ app.layout = html.Div([
     ], className="main-container")
 ])
 
+# Callback recording for benchmarks/dash_load_test.py
+# Set DASH_RECORD_FILE=path.jsonl, click through the dashboard, then replay it
+DASH_RECORD_FILE = os.getenv('DASH_RECORD_FILE')
+
+if DASH_RECORD_FILE:
+    @app.server.before_request
+    def record_callback_payload():
+        if request.method == 'POST' and request.path.endswith('/_dash-update-component'):
+            with open(DASH_RECORD_FILE, 'a') as f:
+                f.write(json.dumps({"t": time.time(), "body": request.get_json(silent=True)}) + "\n")
+
 # ========================================
 # Callbacks
 # ========================================
@@ -633,6 +827,8 @@ def render_data_entry_form(active_tab):
         return product_form
     elif active_tab == "add-user":
         return user_form
+    elif active_tab == "create-order":
+        return order_form
     return html.Div()
 
 # Update dashboard metrics
@@ -646,12 +842,10 @@ def render_data_entry_form(active_tab):
 def update_metrics(n):
     try:
         with LakebaseConnection() as db:
-            users = db.execute_query("SELECT COUNT(*) as count FROM ecommerce.users")[0]['count']
-            products = db.execute_query("SELECT COUNT(*) as count FROM ecommerce.products")[0]['count']
-            orders = db.execute_query("SELECT COUNT(*) as count FROM ecommerce.orders")[0]['count']
-            revenue = db.execute_query(
-                "SELECT COALESCE(SUM(total_amount), 0) as revenue FROM ecommerce.orders WHERE status='completed'"
-            )[0]['revenue']
+            users = db.execute_query(queries.USERS_COUNT)[0]['count']
+            products = db.execute_query(queries.PRODUCTS_COUNT)[0]['count']
+            orders = db.execute_query(queries.ORDERS_COUNT)[0]['count']
+            revenue = db.execute_query(queries.COMPLETED_REVENUE)[0]['revenue']
 
             return f"{users:,}", f"{products:,}", f"{orders:,}", f"${float(revenue):,.2f}"
     except Exception as e:
@@ -665,32 +859,11 @@ def update_metrics(n):
 def update_inventory_chart(n):
     try:
         with LakebaseConnection() as db:
-            results = db.execute_query("""
-                SELECT name, stock_quantity, category
-                FROM ecommerce.products
-                ORDER BY stock_quantity DESC
-                LIMIT 10
-            """)
+            results = db.execute_query(queries.TOP_STOCK_PRODUCTS)
 
             if results:
-                df = pd.DataFrame(results)
-                fig = px.bar(
-                    df,
-                    x='name',
-                    y='stock_quantity',
-                    color='category',
-                    title="",
-                    labels={'stock_quantity': 'Stock Quantity', 'name': 'Product'},
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig.update_layout(
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    font=dict(family="Arial, sans-serif"),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=True, gridcolor='#f0f0f0')
-                )
-                return fig
+                with tracing.span("plotly.figure", rows=len(results)):
+                    return inventory_figure(results)
     except Exception as e:
         pass
 
@@ -704,36 +877,11 @@ def update_inventory_chart(n):
 def update_revenue_chart(n):
     try:
         with LakebaseConnection() as db:
-            results = db.execute_query("""
-                SELECT
-                    DATE(order_date) as date,
-                    SUM(total_amount) as daily_revenue
-                FROM ecommerce.orders
-                WHERE status = 'completed'
-                GROUP BY DATE(order_date)
-                ORDER BY date DESC
-                LIMIT 30
-            """)
+            results = db.execute_query(queries.DAILY_REVENUE)
 
             if results:
-                df = pd.DataFrame(results)
-                fig = px.line(
-                    df,
-                    x='date',
-                    y='daily_revenue',
-                    title="",
-                    labels={'daily_revenue': 'Revenue ($)', 'date': 'Date'},
-                    line_shape='spline'
-                )
-                fig.update_traces(line_color='#667eea', line_width=3)
-                fig.update_layout(
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    font=dict(family="Arial, sans-serif"),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=True, gridcolor='#f0f0f0')
-                )
-                return fig
+                with tracing.span("plotly.figure", rows=len(results)):
+                    return revenue_figure(results)
     except Exception as e:
         pass
 
@@ -747,27 +895,12 @@ def update_revenue_chart(n):
 def update_orders_table(n):
     try:
         with LakebaseConnection() as db:
-            results = db.execute_query("""
-                SELECT
-                    o.order_id,
-                    u.username,
-                    o.order_date,
-                    o.status,
-                    o.total_amount
-                FROM ecommerce.orders o
-                JOIN ecommerce.users u ON o.user_id = u.user_id
-                ORDER BY o.order_date DESC
-                LIMIT 10
-            """)
+            results = db.execute_query(queries.RECENT_ORDERS)
 
             if results:
-                df = pd.DataFrame(results)
-                df['order_date'] = pd.to_datetime(df['order_date']).dt.strftime('%Y-%m-%d %H:%M')
-                df['total_amount'] = df['total_amount'].apply(lambda x: f"${float(x):.2f}")
-
                 return dash_table.DataTable(
-                    data=df.to_dict('records'),
-                    columns=[{"name": i.replace('_', ' ').title(), "id": i} for i in df.columns],
+                    data=orders_records(results),
+                    columns=[{"name": i.replace('_', ' ').title(), "id": i} for i in results[0]],
                     style_cell={'textAlign': 'left', 'padding': '12px'},
                     style_header={
                         'backgroundColor': '#667eea',
@@ -806,11 +939,10 @@ def add_product(n_clicks, name, description, price, stock, category, tags):
         tags_array = [tag.strip() for tag in tags.split(',')] if tags else []
 
         with LakebaseConnection() as db:
-            db.execute_query("""
-                INSERT INTO ecommerce.products
-                (name, description, price, stock_quantity, category, tags)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (name, description, price, stock, category, tags_array))
+            db.execute_query(
+                queries.INSERT_PRODUCT,
+                (name, description, price, stock, category, tags_array)
+            )
 
         return dbc.Alert("✅ Product added successfully!", color="success")
     except Exception as e:
@@ -834,16 +966,446 @@ def add_user(n_clicks, email, username, fullname, role):
         metadata = json.dumps({"role": role})
 
         with LakebaseConnection() as db:
-            db.execute_query("""
-                INSERT INTO ecommerce.users
-                (email, username, full_name, metadata)
-                VALUES (%s, %s, %s, %s::jsonb)
-            """, (email, username, fullname, metadata))
+            db.execute_query(queries.INSERT_USER, (email, username, fullname, metadata))
 
         return dbc.Alert("✅ User added successfully!", color="success")
     except Exception as e:
         return dbc.Alert(f"Error: {str(e)}", color="danger")
 
+# Create order callback
+@app.callback(
+    Output("order-form-feedback", "children"),
+    Input("submit-order", "n_clicks"),
+    [State("order-user-id", "value"),
+     State("order-items", "value"),
+     State("order-payment-method", "value"),
+     State("order-street", "value"),
+     State("order-city", "value"),
+     State("order-state", "value"),
+     State("order-zip", "value")],
+    prevent_initial_call=True
+)
+def add_order(n_clicks, user_id, items_text, payment_method, street, city, state, zip_code):
+    if not user_id or not items_text:
+        return dbc.Alert("Please fill in required fields (User ID and Items)", color="danger")
+
+    try:
+        items = parse_order_items(items_text)
+    except ValueError as e:
+        return dbc.Alert(str(e), color="danger")
+
+    address = {"street": street, "city": city, "state": state, "zip": zip_code}
+    shipping_address = {k: v for k, v in address.items() if v} or None
+
+    try:
+        with LakebaseConnection() as db:
+            order = create_order(db, int(user_id), items, shipping_address, payment_method)
+
+        return dbc.Alert(
+            f"✅ Order #{order['order_id']} created (total ${float(order['total_amount']):,.2f})",
+            color="success"
+        )
+    except Exception as e:
+        if is_insufficient_stock(e):
+            return dbc.Alert(f"Out of stock: {e.diag.message_primary}", color="warning")
+        return dbc.Alert(f"Error: {str(e)}", color="danger")
+
+# Load sample query into the editor
+@app.callback(
+    Output("custom-query", "value"),
+    Input("sample-queries", "value")
+)
+def load_sample_query(sample):
+    if sample not in queries.SAMPLE_QUERIES:
+        raise PreventUpdate
+    return queries.SAMPLE_QUERIES[sample]["sql"].strip()
+
+def run_custom_query(query):
+    """Run a Query Builder query; returns (rows, row count), or (None, rows affected)."""
+    with LakebaseConnection() as db:
+        results = db.execute_query(query)
+    if not isinstance(results, list):
+        return None, results
+    return results, len(results)
+
+# Execute custom query
+@app.callback(
+    [Output("query-results", "children"),
+     Output("download-csv", "disabled")],
+    Input("execute-query", "n_clicks"),
+    State("custom-query", "value"),
+    prevent_initial_call=True
+)
+def execute_custom_query(n_clicks, query):
+    if not query or not query.strip():
+        return dbc.Alert("Please enter a SQL query", color="danger"), True
+
+    try:
+        rows, count = run_custom_query(query)
+    except Exception as e:
+        return dbc.Alert(f"Query error: {str(e)}", color="danger"), True
+
+    if rows is None:
+        return dbc.Alert(f"✅ Query executed successfully. {count} row(s) affected.", color="success"), True
+    if not rows:
+        return dbc.Alert("Query executed successfully but returned no results.", color="info"), True
+
+    return html.Div([
+        dbc.Alert(f"✅ Query executed successfully. Found {count} rows.", color="success"),
+        dash_table.DataTable(
+            data=datatable_records(rows),
+            columns=[{"name": i, "id": i} for i in rows[0]],
+            page_size=20,
+            style_table={'overflowX': 'auto'},
+            style_cell={'textAlign': 'left', 'padding': '8px'},
+            style_header={'backgroundColor': '#667eea', 'color': 'white', 'fontWeight': 'bold'}
+        )
+    ]), False
+
+# Export query results as CSV
+@app.callback(
+    Output("download-dataframe-csv", "data"),
+    Input("download-csv", "n_clicks"),
+    State("custom-query", "value"),
+    prevent_initial_call=True
+)
+def download_query_csv(n_clicks, query):
+    if not query or not query.strip():
+        raise PreventUpdate
+    rows, _ = run_custom_query(query)
+    if rows is None:
+        raise PreventUpdate
+    import pandas as pd
+    with tracing.span("pandas.dataframe", rows=len(rows)):
+        df = convert_for_datatable(pd.DataFrame(rows))
+    return dcc.send_data_frame(
+        df.to_csv,
+        f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        index=False
+    )
+
+def render_search_results(results, score_key, score_label):
+    """Render search hits as result cards."""
+    return [
+        dbc.Card(dbc.CardBody(dbc.Row([
+            dbc.Col([
+                html.H6(f"{i}. {row['name']}", className="mb-1"),
+                html.Small(row['category'] or "", className="text-muted"),
+                html.P(row['description'] or "", className="mb-0"),
+            ], width=8),
+            dbc.Col(html.Div([html.Small(score_label), html.H5(score_key(row))]), width=2),
+            dbc.Col(html.Div([html.Small("Price"), html.H5(f"${float(row['price']):.2f}")]), width=2),
+        ])), className="mb-2")
+        for i, row in enumerate(results, 1)
+    ]
+
+# Vector search
+@app.callback(
+    Output("vector-search-results", "children"),
+    Input("execute-vector-search", "n_clicks"),
+    [State("vector-search-query", "value"),
+     State("vector-top-k", "value"),
+     State("vector-ef-search", "value"),
+     State("vector-search-type", "value")],
+    prevent_initial_call=True
+)
+def execute_vector_search(n_clicks, query, top_k, ef_search, search_type):
+    if not query or not query.strip():
+        return dbc.Alert("Please enter a search query", color="warning")
+    top_k = int(top_k or 5)
+    ef_search = int(ef_search or DEFAULT_EF_SEARCH)
+    try:
+        with LakebaseConnection() as db:
+            if search_type == "traditional":
+                results, latency_ms = text_search.traditional_search(db, query, top_k)
+            elif search_type == "hybrid":
+                # Each ranking contributes ef_search candidates to the fusion
+                results, timings = vector_search.hybrid_search(db, query, top_k, ef_search)
+            else:
+                results, latency_ms = vector_search.search(db, query, top_k, ef_search)
+    except Exception as e:
+        return dbc.Alert(f"Search error: {str(e)}", color="danger")
+
+    if not results:
+        return dbc.Alert("No matching products found. Run `python embedding_backfill.py` "
+                         "if products have no embeddings yet.", color="info")
+
+    if search_type == "hybrid":
+        stages = " · ".join(
+            f"{label} {timings[key]:.1f} ms"
+            for key, label in (("embed_ms", "Embed"), ("full_text_ms", "Full-text"),
+                               ("vector_ms", "Vector"), ("fusion_ms", "Fusion"),
+                               ("round_trip_ms", "Round trip"))
+            if key in timings
+        )
+        return html.Div([
+            dbc.Alert(f"Found {len(results)} results ({stages})", color="success"),
+            *render_search_results(results, lambda row: f"{row['score']:.4f}", "RRF Score")
+        ])
+
+    if search_type == "traditional":
+        return html.Div([
+            dbc.Alert(f"Found {len(results)} results in {latency_ms:.1f} ms", color="success"),
+            *render_search_results(results, lambda row: f"{row['score']:.2f}", "Match")
+        ])
+
+    return html.Div([
+        dbc.Alert(f"Found {len(results)} results in {latency_ms:.1f} ms (ef_search={ef_search})", color="success"),
+        *render_search_results(results, lambda row: f"{row['similarity']:.2%}", "Similarity")
+    ])
+
+# Type-ahead suggestions under the search box
+@app.callback(
+    Output("vector-typeahead", "children"),
+    Input("vector-search-query", "value"),
+    prevent_initial_call=True
+)
+def update_typeahead(value):
+    try:
+        suggestions, _ = text_search.typeahead(LakebaseConnection, value)
+    except Exception:
+        return []
+    # Nothing to suggest once the box holds a full product name
+    if suggestions and suggestions[0]['name'].lower() == text_search.normalize(value):
+        return []
+    return [
+        dbc.ListGroupItem(
+            [row['name'], html.Small(f"  {row['category'] or ''}", className="text-muted")],
+            id={"type": "typeahead-item", "index": row['product_id']},
+            action=True
+        )
+        for row in suggestions
+    ]
+
+# Pick a suggestion
+@app.callback(
+    [Output("vector-search-query", "value"),
+     Output("vector-typeahead", "children", allow_duplicate=True)],
+    Input({"type": "typeahead-item", "index": ALL}, "n_clicks"),
+    State({"type": "typeahead-item", "index": ALL}, "children"),
+    prevent_initial_call=True
+)
+def select_typeahead(n_clicks, items):
+    if not any(n_clicks):
+        raise PreventUpdate
+    ids = [item["id"]["index"] for item in ctx.inputs_list[0]]
+    return items[ids.index(ctx.triggered_id["index"])][0], []
+
+# Type-ahead endpoint for other clients: GET /api/typeahead?q=lapt&k=8
+@app.server.route("/api/typeahead")
+def typeahead_endpoint():
+    start = time.perf_counter()
+    k = min(max(request.args.get("k", text_search.TYPEAHEAD_LIMIT, type=int), 1), 50)
+    try:
+        suggestions, cached = text_search.typeahead(LakebaseConnection, request.args.get("q", ""), k)
+    except Exception as e:
+        # Database or pool unavailable: a JSON error clients can retry on
+        return jsonify({"error": f"Type-ahead unavailable: {type(e).__name__}"}), 503
+    return jsonify({
+        "query": request.args.get("q", ""),
+        "suggestions": suggestions,
+        "cached": cached,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
+
+# Recall/latency trade-off across ef_search values
+@app.callback(
+    Output("vector-tradeoff-results", "children"),
+    Input("vector-tradeoff", "n_clicks"),
+    [State("vector-search-query", "value"),
+     State("vector-top-k", "value")],
+    prevent_initial_call=True
+)
+def measure_vector_tradeoff(n_clicks, query, top_k):
+    if not query or not query.strip():
+        return dbc.Alert("Please enter a search query", color="warning")
+
+    try:
+        with LakebaseConnection() as db:
+            points, exact_ms = vector_search.recall_tradeoff(db, query, int(top_k or 5))
+    except Exception as e:
+        return dbc.Alert(f"Search error: {str(e)}", color="danger")
+
+    fig = go.Figure(go.Scatter(
+        x=[p['latency_ms'] for p in points],
+        y=[p['recall'] for p in points],
+        text=[f"ef_search={p['ef_search']}" for p in points],
+        mode='lines+markers+text',
+        textposition='top left',
+        line=dict(color='#667eea', width=3)
+    ))
+    fig.add_vline(x=exact_ms, line_dash='dash', annotation_text=f"exact scan {exact_ms:.1f} ms")
+    fig.update_layout(
+        xaxis_title="Latency (ms)",
+        yaxis_title=f"Recall@{int(top_k or 5)}",
+        yaxis=dict(range=[0, 1.05], tickformat='.0%', showgrid=True, gridcolor='#f0f0f0'),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, sans-serif")
+    )
+    return dcc.Graph(figure=fig)
+
+# API request through the pooled client
+@app.callback(
+    Output("api-response", "children"),
+    Input("send-api-request", "n_clicks"),
+    State("api-base-url", "value"),
+    State("api-method", "value"),
+    State("api-endpoint", "value"),
+    State("api-params", "value"),
+    State("api-body", "value"),
+    prevent_initial_call=True
+)
+def send_api_request(n_clicks, base_url, method, endpoint, params, body):
+    if not base_url:
+        return dbc.Alert("Please enter an API base URL", color="warning")
+    try:
+        result = api_client.send(method, base_url, endpoint, params, body)
+    except ValueError as e:
+        return dbc.Alert(f"Invalid request: {str(e)}", color="warning")
+    except Exception as e:
+        return dbc.Alert(f"Request failed: {type(e).__name__}: {str(e)}", color="danger")
+
+    timings = result['timings']
+    fig = go.Figure([
+        go.Bar(y=["Request"], x=[timings[key]], name=label, orientation='h',
+               hovertemplate=f"{label}: %{{x:.2f}} ms<extra></extra>")
+        for key, label in api_client.PHASE_LABELS.items()
+    ])
+    fig.update_layout(
+        barmode='stack',
+        height=160,
+        margin=dict(l=10, r=10, t=10, b=30),
+        xaxis_title="Milliseconds",
+        yaxis=dict(showticklabels=False),
+        legend=dict(orientation='h', y=1.3),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, sans-serif")
+    )
+
+    body_text = (json.dumps(result['json'], indent=2, default=str)
+                 if result['json'] is not None else result['body'])
+    color = "success" if result['status'] < 400 else "danger"
+    return html.Div([
+        html.H5("Response", className="mb-3"),
+        dbc.Alert(
+            f"{result['status']} {result['reason']} · {timings['total_ms']:.1f} ms · "
+            f"{api_client.format_size(result['wire_bytes'])} on the wire, "
+            f"{api_client.format_size(result['body_bytes'])} decoded "
+            f"({result['content_encoding']}, {result['compression_ratio']:.1f}x) · "
+            f"{'reused' if result['reused_connection'] else 'new'} connection",
+            color=color
+        ),
+        dcc.Graph(figure=fig, config={'displayModeBar': False}),
+        html.Pre(body_text[:20000], className="bg-light p-3 rounded")
+    ])
+
+# Load test start/stop
+@app.callback(
+    Output("api-load-id", "data"),
+    Output("api-load-interval", "disabled"),
+    Output("api-load-results", "children"),
+    Input("api-load-start", "n_clicks"),
+    Input("api-load-stop", "n_clicks"),
+    State("api-load-id", "data"),
+    State("api-base-url", "value"),
+    State("api-method", "value"),
+    State("api-endpoint", "value"),
+    State("api-params", "value"),
+    State("api-body", "value"),
+    State("api-load-mode", "value"),
+    State("api-load-requests", "value"),
+    State("api-load-concurrency", "value"),
+    State("api-load-rate", "value"),
+    State("api-load-duration", "value"),
+    prevent_initial_call=True
+)
+def control_load_test(start_clicks, stop_clicks, test_id, base_url, method, endpoint, params, body,
+                      mode, requests_count, concurrency, rate, duration):
+    if ctx.triggered_id == "api-load-stop":
+        test = api_client.get_load_test(test_id) if test_id else None
+        if test is None:
+            raise PreventUpdate
+        test.stop()
+        return test_id, False, dash.no_update
+
+    if not base_url:
+        return test_id, True, dbc.Alert("Please enter an API base URL", color="warning")
+    try:
+        test_id = api_client.start_load_test(
+            method, base_url, endpoint, params, body,
+            requests=int(requests_count or 500),
+            concurrency=int(concurrency or 20),
+            rate=float(rate or 50) if mode == "rate" else None,
+            duration=float(duration or 10),
+        )
+    except ValueError as e:
+        return test_id, True, dbc.Alert(f"Invalid request: {str(e)}", color="warning")
+    return test_id, False, dbc.Alert("Load test starting...", color="info")
+
+# Live load test results, polled until the test finishes
+@app.callback(
+    Output("api-load-results", "children", allow_duplicate=True),
+    Output("api-load-interval", "disabled", allow_duplicate=True),
+    Input("api-load-interval", "n_intervals"),
+    State("api-load-id", "data"),
+    prevent_initial_call=True
+)
+def update_load_test(n_intervals, test_id):
+    test = api_client.get_load_test(test_id) if test_id else None
+    if test is None:
+        return dbc.Alert("Load test not found (finished tests are kept for a while only)", color="warning"), True
+    result = test.snapshot()
+    latency = result['latency_ms']
+
+    if result['done']:
+        status = "Stopped" if result['stopped'] else "Finished"
+        color = "success" if not result['error_count'] else "warning"
+    else:
+        status, color = "Running", "info"
+    target = f" (target {result['target_rps']:g})" if result['target_rps'] else ""
+    summary = dbc.Alert(
+        f"{status}: {result['completed']:,} / {result['planned']:,} requests in {result['elapsed_s']:.1f} s · "
+        f"{result['requests_per_sec']:,.1f} req/s{target} · {result['error_count']:,} errors",
+        color=color
+    )
+
+    percentiles = dbc.Row([
+        dbc.Col(html.Div([
+            html.Div(label, className="text-muted small"),
+            html.H4(f"{latency[key]:.1f} ms")
+        ], className="text-center"))
+        for key, label in (("p50", "p50"), ("p90", "p90"), ("p95", "p95"), ("p99", "p99"), ("max", "Max"))
+    ], className="mb-3")
+
+    fig = go.Figure(go.Bar(
+        x=[label for label, _ in result['histogram']],
+        y=[count for _, count in result['histogram']],
+        marker_color='#667eea'
+    ))
+    fig.update_layout(
+        xaxis_title="Latency",
+        yaxis_title="Requests",
+        height=300,
+        margin=dict(l=40, r=10, t=10, b=40),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, sans-serif")
+    )
+
+    children = [summary, percentiles, dcc.Graph(figure=fig, config={'displayModeBar': False})]
+    if result['errors']:
+        children.append(dbc.Table(
+            [html.Thead(html.Tr([html.Th("Error"), html.Th("Count")]))] +
+            [html.Tbody([
+                html.Tr([html.Td(error), html.Td(f"{count:,}")])
+                for error, count in sorted(result['errors'].items(), key=lambda item: -item[1])
+            ])],
+            bordered=True, size="sm"
+        ))
+    return html.Div(children), result['done']
+
 # ========================================
 # Run the app
 # ========================================
@@ -855,4 +1417,4 @@ if __name__ == '__main__':
     print(f"Starting Lakebase Training Dashboard on port {port}")
     print(f"Database: {PGHOST} / {PGDATABASE}")
     print(f"User: {PGUSER}")
-    app.run_server(debug=False, host='0.0.0.0', port=port)
+    app.run(debug=False, host='0.0.0.0', port=port)
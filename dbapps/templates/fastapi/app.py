@@ -9,22 +9,389 @@ Key Features:
 - ✅ Environment variable support
 - ✅ Modern async API ready
 - ✅ Auto-generated OpenAPI docs
+- ✅ Lakebase data API over ecommerce.products/orders/users:
+     async connection pool opened in the app lifespan, keyset pagination,
+     field selection, filters pushed down into SQL, NDJSON streaming,
+     ETag/Last-Modified conditional GETs keyed on table change versions
+- ✅ orjson responses and brotli/gzip compression above COMPRESS_MIN_SIZE
+- ✅ Prometheus /metrics: pool occupancy and checkout waits, request latency
+     per route, conditional-GET hit ratio, OAuth refreshes, DB errors
 
 Author: Databricks Template
 Date: 2025-11-22
 """
 
+import json
 import os
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+import psycopg
+from psycopg import sql
+from psycopg_pool import AsyncConnectionPool
 import uvicorn
 
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    orjson = None
+    DefaultResponse = JSONResponse
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+
 # ========================================
 # Configuration
 # ========================================
 APP_TITLE = os.environ.get('APP_TITLE', 'Databricks FastAPI App')
 DEBUG_MODE = os.environ.get('DEBUG', 'false').lower() == 'true'
 
+# Lakebase connection (PGUSER must match the OAuth token identity)
+PGHOST = os.environ.get('PGHOST')
+PGUSER = os.environ.get('PGUSER')
+PGDATABASE = os.environ.get('PGDATABASE', 'databricks_postgres')
+PGPORT = os.environ.get('PGPORT', '5432')
+PGSSLMODE = os.environ.get('PGSSLMODE', 'require')
+# Local development / benchmarking only: a static password skips OAuth
+PGPASSWORD = os.environ.get('PGPASSWORD')
+
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+
+# Where table change versions come from: "triggers" reads
+# ecommerce.table_versions (see setup_database.sql); "stats" sums the
+# pg_stat_user_tables write counters, which needs no schema changes but can
+# lag commits by the statistics flush interval and has no Last-Modified
+VERSION_SOURCE = os.environ.get('VERSION_SOURCE', 'triggers')
+# Seconds browsers and intermediary caches may reuse a response before revalidating
+CACHE_MAX_AGE = int(os.environ.get('CACHE_MAX_AGE', '5'))
+# Smallest response body, in bytes, worth compressing (brotli if the client
+# accepts it and brotli-asgi is installed, gzip otherwise)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip while streaming NDJSON
+STREAM_BATCH_ROWS = 2000
+
+# ========================================
+# Metrics (served at /metrics when prometheus_client is installed)
+# ========================================
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+if prometheus_client:
+    REQUEST_DURATION = Histogram("http_request_seconds", "Request latency", ["route", "status"],
+                                 buckets=LATENCY_BUCKETS)
+    POOL_WAIT = Histogram("lakebase_pool_wait_seconds", "Time to check out a pooled connection",
+                          buckets=LATENCY_BUCKETS)
+    POOL_CONNECTIONS = Gauge("lakebase_pool_connections", "Connection pool connections by state", ["state"])
+    POOL_WAITING = Gauge("lakebase_pool_requests_waiting", "Callers waiting for a pooled connection")
+    DB_ERRORS = Counter("lakebase_db_errors_total", "Requests failed by a database error", ["error"])
+    CACHE_REQUESTS = Counter("lakebase_cache_requests_total",
+                             "Data API requests answered by a 304 (hit) or a full response (miss)",
+                             ["cache", "result"])
+    OAUTH_REFRESHES = Counter("lakebase_oauth_refresh_total", "OAuth token refreshes", ["result"])
+    OAUTH_REFRESH_DURATION = Histogram("lakebase_oauth_refresh_seconds", "OAuth token refresh time",
+                                       buckets=LATENCY_BUCKETS)
+
+# ========================================
+# Database
+# ========================================
+_workspace_client = None
+_oauth_token = None
+_oauth_token_time = 0
+
+
+def get_password():
+    """Return PGPASSWORD, or a Databricks OAuth token refreshed every 15 minutes."""
+    global _workspace_client, _oauth_token, _oauth_token_time
+    if PGPASSWORD is not None:
+        return PGPASSWORD
+    if _oauth_token is None or time.time() - _oauth_token_time > 900:
+        start, result = time.perf_counter(), "error"
+        try:
+            from databricks import sdk
+            if _workspace_client is None:
+                _workspace_client = sdk.WorkspaceClient()
+            _oauth_token = _workspace_client.config.oauth_token().access_token
+            _oauth_token_time = time.time()
+            result = "success"
+        finally:
+            if prometheus_client:
+                OAUTH_REFRESHES.labels(result).inc()
+                OAUTH_REFRESH_DURATION.observe(time.perf_counter() - start)
+    return _oauth_token
+
+
+class MeteredConnectionPool(AsyncConnectionPool):
+    """AsyncConnectionPool that records checkout waits and occupancy for /metrics."""
+
+    async def getconn(self, timeout=None):
+        start = time.perf_counter()
+        conn = await super().getconn(timeout)
+        if prometheus_client:
+            POOL_WAIT.observe(time.perf_counter() - start)
+            self.record_state()
+        return conn
+
+    async def putconn(self, conn):
+        await super().putconn(conn)
+        if prometheus_client:
+            self.record_state()
+
+    def record_state(self):
+        stats = self.get_stats()
+        POOL_CONNECTIONS.labels("size").set(stats["pool_size"])
+        POOL_CONNECTIONS.labels("available").set(stats["pool_available"])
+        POOL_CONNECTIONS.labels("in_use").set(stats["pool_size"] - stats["pool_available"])
+        POOL_CONNECTIONS.labels("max").set(stats["pool_max"])
+        POOL_WAITING.set(stats["requests_waiting"])
+
+
+class LakebaseConnection(psycopg.AsyncConnection):
+    """Async connection that supplies a current OAuth token each time the pool connects."""
+
+    @classmethod
+    async def connect(cls, conninfo="", **kwargs):
+        kwargs["password"] = get_password()
+        return await super().connect(conninfo, **kwargs)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # One pool per worker process, opened once and shared by every request
+    app.state.pool = MeteredConnectionPool(
+        kwargs={
+            "host": PGHOST,
+            "user": PGUSER,
+            "dbname": PGDATABASE,
+            "port": PGPORT,
+            "sslmode": PGSSLMODE,
+            "application_name": APP_TITLE,
+        },
+        connection_class=LakebaseConnection,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        # Recycle connections well before their OAuth token would expire
+        max_lifetime=45 * 60,
+        open=False,
+    )
+    await app.state.pool.open()
+    yield
+    await app.state.pool.close()
+
+
+# Each resource lists the columns clients may select and filter on, as
+# (SQL expression, type). Only these expressions ever reach the SQL text.
+RESOURCES = {
+    "products": {
+        "from": "ecommerce.products p",
+        "key": "product_id",
+        # Tables whose changes alter the representation (for ETags)
+        "tables": ["products", "product_stock_slots"],
+        "columns": {
+            "product_id": ("p.product_id", "integer"),
+            "name": ("p.name", "text"),
+            "description": ("p.description", "text"),
+            "price": ("p.price", "numeric"),
+            # Slotted products keep their stock in product_stock_slots
+            "stock_quantity": ("COALESCE((SELECT sum(s.quantity) FROM ecommerce.product_stock_slots s "
+                               "WHERE s.product_id = p.product_id), p.stock_quantity)::integer", "integer"),
+            "category": ("p.category", "text"),
+            "tags": ("p.tags", "text[]"),
+            "created_at": ("p.created_at", "timestamptz"),
+            "updated_at": ("p.updated_at", "timestamptz"),
+        },
+    },
+    "orders": {
+        "from": "ecommerce.orders o",
+        "key": "order_id",
+        "tables": ["orders"],
+        "columns": {
+            "order_id": ("o.order_id", "integer"),
+            "user_id": ("o.user_id", "integer"),
+            "order_date": ("o.order_date", "timestamptz"),
+            "status": ("o.status", "text"),
+            "total_amount": ("o.total_amount", "numeric"),
+            "shipping_address": ("o.shipping_address", "jsonb"),
+            "payment_method": ("o.payment_method", "text"),
+        },
+    },
+    "users": {
+        "from": "ecommerce.users u",
+        "key": "user_id",
+        "tables": ["users"],
+        "columns": {
+            "user_id": ("u.user_id", "integer"),
+            "email": ("u.email", "text"),
+            "username": ("u.username", "text"),
+            "full_name": ("u.full_name", "text"),
+            "is_active": ("u.is_active", "boolean"),
+            "created_at": ("u.created_at", "timestamptz"),
+            "updated_at": ("u.updated_at", "timestamptz"),
+            "metadata": ("u.metadata", "jsonb"),
+            "preferences": ("u.preferences", "jsonb"),
+        },
+    },
+}
+
+# PostgREST-style filters: ?price=gte.10&category=in.Books,Sports&full_name=is.null
+FILTER_OPERATORS = {
+    "eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+    "like": "LIKE", "ilike": "ILIKE",
+}
+RESERVED_PARAMS = {"fields", "limit", "after", "order", "format"}
+
+
+def parse_fields(resource, fields):
+    columns = resource["columns"]
+    if not fields:
+        return list(columns)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def parse_filters(resource, query_params):
+    """Translate filter query parameters into SQL conditions and parameters."""
+    conditions, params = [], []
+    for name, value in query_params.multi_items():
+        if name in RESERVED_PARAMS:
+            continue
+        if name not in resource["columns"]:
+            raise HTTPException(400, f"Unknown filter column '{name}'")
+        expression, pg_type = resource["columns"][name]
+        column = sql.SQL(expression)
+        op, _, operand = value.partition(".")
+        if op == "is" and (operand == "null" or operand in ("true", "false") and pg_type == "boolean"):
+            conditions.append(sql.SQL("{} IS {}").format(column, sql.SQL(operand.upper())))
+        elif op == "is":
+            allowed = "is.null, is.true or is.false" if pg_type == "boolean" else "is.null"
+            raise HTTPException(400, f"Unsupported filter '{value}' on '{name}'; use {allowed}")
+        elif op == "cs" and pg_type.endswith("[]"):
+            # Array contains all of the comma-separated values
+            conditions.append(sql.SQL("{} @> %s::{}").format(column, sql.SQL(pg_type)))
+            params.append(operand.split(","))
+        elif pg_type == "jsonb" or pg_type.endswith("[]"):
+            raise HTTPException(400, f"Column '{name}' only supports is.null and cs. filters")
+        elif op == "in":
+            conditions.append(sql.SQL("{} = ANY(%s::{}[])").format(column, sql.SQL(pg_type)))
+            params.append(operand.split(","))
+        elif op in ("like", "ilike") and pg_type != "text":
+            raise HTTPException(400, f"{op}. filters only apply to text columns, not '{name}'")
+        elif op in FILTER_OPERATORS:
+            conditions.append(sql.SQL("{} {} %s::{}").format(column, sql.SQL(FILTER_OPERATORS[op]), sql.SQL(pg_type)))
+            params.append(operand)
+        else:
+            raise HTTPException(400, f"Unsupported filter '{value}' on '{name}'")
+    return conditions, params
+
+
+def build_query(resource, fields, conditions, params, order="asc", after=None, limit=None):
+    """SELECT one JSON document per row, plus the key for keyset pagination.
+
+    Postgres builds the JSON, so rows go straight to the client without being
+    decoded and re-encoded in Python.
+    """
+    columns = resource["columns"]
+    key = sql.SQL(columns[resource["key"]][0])
+    document = sql.SQL("json_build_object({})::text").format(sql.SQL(", ").join(
+        sql.SQL("{}, {}").format(sql.Literal(name), sql.SQL(columns[name][0])) for name in fields
+    ))
+    conditions, params = list(conditions), list(params)
+    descending = order == "desc"
+    if after is not None:
+        # Keyset pagination: continue after the last key of the previous page
+        conditions.append(sql.SQL("{} {} %s").format(key, sql.SQL("<" if descending else ">")))
+        params.append(after)
+    query = sql.SQL("SELECT {document}, {key} FROM {source}{where} ORDER BY {key} {direction}").format(
+        document=document,
+        key=key,
+        source=sql.SQL(resource["from"]),
+        where=sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL(""),
+        direction=sql.SQL("DESC" if descending else "ASC"),
+    )
+    if limit is not None:
+        query += sql.SQL(" LIMIT %s")
+        params.append(limit)
+    return query, params
+
+
+VERSION_QUERIES = {
+    "triggers": """
+        SELECT sum(version)::bigint AS version, max(changed_at) AS changed_at
+        FROM ecommerce.table_versions
+        WHERE table_name = ANY(%s)
+    """,
+    "stats": """
+        SELECT sum(n_tup_ins + n_tup_upd + n_tup_del)::bigint AS version, NULL::timestamptz AS changed_at
+        FROM pg_stat_user_tables
+        WHERE schemaname = 'ecommerce' AND relname = ANY(%s)
+    """,
+}
+
+
+async def table_version(conn, resource, variant):
+    """Return (etag, last_modified) for the resource's current data.
+
+    Read it before the main query: with READ COMMITTED the data can then
+    only be newer than the version, which costs at most one extra download,
+    never a stale 304.
+    """
+    version, changed_at = await (await conn.execute(
+        VERSION_QUERIES[VERSION_SOURCE], (resource["tables"],)
+    )).fetchone()
+    return f'W/"{"-".join(resource["tables"])}.{version}.{variant}"', changed_at
+
+
+def not_modified(request, etag, last_modified):
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: ignore W/ prefixes
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cache_headers(etag, last_modified):
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def get_resource(name):
+    if name not in RESOURCES:
+        raise HTTPException(404, f"Unknown resource '{name}'")
+    return RESOURCES[name]
+
+
 # ========================================
 # Initialize FastAPI
 # ========================================
@@ -33,12 +400,46 @@ app = FastAPI(
     description="A production-ready FastAPI template for Databricks Apps",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
+# Data API bodies are rendered by Postgres and passed through as-is; only
+# compression is applied here. Streams are compressed chunk by chunk.
+if BrotliMiddleware:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESS_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE, compresslevel=6)
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except psycopg.Error as e:
+        if prometheus_client:
+            DB_ERRORS.labels(type(e).__name__).inc()
+        raise
+    route = request.scope.get("route")
+    if prometheus_client and route is not None and route.path != "/metrics":
+        # Streamed responses are timed to their first byte
+        REQUEST_DURATION.labels(route.path, response.status_code).observe(time.perf_counter() - start)
+        if route.path.startswith("/api/") and response.status_code in (200, 304):
+            CACHE_REQUESTS.labels("conditional_get", "hit" if response.status_code == 304 else "miss").inc()
+    return response
+
 # ========================================
 # Routes
 # ========================================
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    if not prometheus_client:
+        raise HTTPException(404)
+    return Response(prometheus_client.generate_latest(), media_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home():
     """Home page with navigation"""
@@ -82,6 +483,10 @@ async def home():
             <ul>
                 <li><a href="/health">/health</a> - Health check</li>
                 <li><a href="/info">/info</a> - App information</li>
+                <li><a href="/metrics">/metrics</a> - Prometheus metrics</li>
+                <li><a href="/api/products?limit=10">/api/products</a> - Products (also /api/orders, /api/users)</li>
+                <li><a href="/api/products?fields=name,price&category=eq.Electronics&order=desc">/api/products?fields=name,price&amp;category=eq.Electronics&amp;order=desc</a> - Field selection and filters</li>
+                <li><a href="/api/products?format=ndjson">/api/products?format=ndjson</a> - Stream every row as NDJSON</li>
             </ul>
         </div>
     </body>
@@ -104,13 +509,107 @@ async def app_info():
         "app_title": APP_TITLE,
         "version": "1.0.0",
         "framework": "FastAPI",
-        "debug_mode": DEBUG_MODE
+        "debug_mode": DEBUG_MODE,
+        "resources": sorted(RESOURCES)
     }
 
-# Add your API routes here
-# @app.get("/api/your-endpoint")
-# async def your_endpoint():
-#     return {"message": "Hello from your endpoint"}
+@app.get("/api/{resource_name}")
+async def list_rows(resource_name: str, request: Request, fields: str = None, limit: int = None,
+                    after: int = None, order: str = "asc", format: str = "json"):
+    """List rows, a keyset page at a time or streamed as NDJSON.
+
+    - `fields=name,price` selects columns
+    - `column=op.value` filters (eq, neq, gt, gte, lt, lte, like, ilike,
+      in, is, and cs for array containment) run in SQL
+    - `after=<key>` continues from the `next_after` of the previous page
+    - `order=desc` walks the primary key backwards
+    - `format=ndjson` (or `Accept: application/x-ndjson`) streams every
+      matching row, or the first `limit`, one JSON document per line
+    - responses carry ETag/Last-Modified from the table change version; a
+      matching If-None-Match gets a 304 without running the query
+    """
+    resource = get_resource(resource_name)
+    if order not in ("asc", "desc"):
+        raise HTTPException(400, "order must be asc or desc")
+    fields = parse_fields(resource, fields)
+    conditions, params = parse_filters(resource, request.query_params)
+    pool = request.app.state.pool
+
+    if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+        query, params = build_query(resource, fields, conditions, params, order, after, limit)
+        return await stream_ndjson(pool, request, resource, query, params)
+
+    limit = min(max(1, limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    # One extra row tells us whether there is a next page
+    query, params = build_query(resource, fields, conditions, params, order, after, limit + 1)
+    try:
+        async with pool.connection() as conn:
+            etag, last_modified = await table_version(conn, resource, "json")
+            if not_modified(request, etag, last_modified):
+                return Response(status_code=304, headers=cache_headers(etag, last_modified))
+            rows = await (await conn.execute(query, params)).fetchall()
+    except psycopg.errors.DataError as e:
+        raise HTTPException(400, f"Invalid filter value: {e.diag.message_primary}")
+    next_after = rows[limit - 1][1] if len(rows) > limit else None
+    body = '{"data":[' + ",".join(row[0] for row in rows[:limit]) + '],"next_after":' + json.dumps(next_after) + "}"
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag, last_modified))
+
+
+@app.get("/api/{resource_name}/{key}")
+async def get_row(resource_name: str, key: int, request: Request, fields: str = None):
+    """Fetch one row by primary key."""
+    resource = get_resource(resource_name)
+    condition = sql.SQL("{} = %s").format(sql.SQL(resource["columns"][resource["key"]][0]))
+    query, params = build_query(resource, parse_fields(resource, fields), [condition], [key])
+    async with request.app.state.pool.connection() as conn:
+        etag, last_modified = await table_version(conn, resource, "json")
+        if not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=cache_headers(etag, last_modified))
+        row = await (await conn.execute(query, params)).fetchone()
+    if row is None:
+        raise HTTPException(404, f"{resource_name} {key} not found")
+    return Response(content=row[0], media_type="application/json", headers=cache_headers(etag, last_modified))
+
+
+async def stream_ndjson(pool, request, resource, query, params):
+    """Stream query results through a server-side cursor, one batch per round trip.
+
+    The connection is checked out before the response starts, so bad filter
+    values still get a 400, and is returned to the pool when the stream ends
+    or the client disconnects.
+    """
+    conn = await pool.getconn()
+    cursor = conn.cursor(name="ndjson_stream")
+    try:
+        etag, last_modified = await table_version(conn, resource, "ndjson")
+        if not_modified(request, etag, last_modified):
+            await conn.rollback()
+            await pool.putconn(conn)
+            return Response(status_code=304, headers=cache_headers(etag, last_modified))
+        await cursor.execute(query, params)
+        first = await cursor.fetchmany(STREAM_BATCH_ROWS)
+    except psycopg.errors.DataError as e:
+        await cursor.close()
+        await conn.rollback()
+        await pool.putconn(conn)
+        raise HTTPException(400, f"Invalid filter value: {e.diag.message_primary}")
+    except BaseException:
+        await pool.putconn(conn)
+        raise
+
+    async def lines():
+        try:
+            rows = first
+            while rows:
+                yield "".join(row[0] + "\n" for row in rows)
+                rows = await cursor.fetchmany(STREAM_BATCH_ROWS)
+        finally:
+            await cursor.close()
+            await conn.rollback()
+            await pool.putconn(conn)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers=cache_headers(etag, last_modified))
 
 # ========================================
 # Run the App
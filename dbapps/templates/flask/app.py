@@ -8,21 +8,368 @@ Key Features:
 - ✅ Host binding to 0.0.0.0 for Databricks proxy
 - ✅ Environment variable support
 - ✅ RESTful API ready
+- ✅ Lakebase data API over ecommerce.products/orders/users with keyset
+     pagination and ETag/Last-Modified conditional GETs keyed on table
+     change versions
+- ✅ orjson responses and brotli/gzip compression above COMPRESS_MIN_SIZE
+- ✅ Prometheus /metrics: pool occupancy and checkout waits, request latency
+     per endpoint, conditional-GET hit ratio, OAuth refreshes, DB errors
 
 Author: Databricks Template
 Date: 2025-11-22
 """
 
+import json
 import os
-from flask import Flask, render_template_string, jsonify
+import threading
+import time
+from datetime import timezone
+
+from flask import Flask, Response, abort, render_template_string, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+import psycopg
+from psycopg import sql
+from psycopg_pool import ConnectionPool
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """jsonify()/request.get_json() through orjson.
+
+    datetime and NumPy arrays encode natively (datetimes as RFC 3339 rather
+    than Flask's HTTP dates); Decimal and UUID fall back to str as in Flask.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 # ========================================
 # Configuration
 # ========================================
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+if orjson:
+    app.json = ORJSONProvider(app)
+# Compress responses larger than COMPRESS_MIN_SIZE bytes, brotli preferred
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip'] if brotli else ['gzip']
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_LEVEL'] = 6
+if Compress:
+    Compress(app)
 APP_TITLE = os.environ.get('APP_TITLE', 'Databricks Flask App')
 
+# Lakebase connection (PGUSER must match the OAuth token identity)
+PGHOST = os.environ.get('PGHOST')
+PGUSER = os.environ.get('PGUSER')
+PGDATABASE = os.environ.get('PGDATABASE', 'databricks_postgres')
+PGPORT = os.environ.get('PGPORT', '5432')
+PGSSLMODE = os.environ.get('PGSSLMODE', 'require')
+# Local development / benchmarking only: a static password skips OAuth
+PGPASSWORD = os.environ.get('PGPASSWORD')
+
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+
+# Where table change versions come from: "triggers" reads
+# ecommerce.table_versions (see setup_database.sql); "stats" sums the
+# pg_stat_user_tables write counters, which needs no schema changes but can
+# lag commits by the statistics flush interval and has no Last-Modified
+VERSION_SOURCE = os.environ.get('VERSION_SOURCE', 'triggers')
+# Seconds browsers and intermediary caches may reuse a response before revalidating
+CACHE_MAX_AGE = int(os.environ.get('CACHE_MAX_AGE', '5'))
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# ========================================
+# Metrics (served at /metrics when prometheus_client is installed)
+# ========================================
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+if prometheus_client:
+    REQUEST_DURATION = Histogram("http_request_seconds", "Request latency", ["endpoint", "status"],
+                                 buckets=LATENCY_BUCKETS)
+    POOL_WAIT = Histogram("lakebase_pool_wait_seconds", "Time to check out a pooled connection",
+                          buckets=LATENCY_BUCKETS)
+    POOL_CONNECTIONS = Gauge("lakebase_pool_connections", "Connection pool connections by state", ["state"])
+    POOL_WAITING = Gauge("lakebase_pool_requests_waiting", "Callers waiting for a pooled connection")
+    DB_ERRORS = Counter("lakebase_db_errors_total", "Requests failed by a database error", ["error"])
+    CACHE_REQUESTS = Counter("lakebase_cache_requests_total",
+                             "Data API requests answered by a 304 (hit) or a full response (miss)",
+                             ["cache", "result"])
+    OAUTH_REFRESHES = Counter("lakebase_oauth_refresh_total", "OAuth token refreshes", ["result"])
+    OAUTH_REFRESH_DURATION = Histogram("lakebase_oauth_refresh_seconds", "OAuth token refresh time",
+                                       buckets=LATENCY_BUCKETS)
+
+# ========================================
+# Database
+# ========================================
+_workspace_client = None
+_oauth_token = None
+_oauth_token_time = 0
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password():
+    """Return PGPASSWORD, or a Databricks OAuth token refreshed every 15 minutes."""
+    global _workspace_client, _oauth_token, _oauth_token_time
+    if PGPASSWORD is not None:
+        return PGPASSWORD
+    if _oauth_token is None or time.time() - _oauth_token_time > 900:
+        start, result = time.perf_counter(), "error"
+        try:
+            from databricks import sdk
+            if _workspace_client is None:
+                _workspace_client = sdk.WorkspaceClient()
+            _oauth_token = _workspace_client.config.oauth_token().access_token
+            _oauth_token_time = time.time()
+            result = "success"
+        finally:
+            if prometheus_client:
+                OAUTH_REFRESHES.labels(result).inc()
+                OAUTH_REFRESH_DURATION.observe(time.perf_counter() - start)
+    return _oauth_token
+
+
+class MeteredConnectionPool(ConnectionPool):
+    """ConnectionPool that records checkout waits and occupancy for /metrics."""
+
+    def getconn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super().getconn(timeout)
+        if prometheus_client:
+            POOL_WAIT.observe(time.perf_counter() - start)
+            self.record_state()
+        return conn
+
+    def putconn(self, conn):
+        super().putconn(conn)
+        if prometheus_client:
+            self.record_state()
+
+    def record_state(self):
+        stats = self.get_stats()
+        POOL_CONNECTIONS.labels("size").set(stats["pool_size"])
+        POOL_CONNECTIONS.labels("available").set(stats["pool_available"])
+        POOL_CONNECTIONS.labels("in_use").set(stats["pool_size"] - stats["pool_available"])
+        POOL_CONNECTIONS.labels("max").set(stats["pool_max"])
+        POOL_WAITING.set(stats["requests_waiting"])
+
+
+class LakebaseConnection(psycopg.Connection):
+    """Connection that supplies a current OAuth token each time the pool connects."""
+
+    @classmethod
+    def connect(cls, conninfo="", **kwargs):
+        kwargs["password"] = get_password()
+        return super().connect(conninfo, **kwargs)
+
+
+def get_pool():
+    """Return this process's connection pool, opening it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MeteredConnectionPool(
+                kwargs={
+                    "host": PGHOST,
+                    "user": PGUSER,
+                    "dbname": PGDATABASE,
+                    "port": PGPORT,
+                    "sslmode": PGSSLMODE,
+                    "application_name": APP_TITLE,
+                },
+                connection_class=LakebaseConnection,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                # Recycle connections well before their OAuth token would expire
+                max_lifetime=45 * 60,
+            )
+    return _pool
+
+
+# Each resource lists the columns clients may select, as SQL expressions.
+# Only these expressions ever reach the SQL text.
+RESOURCES = {
+    "products": {
+        "from": "ecommerce.products p",
+        "key": "p.product_id",
+        # Tables whose changes alter the representation (for ETags)
+        "tables": ["products", "product_stock_slots"],
+        "columns": {
+            "product_id": "p.product_id",
+            "name": "p.name",
+            "description": "p.description",
+            "price": "p.price",
+            # Slotted products keep their stock in product_stock_slots
+            "stock_quantity": "COALESCE((SELECT sum(s.quantity) FROM ecommerce.product_stock_slots s "
+                              "WHERE s.product_id = p.product_id), p.stock_quantity)::integer",
+            "category": "p.category",
+            "tags": "p.tags",
+            "created_at": "p.created_at",
+            "updated_at": "p.updated_at",
+        },
+    },
+    "orders": {
+        "from": "ecommerce.orders o",
+        "key": "o.order_id",
+        "tables": ["orders"],
+        "columns": {
+            "order_id": "o.order_id",
+            "user_id": "o.user_id",
+            "order_date": "o.order_date",
+            "status": "o.status",
+            "total_amount": "o.total_amount",
+            "shipping_address": "o.shipping_address",
+            "payment_method": "o.payment_method",
+        },
+    },
+    "users": {
+        "from": "ecommerce.users u",
+        "key": "u.user_id",
+        "tables": ["users"],
+        "columns": {
+            "user_id": "u.user_id",
+            "email": "u.email",
+            "username": "u.username",
+            "full_name": "u.full_name",
+            "is_active": "u.is_active",
+            "created_at": "u.created_at",
+            "updated_at": "u.updated_at",
+        },
+    },
+}
+
+VERSION_QUERIES = {
+    "triggers": """
+        SELECT sum(version)::bigint AS version, max(changed_at) AS changed_at
+        FROM ecommerce.table_versions
+        WHERE table_name = ANY(%s)
+    """,
+    "stats": """
+        SELECT sum(n_tup_ins + n_tup_upd + n_tup_del)::bigint AS version, NULL::timestamptz AS changed_at
+        FROM pg_stat_user_tables
+        WHERE schemaname = 'ecommerce' AND relname = ANY(%s)
+    """,
+}
+
+
+def table_version(conn, resource):
+    """Return (etag, last_modified) for the resource's current data.
+
+    Read it before the main query: with READ COMMITTED the data can then
+    only be newer than the version, which costs at most one extra download,
+    never a stale 304.
+    """
+    version, changed_at = conn.execute(VERSION_QUERIES[VERSION_SOURCE], (resource["tables"],)).fetchone()
+    return f'{"-".join(resource["tables"])}.{version}', changed_at
+
+
+def conditional_response(etag, last_modified):
+    """Attach validators and Cache-Control; returns a 304 if the client's copy is current."""
+    response = Response(status=200, mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.astimezone(timezone.utc)
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    response.vary.add("Accept-Encoding")
+    # Werkzeug evaluates If-None-Match (weakly) and If-Modified-Since
+    response.make_conditional(request)
+    return response
+
+
+def build_query(resource, fields, conditions, params, order="asc", limit=None):
+    """SELECT one JSON document per row (built by Postgres) plus its key."""
+    columns = resource["columns"]
+    key = sql.SQL(resource["key"])
+    document = sql.SQL("json_build_object({})::text").format(sql.SQL(", ").join(
+        sql.SQL("{}, {}").format(sql.Literal(name), sql.SQL(columns[name])) for name in fields
+    ))
+    query = sql.SQL("SELECT {document}, {key} FROM {source}{where} ORDER BY {key} {direction}").format(
+        document=document,
+        key=key,
+        source=sql.SQL(resource["from"]),
+        where=sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL(""),
+        direction=sql.SQL("DESC" if order == "desc" else "ASC"),
+    )
+    if limit is not None:
+        query += sql.SQL(" LIMIT %s")
+        params = params + [limit]
+    return query, params
+
+
+def get_resource(name):
+    if name not in RESOURCES:
+        abort(404, f"Unknown resource '{name}'")
+    return RESOURCES[name]
+
+
+def parse_fields(resource):
+    columns = resource["columns"]
+    names = [name.strip() for name in request.args.get("fields", "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+    return names or list(columns)
+
+# ========================================
+# Request metrics
+# ========================================
+@app.before_request
+def start_timer():
+    request.environ["app.start"] = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    if prometheus_client and request.url_rule is not None and request.endpoint != "metrics":
+        REQUEST_DURATION.labels(request.endpoint, response.status_code).observe(
+            time.perf_counter() - request.environ["app.start"])
+        if request.endpoint in ("list_rows", "get_row") and response.status_code in (200, 304):
+            CACHE_REQUESTS.labels("conditional_get", "hit" if response.status_code == 304 else "miss").inc()
+    return response
+
+
+@app.teardown_request
+def record_db_error(error=None):
+    if prometheus_client and isinstance(error, psycopg.Error):
+        DB_ERRORS.labels(type(error).__name__).inc()
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics"""
+    if not prometheus_client:
+        abort(404)
+    return Response(prometheus_client.generate_latest(), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
 # ========================================
 # Routes
 # ========================================
@@ -62,6 +409,8 @@ def home():
             <ul>
                 <li><a href="/api/health">/api/health</a> - Health check</li>
                 <li><a href="/api/info">/api/info</a> - App information</li>
+                <li><a href="/api/products?limit=10">/api/products</a> - Products (also /api/orders, /api/users)</li>
+                <li><a href="/metrics">/metrics</a> - Prometheus metrics</li>
             </ul>
         </div>
     </body>
@@ -86,6 +435,55 @@ def info():
         'framework': 'Flask'
     })
 
+@app.route('/api/<resource_name>')
+def list_rows(resource_name):
+    """List rows a keyset page at a time.
+
+    `fields=name,price` selects columns, `after=<key>` continues from the
+    `next_after` of the previous page and `order=desc` walks the primary key
+    backwards. Responses carry ETag/Last-Modified from the table change
+    version; a matching If-None-Match gets a 304 without running the query.
+    """
+    resource = get_resource(resource_name)
+    fields = parse_fields(resource)
+    order = request.args.get("order", "asc")
+    if order not in ("asc", "desc"):
+        abort(400, "order must be asc or desc")
+    limit = min(max(1, request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)), MAX_PAGE_SIZE)
+    after = request.args.get("after", type=int)
+    conditions, params = [], []
+    if after is not None:
+        conditions.append(sql.SQL("{} {} %s").format(sql.SQL(resource["key"]), sql.SQL("<" if order == "desc" else ">")))
+        params.append(after)
+    # One extra row tells us whether there is a next page
+    query, params = build_query(resource, fields, conditions, params, order, limit + 1)
+
+    with get_pool().connection() as conn:
+        response = conditional_response(*table_version(conn, resource))
+        if response.status_code == 304:
+            return response
+        rows = conn.execute(query, params).fetchall()
+    next_after = rows[limit - 1][1] if len(rows) > limit else None
+    response.set_data('{"data":[' + ",".join(row[0] for row in rows[:limit]) + '],"next_after":'
+                      + json.dumps(next_after) + "}")
+    return response
+
+@app.route('/api/<resource_name>/<int:key>')
+def get_row(resource_name, key):
+    """Fetch one row by primary key."""
+    resource = get_resource(resource_name)
+    condition = sql.SQL("{} = %s").format(sql.SQL(resource["key"]))
+    query, params = build_query(resource, parse_fields(resource), [condition], [key])
+    with get_pool().connection() as conn:
+        response = conditional_response(*table_version(conn, resource))
+        if response.status_code == 304:
+            return response
+        row = conn.execute(query, params).fetchone()
+    if row is None:
+        abort(404, f"{resource_name} {key} not found")
+    response.set_data(row[0])
+    return response
+
 # ========================================
 # Run the App
 # ========================================
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Product Embedding Backfill Worker
+=================================
+Keeps ecommerce.products.embedding current for products added or edited by
+the apps, bulk imports or direct SQL. A product is queued whenever its
+content_hash (generated from the embedded text) differs from the
+embedded_hash its current embedding was computed from; see
+setup_vector_search.sql.
+
+Each batch is one transaction: claim up to --batch-size queued rows with
+FOR UPDATE SKIP LOCKED (so any number of workers can run side by side
+without embedding the same product twice), embed them with embeddings.py,
+write the vectors back with a single UPDATE, and advance the worker's
+checkpoint. A restarted worker resumes from its checkpoint and wraps
+around to pick up products changed behind it.
+
+Connection settings come from --dsn or the standard libpq environment
+variables (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT, PGSSLMODE).
+
+Usage:
+    python embedding_backfill.py                    # drain the queue and exit
+    python embedding_backfill.py --workers 4        # four parallel workers
+    python embedding_backfill.py --watch            # keep polling for changes
+    python embedding_backfill.py --reembed          # queue every product again
+    python embedding_backfill.py --status
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+
+from embeddings import embed_texts
+from vector_search import product_text, to_vector_literal
+
+CLAIM_QUERY = """
+    SELECT product_id, name, description, category, tags, content_hash
+    FROM ecommerce.products
+    WHERE embedded_hash IS DISTINCT FROM content_hash
+      AND product_id > %s
+    ORDER BY product_id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+WRITE_QUERY = """
+    UPDATE ecommerce.products p
+    SET embedding = v.embedding::vector,
+        embedded_hash = v.content_hash
+    FROM unnest(%s::int[], %s::text[], %s::text[]) AS v(product_id, embedding, content_hash)
+    WHERE p.product_id = v.product_id
+"""
+
+CHECKPOINT_QUERY = """
+    INSERT INTO ecommerce.embedding_backfill_checkpoints (worker, last_product_id, embedded)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (worker) DO UPDATE
+    SET last_product_id = EXCLUDED.last_product_id,
+        embedded = ecommerce.embedding_backfill_checkpoints.embedded + EXCLUDED.embedded,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+QUEUE_DEPTH_QUERY = """
+    SELECT count(*) AS depth
+    FROM ecommerce.products
+    WHERE embedded_hash IS DISTINCT FROM content_hash
+"""
+
+
+def queue_depth(conn):
+    return conn.execute(QUEUE_DEPTH_QUERY).fetchone()['depth']
+
+
+def load_checkpoint(conn, worker):
+    row = conn.execute(
+        "SELECT last_product_id FROM ecommerce.embedding_backfill_checkpoints WHERE worker = %s", (worker,)
+    ).fetchone()
+    return row['last_product_id'] if row else 0
+
+
+def process_batch(conn, worker, position, batch_size):
+    """Claim, embed and write back one batch. Returns the rows processed."""
+    with conn.transaction():
+        rows = conn.execute(CLAIM_QUERY, (position, batch_size)).fetchall()
+        if not rows:
+            return rows
+        vectors = embed_texts([
+            product_text(row['name'], row['description'], row['category'], row['tags'])
+            for row in rows
+        ])
+        conn.execute(WRITE_QUERY, (
+            [row['product_id'] for row in rows],
+            [to_vector_literal(vector) for vector in vectors],
+            [row['content_hash'] for row in rows],
+        ))
+        conn.execute(CHECKPOINT_QUERY, (worker, rows[-1]['product_id'], len(rows)))
+    return rows
+
+
+def run_worker(dsn, worker, batch_size, watch, poll_interval, report_interval):
+    """Process batches until the queue is empty (or forever with watch)."""
+    with psycopg.connect(dsn, row_factory=dict_row) as conn:
+        position = load_checkpoint(conn, worker)
+        conn.commit()
+        embedded, started = 0, time.perf_counter()
+        last_report = started
+
+        while True:
+            rows = process_batch(conn, worker, position, batch_size)
+            if rows:
+                position = rows[-1]['product_id']
+                embedded += len(rows)
+            elif position:
+                # Reached the end; products before the checkpoint may have changed
+                position = 0
+                continue
+            elif not watch:
+                break
+            else:
+                time.sleep(poll_interval)
+
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                report(conn, worker, embedded, now - started)
+                last_report = now
+
+        report(conn, worker, embedded, time.perf_counter() - started)
+    return embedded
+
+
+def report(conn, worker, embedded, elapsed):
+    depth = queue_depth(conn)
+    conn.commit()
+    print(f"[{worker}] {embedded:,} embedded, {embedded / elapsed if elapsed else 0:,.0f} embeddings/sec, "
+          f"queue depth {depth:,}", flush=True)
+
+
+def _worker_main(args):
+    return run_worker(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default="", help="libpq connection string (default: PG* environment)")
+    parser.add_argument("--name", default="backfill", help="Worker name (checkpoint key)")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--watch", action="store_true", help="Keep polling once the queue is empty")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between polls with --watch")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--reembed", action="store_true", help="Queue every product for re-embedding")
+    parser.add_argument("--status", action="store_true", help="Show queue depth and checkpoints")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True, row_factory=dict_row) as conn:
+        if args.reembed:
+            queued = conn.execute("UPDATE ecommerce.products SET embedded_hash = NULL").rowcount
+            print(f"🔄 Queued {queued:,} products for re-embedding")
+        if args.status:
+            print(f"Queue depth: {queue_depth(conn):,}")
+            for row in conn.execute("""
+                SELECT worker, last_product_id, embedded, updated_at
+                FROM ecommerce.embedding_backfill_checkpoints
+                ORDER BY worker
+            """).fetchall():
+                print(f"   {row['worker']:20} last id {row['last_product_id']:>10,}  "
+                      f"{row['embedded']:>12,} embedded  {row['updated_at']:%Y-%m-%d %H:%M:%S}")
+            return True
+
+    started = time.perf_counter()
+    jobs = [
+        (args.dsn, args.name if args.workers == 1 else f"{args.name}-{i}", args.batch_size,
+         args.watch, args.poll_interval, args.report_interval)
+        for i in range(args.workers)
+    ]
+    if args.workers == 1:
+        embedded = _worker_main(jobs[0])
+    else:
+        with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+            embedded = sum(pool.map(_worker_main, jobs))
+    elapsed = time.perf_counter() - started
+    print(f"✅ Embedded {embedded:,} products in {elapsed:.1f}s "
+          f"({embedded / elapsed if elapsed else 0:,.0f} embeddings/sec)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,209 @@
+"""
+Text embeddings for vector search.
+
+Embedders turn a batch of texts into an (n, dim) float32 matrix of unit
+vectors. The built-in HashingEmbedder runs on the CPU with no model download
+or network call: it hashes words, word bigrams and character trigrams into a
+fixed number of buckets and projects the bucket counts to `dim` dimensions
+with a fixed, seeded NumPy matrix, a whole batch at a time.
+
+Results are cached on disk keyed by a hash of the embedder configuration and
+the text, so product re-indexing and repeated queries never embed the same
+text twice.
+
+Configuration (environment variables):
+    EMBEDDER         "hashing" (default) or "package.module:factory" for a
+                     custom embedder
+    EMBEDDING_DIM    output dimension, must match ecommerce.products.embedding
+    EMBEDDING_CACHE  cache file path, or empty to disable the cache
+"""
+
+import hashlib
+import importlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '384'))
+EMBEDDER = os.getenv('EMBEDDER', 'hashing')
+EMBEDDING_CACHE = os.getenv(
+    'EMBEDDING_CACHE', str(Path.home() / ".cache" / "lakebase_training" / "embeddings.sqlite")
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class Embedder:
+    """Interface for embedders.
+
+    Subclasses set `dim` and a `cache_key` that changes whenever their output
+    would, and implement embed().
+    """
+
+    dim = EMBEDDING_DIM
+    cache_key = None
+
+    def embed(self, texts):
+        """Return an (len(texts), dim) float32 array of L2-normalized vectors."""
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Hashed n-gram features with a fixed random projection."""
+
+    def __init__(self, dim=EMBEDDING_DIM, buckets=2 ** 14, seed=0, batch_size=256):
+        self.dim = dim
+        self.buckets = buckets
+        self.batch_size = batch_size
+        self.cache_key = f"hashing-v1:{dim}:{buckets}:{seed}"
+        rng = np.random.default_rng(seed)
+        self.projection = (rng.standard_normal((buckets, dim)) / np.sqrt(dim)).astype(np.float32)
+
+    def features(self, text):
+        """Return (bucket ids, weights) for one text."""
+        words = _TOKEN.findall((text or "").lower())
+        word_grams = [f"w:{w}" for w in words] + [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        char_grams = ["c:" + f" {w} "[i:i + 3] for w in words for i in range(len(w))]
+        grams = word_grams + char_grams
+        ids = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint32, count=len(grams))
+        # Whole words carry more signal than their trigrams
+        weights = np.concatenate([np.ones(len(word_grams)), np.full(len(char_grams), 0.5)])
+        return (ids % self.buckets).astype(np.int64), weights
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            rows, cols, weights = [], [], []
+            for row, text in enumerate(batch):
+                ids, w = self.features(text)
+                rows.append(np.full(len(ids), start + row, dtype=np.int64))
+                cols.append(ids)
+                weights.append(w)
+            flat = np.concatenate(rows) * self.buckets + np.concatenate(cols)
+            if not len(flat):
+                continue
+            # Sum repeated features per text, then add up their projection rows
+            # text by text; `keys` is sorted, so each text's features are contiguous
+            keys, inverse = np.unique(flat, return_inverse=True)
+            counts = np.log1p(np.bincount(inverse, weights=np.concatenate(weights))).astype(np.float32)
+            text_ids = keys // self.buckets
+            contributions = self.projection[keys % self.buckets] * counts[:, None]
+            present, first = np.unique(text_ids, return_index=True)
+            out[present] = np.add.reduceat(contributions, first, axis=0)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class EmbeddingCache:
+    """Persistent text -> vector cache in a SQLite file."""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @staticmethod
+    def key(cache_key, text):
+        return hashlib.sha256(f"{cache_key}\0{text}".encode()).digest()
+
+    def get_many(self, keys):
+        """Return {key: vector bytes} for the keys that are cached."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+        return found
+
+    def put_many(self, items):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", items)
+
+
+class CachedEmbedder(Embedder):
+    """Wraps an embedder so only texts missing from the cache are embedded."""
+
+    def __init__(self, embedder, cache):
+        self.embedder = embedder
+        self.cache = cache
+        self.dim = embedder.dim
+        self.cache_key = embedder.cache_key
+
+    def embed(self, texts):
+        keys = [EmbeddingCache.key(self.cache_key, text) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+
+        missing = {}
+        for i, key in enumerate(keys):
+            if key in cached:
+                out[i] = np.frombuffer(cached[key], dtype=np.float32)
+            else:
+                missing.setdefault(key, []).append(i)
+        misses = sum(map(len, missing.values()))
+        metrics.cache_lookup("embeddings", hits=len(texts) - misses, misses=misses)
+        if missing:
+            # Duplicate texts within the batch are embedded once
+            positions = list(missing.values())
+            vectors = self.embedder.embed([texts[p[0]] for p in positions])
+            for vector, indexes in zip(vectors, positions):
+                out[indexes] = vector
+            self.cache.put_many([(key, vector.tobytes()) for key, vector in zip(missing, vectors)])
+        return out
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+}
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def create_embedder(spec=EMBEDDER, dim=EMBEDDING_DIM):
+    """Build an embedder from a registry name or a 'module:factory' path."""
+    if spec in EMBEDDERS:
+        return EMBEDDERS[spec](dim=dim)
+    module_name, sep, attr = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown embedder '{spec}', expected one of {sorted(EMBEDDERS)} or module:factory")
+    return getattr(importlib.import_module(module_name), attr)(dim=dim)
+
+
+def get_embedder():
+    """Return the process-wide embedder, cached when EMBEDDING_CACHE is set."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            embedder = create_embedder()
+            if EMBEDDING_CACHE:
+                embedder = CachedEmbedder(embedder, EmbeddingCache(EMBEDDING_CACHE))
+            _embedder = embedder
+    return _embedder
+
+
+def embed_texts(texts):
+    """Embed a list of texts with the configured embedder."""
+    return get_embedder().embed(list(texts))
+
+
+def embed_text(text):
+    """Embed a single text; raises ValueError if it has nothing to embed."""
+    vector = embed_texts([text])[0]
+    if not vector.any():
+        raise ValueError("Text has no searchable terms")
+    return vector
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator for the Lakebase Training Schema
+=========================================================
+Generates users, products, orders and order_items for the ecommerce schema
+with realistic distributions and loads them through parallel COPY streams.
+
+- Product popularity is Zipfian (a few best sellers, a long tail)
+- Order dates follow weekly, daily and holiday seasonality
+- Users carry JSONB metadata, orders carry JSONB shipping addresses and
+  products carry tag arrays
+- Output is reproducible: the same --seed and counts give the same rows no
+  matter how many --workers load them, because every chunk has its own
+  random stream derived from (seed, table, chunk number)
+
+Connection settings come from --dsn or the standard libpq environment
+variables (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT, PGSSLMODE).
+
+Usage:
+    # ~5M order_items into a local Postgres
+    python generate_data.py --truncate
+
+    # ~100M order_items with 16 COPY streams
+    python generate_data.py --truncate --users 5000000 --products 1000000 \\
+        --orders 20000000 --workers 16 --fast-load
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import psycopg
+
+# Random stream ids: every (stream, chunk) pair gets an independent generator
+CATALOG_STREAM, USERS_STREAM, PRODUCTS_STREAM, ORDERS_STREAM, ITEM_COUNT_STREAM = range(5)
+
+CATEGORIES = ["Electronics", "Accessories", "Books", "Clothing", "Other"]
+CATEGORY_WEIGHTS = [0.30, 0.30, 0.15, 0.15, 0.10]
+# Median price in cents and lognormal sigma per category
+CATEGORY_PRICES = [(29900, 0.9), (3999, 0.7), (2499, 0.4), (3499, 0.6), (1999, 0.8)]
+
+ADJECTIVES = np.array([
+    "Pro", "Ultra", "Smart", "Wireless", "Compact", "Premium", "Classic", "Eco",
+    "Portable", "Advanced", "Essential", "Deluxe", "Rugged", "Slim", "Quantum", "Nova",
+])
+NOUNS = {
+    "Electronics": ["Laptop", "Monitor", "Tablet", "Webcam", "Speaker", "Headphones", "Router", "Camera"],
+    "Accessories": ["Mouse", "Keyboard", "USB-C Hub", "Desk Lamp", "Cable", "Stand", "Charger", "Backpack"],
+    "Books": ["Guide to AI", "SQL Handbook", "Data Engineering", "Python Cookbook", "Statistics Primer"],
+    "Clothing": ["Hoodie", "T-Shirt", "Jacket", "Cap", "Sneakers", "Socks"],
+    "Other": ["Water Bottle", "Notebook", "Mug", "Sticker Pack", "Plant Pot"],
+}
+TAGS = np.array([
+    "new", "bestseller", "sale", "eco", "wireless", "ai", "gaming", "office", "travel",
+    "premium", "budget", "gift", "limited", "professional", "education", "outdoor",
+])
+FIRST_NAMES = np.array([
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+    "Elizabeth", "Wei", "Priya", "Carlos", "Fatima", "Yuki", "Olga", "Ahmed", "Sofia",
+])
+LAST_NAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Chen",
+    "Patel", "Rodriguez", "Kim", "Nguyen", "Müller", "Rossi", "Ivanova", "Tanaka", "Silva",
+])
+CITIES = np.array([
+    ("Denver", "CO", "802"), ("Boulder", "CO", "803"), ("Seattle", "WA", "981"),
+    ("San Francisco", "CA", "941"), ("Los Angeles", "CA", "900"), ("Austin", "TX", "787"),
+    ("Chicago", "IL", "606"), ("New York", "NY", "100"), ("Boston", "MA", "021"),
+    ("Atlanta", "GA", "303"), ("Miami", "FL", "331"), ("Portland", "OR", "972"),
+])
+STREETS = np.array(["Main St", "Oak Ave", "Pine St", "Maple Dr", "Cedar Ln", "Elm St", "Lake Rd", "Park Ave"])
+ROLES, ROLE_WEIGHTS = np.array(["customer", "vendor", "admin"]), [0.97, 0.025, 0.005]
+TIERS, TIER_WEIGHTS = np.array(["bronze", "silver", "gold", "platinum"]), [0.55, 0.28, 0.14, 0.03]
+CHANNELS = np.array(["web", "mobile", "referral", "partner"])
+STATUSES, STATUS_WEIGHTS = np.array(["completed", "shipped", "pending", "cancelled"]), [0.72, 0.12, 0.11, 0.05]
+PAYMENT_METHODS, PAYMENT_WEIGHTS = np.array(["credit_card", "paypal", "bank_transfer"]), [0.68, 0.25, 0.07]
+# Relative order volume per hour of day (evening peak)
+HOUR_WEIGHTS = np.array([2, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 7, 8, 7, 7, 7, 8, 9, 10, 11, 12, 11, 8, 4], dtype=float)
+
+CHUNK_ROWS = 100_000
+
+
+def rng_for(seed, stream, chunk=0):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream, chunk)))
+
+
+def zipf_cdf(n, exponent):
+    """Cumulative distribution of a Zipf law bounded to ranks 1..n."""
+    weights = 1.0 / np.power(np.arange(1, n + 1, dtype=np.float64), exponent)
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def seasonal_day_cdf(start, days):
+    """Daily order volume with weekend, summer and holiday-season peaks."""
+    dates = pd.date_range(start, periods=days, freq="D")
+    day_of_year = dates.dayofyear.to_numpy()
+    weights = np.ones(days)
+    weights *= np.where(dates.dayofweek.to_numpy() >= 5, 1.2, 1.0)
+    weights *= 1 + 0.15 * np.exp(-((day_of_year - 195) / 25.0) ** 2)  # summer sales
+    weights *= 1 + 1.5 * np.exp(-((day_of_year - 332) / 12.0) ** 2)   # Black Friday / Cyber Monday
+    weights *= 1 + 0.8 * np.exp(-((day_of_year - 352) / 8.0) ** 2)    # holiday shipping
+    weights *= np.linspace(0.7, 1.0, days)                            # year-over-year growth
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def item_counts(seed, chunk, size, avg_items):
+    """Line items per order: 1 + Poisson, capped at 20."""
+    rng = rng_for(seed, ITEM_COUNT_STREAM, chunk)
+    return np.minimum(1 + rng.poisson(max(avg_items - 1, 0), size), 20)
+
+
+def chunk_ranges(total):
+    return [(i, start, min(start + CHUNK_ROWS, total)) for i, start in enumerate(range(0, total, CHUNK_ROWS))]
+
+
+def json_column(*pairs):
+    """Build a JSON object string column from (key, string Series) pairs."""
+    parts = []
+    for i, (key, values) in enumerate(pairs):
+        parts.append(('{' if i == 0 else ', ') + f'"{key}": "')
+        parts.append(values)
+        parts.append('"')
+    column = parts[1].radd(parts[0])
+    for part in parts[2:]:
+        column = column + part
+    return column + "}"
+
+
+# ========================================
+# Worker state (built once per process)
+# ========================================
+_config = None
+_conn = None
+_catalog = None
+
+
+def _init_worker(config):
+    global _config, _conn, _catalog
+    _config = config
+    _conn = psycopg.connect(config["dsn"])
+    _conn.execute("SET TIME ZONE 'UTC'")
+    if config["fast_load"]:
+        # Skips FK triggers and WAL flush waits; needs superuser (local Postgres)
+        _conn.execute("SET session_replication_role = replica")
+        _conn.execute("SET synchronous_commit = off")
+    _conn.commit()
+    _catalog = build_catalog(config)
+
+
+def build_catalog(config):
+    """Product categories, prices and popularity ranks shared by every chunk."""
+    rng = rng_for(config["seed"], CATALOG_STREAM)
+    n = config["products"]
+    category = rng.choice(len(CATEGORIES), size=n, p=CATEGORY_WEIGHTS)
+    medians = np.array([m for m, _ in CATEGORY_PRICES])[category]
+    sigmas = np.array([s for _, s in CATEGORY_PRICES])[category]
+    price_cents = np.maximum(99, np.round(medians * np.exp(rng.normal(0, 1, n) * sigmas))).astype(np.int64)
+    # Round to .99 endings like a real catalog
+    price_cents = (price_cents // 100) * 100 + 99
+    popularity = rng.permutation(n) + 1  # popularity rank -> product_id
+    rank = np.empty(n, dtype=np.int64)  # product_id - 1 -> popularity rank
+    rank[popularity - 1] = np.arange(1, n + 1)
+    start = date.fromisoformat(config["start_date"])
+    return {
+        "category": category,
+        "price_cents": price_cents,
+        "popularity": popularity,
+        "rank": rank,
+        "product_cdf": zipf_cdf(n, config["zipf"]),
+        "user_cdf": zipf_cdf(config["users"], config["user_skew"]),
+        "start": start,
+        "day_cdf": seasonal_day_cdf(start, config["days"]),
+    }
+
+
+def _copy(table, columns, frame):
+    buffer = io.StringIO()
+    frame.to_csv(buffer, header=False, index=False, float_format="%.2f")
+    with _conn.cursor() as cur:
+        with cur.copy(f"COPY ecommerce.{table} ({', '.join(columns)}) FROM STDIN (FORMAT csv)") as copy:
+            copy.write(buffer.getvalue())
+
+
+# ========================================
+# Chunk generators
+# ========================================
+def users_chunk(chunk, start, end):
+    rng = rng_for(_config["seed"], USERS_STREAM, chunk)
+    size = end - start
+    user_id = np.arange(start + 1, end + 1)
+    ids = pd.Series(user_id.astype(str))
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), size)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), size)]
+    created = pd.Timestamp(_catalog["start"]) - pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, size), unit="s")
+    metadata = json_column(
+        ("role", pd.Series(rng.choice(ROLES, size, p=ROLE_WEIGHTS))),
+        ("tier", pd.Series(rng.choice(TIERS, size, p=TIER_WEIGHTS))),
+        ("signup_channel", pd.Series(CHANNELS[rng.integers(0, len(CHANNELS), size)])),
+    )
+    frame = pd.DataFrame({
+        "user_id": user_id,
+        "email": "user" + ids + "@example.com",
+        "username": "user" + ids,
+        "full_name": pd.Series(first) + " " + pd.Series(last),
+        "created_at": created,
+        "is_active": rng.random(size) > 0.03,
+        "metadata": metadata,
+    })
+    _copy("users", frame.columns, frame)
+    _conn.commit()
+    return "users", size
+
+
+def products_chunk(chunk, start, end):
+    rng = rng_for(_config["seed"], PRODUCTS_STREAM, chunk)
+    size = end - start
+    product_id = np.arange(start + 1, end + 1)
+    category = _catalog["category"][start:end]
+    category_names = np.array(CATEGORIES)[category]
+    nouns = np.array([
+        NOUNS[name][i % len(NOUNS[name])]
+        for name, i in zip(category_names, rng.integers(0, 1000, size))
+    ])
+    adjectives = ADJECTIVES[rng.integers(0, len(ADJECTIVES), size)]
+    name = pd.Series(adjectives) + " " + pd.Series(nouns) + " " + pd.Series(product_id.astype(str))
+    # 1-4 distinct tags, written as a Postgres array literal
+    tag_sets = rng.random((size, len(TAGS))).argsort(axis=1)[:, :4]
+    tag_counts = rng.integers(1, 5, size)
+    tags = ["{" + ",".join(TAGS[row[:count]]) + "}" for row, count in zip(tag_sets, tag_counts)]
+    # The top 1% of sellers carry 5x stock; ~3% of the catalog is below the low-stock threshold
+    best_seller = _catalog["rank"][start:end] <= max(1, _config["products"] // 100)
+    stock = rng.integers(10, 500, size) * np.where(best_seller, 5, 1)
+    stock = np.where(rng.random(size) < 0.03, rng.integers(0, 10, size), stock)
+    created = pd.Timestamp(_catalog["start"]) - pd.to_timedelta(rng.integers(0, 365 * 86400, size), unit="s")
+    frame = pd.DataFrame({
+        "product_id": product_id,
+        "name": name,
+        "description": pd.Series(adjectives).str.lower() + " " + pd.Series(nouns).str.lower()
+                       + " for " + pd.Series(category_names).str.lower() + " enthusiasts",
+        "price": _catalog["price_cents"][start:end] / 100.0,
+        "stock_quantity": stock,
+        "category": category_names,
+        "tags": tags,
+        "created_at": created,
+        "updated_at": created,
+    })
+    _copy("products", frame.columns, frame)
+    _conn.commit()
+    return "products", size
+
+
+def orders_chunk(chunk, start, end, first_item_id):
+    seed = _config["seed"]
+    rng = rng_for(seed, ORDERS_STREAM, chunk)
+    size = end - start
+    order_id = np.arange(start + 1, end + 1)
+
+    counts = item_counts(seed, chunk, size, _config["avg_items"])
+    n_items = int(counts.sum())
+    local_order = np.repeat(np.arange(size), counts)
+    ranks = np.searchsorted(_catalog["product_cdf"], rng.random(n_items))
+    product_id = _catalog["popularity"][ranks]
+    quantity = np.where(rng.random(n_items) < 0.8, 1, rng.integers(2, 6, n_items))
+    unit_cents = _catalog["price_cents"][product_id - 1]
+    total_cents = np.bincount(local_order, weights=quantity * unit_cents, minlength=size)
+
+    days = np.searchsorted(_catalog["day_cdf"], rng.random(size))
+    hours = rng.choice(24, size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    seconds = days * 86400 + hours * 3600 + rng.integers(0, 3600, size)
+    order_date = pd.Timestamp(_catalog["start"]) + pd.to_timedelta(seconds, unit="s")
+
+    city = CITIES[rng.integers(0, len(CITIES), size)]
+    street = (pd.Series(rng.integers(1, 9999, size).astype(str)) + " "
+              + pd.Series(STREETS[rng.integers(0, len(STREETS), size)]))
+    zip_code = pd.Series(city[:, 2]) + pd.Series(np.char.zfill(rng.integers(0, 100, size).astype(str), 2))
+    shipping_address = json_column(
+        ("street", street),
+        ("city", pd.Series(city[:, 0])),
+        ("state", pd.Series(city[:, 1])),
+        ("zip", zip_code),
+    )
+
+    orders = pd.DataFrame({
+        "order_id": order_id,
+        "user_id": np.searchsorted(_catalog["user_cdf"], rng.random(size)) + 1,
+        "order_date": order_date,
+        "status": rng.choice(STATUSES, size, p=STATUS_WEIGHTS),
+        "total_amount": total_cents / 100.0,
+        "shipping_address": shipping_address,
+        "payment_method": rng.choice(PAYMENT_METHODS, size, p=PAYMENT_WEIGHTS),
+    })
+    items = pd.DataFrame({
+        "order_item_id": np.arange(first_item_id, first_item_id + n_items),
+        "order_id": order_id[local_order],
+        "product_id": product_id,
+        "quantity": quantity,
+        "unit_price": unit_cents / 100.0,
+    })
+    # Orders and their items share one transaction so the FK sees the header
+    _copy("orders", orders.columns, orders)
+    _copy("order_items", items.columns, items)
+    _conn.commit()
+    return "orders", size, n_items
+
+
+def _run_task(task):
+    kind, args = task
+    if kind == "users":
+        return users_chunk(*args)
+    if kind == "products":
+        return products_chunk(*args)
+    return orders_chunk(*args)
+
+
+# ========================================
+# Driver
+# ========================================
+def prepare_tables(dsn, truncate):
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        if truncate:
+            conn.execute("""
+                TRUNCATE ecommerce.order_items, ecommerce.orders, ecommerce.product_stock_slots,
+                         ecommerce.products, ecommerce.users
+                RESTART IDENTITY CASCADE
+            """)
+            return True
+        existing = conn.execute("""
+            SELECT (SELECT COUNT(*) FROM ecommerce.users) + (SELECT COUNT(*) FROM ecommerce.products)
+                 + (SELECT COUNT(*) FROM ecommerce.orders)
+        """).fetchone()[0]
+        if existing:
+            print("❌ ecommerce tables already contain data; rerun with --truncate to replace it")
+            return False
+    return True
+
+
+def finish_tables(dsn):
+    """Move the SERIAL sequences past the generated ids, bump the table versions and refresh planner stats.
+
+    --fast-load sets session_replication_role = replica, which also skips the
+    trg_*_version triggers, so the data API would keep answering 304 Not
+    Modified with the old ETags; the versions are bumped here instead.
+    """
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        for table, column in [("users", "user_id"), ("products", "product_id"),
+                              ("orders", "order_id"), ("order_items", "order_item_id")]:
+            conn.execute(f"""
+                SELECT setval(pg_get_serial_sequence('ecommerce.{table}', '{column}'),
+                              COALESCE((SELECT MAX({column}) FROM ecommerce.{table}), 0) + 1, false)
+            """)
+        conn.execute("""
+            UPDATE ecommerce.table_versions
+            SET version = version + 1, changed_at = clock_timestamp()
+            WHERE table_name IN ('users', 'products', 'orders', 'order_items') AND shard = 0
+        """)
+        conn.execute("ANALYZE ecommerce.users, ecommerce.products, ecommerce.orders, ecommerce.order_items")
+
+
+def run_phase(pool, tasks):
+    started = time.perf_counter()
+    rows = {}
+    for result in pool.imap_unordered(_run_task, tasks):
+        table, count = result[0], result[1]
+        rows[table] = rows.get(table, 0) + count
+        if len(result) > 2:
+            rows["order_items"] = rows.get("order_items", 0) + result[2]
+    elapsed = time.perf_counter() - started
+    for table, count in rows.items():
+        print(f"   - {table}: {count:,} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/sec)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default="", help="Connection string (default: libpq environment)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--avg-items", type=float, default=5.0, help="Average line items per order")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of product popularity")
+    parser.add_argument("--user-skew", type=float, default=0.6, help="Zipf exponent of orders per user")
+    parser.add_argument("--start-date", default="2024-01-01", help="First order date (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=730, help="Length of the order date range")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Parallel COPY streams")
+    parser.add_argument("--truncate", action="store_true", help="Empty the ecommerce tables first")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="Skip FK triggers and synchronous commit while loading (superuser only)")
+    args = parser.parse_args()
+
+    config = {
+        "dsn": args.dsn, "seed": args.seed, "users": args.users, "products": args.products,
+        "avg_items": args.avg_items, "zipf": args.zipf, "user_skew": args.user_skew,
+        "start_date": args.start_date, "days": args.days, "fast_load": args.fast_load,
+    }
+
+    print("=" * 80)
+    print("Lakebase Training Data Generator")
+    print("=" * 80)
+    print(f"   Seed: {args.seed}  Workers: {args.workers}")
+    print(f"   Users: {args.users:,}  Products: {args.products:,}  Orders: {args.orders:,}")
+
+    if not prepare_tables(args.dsn, args.truncate):
+        return False
+
+    # Item ids are assigned from per-chunk item counts so they do not depend on load order
+    order_tasks, next_item_id = [], 1
+    for chunk, start, end in chunk_ranges(args.orders):
+        order_tasks.append(("orders", (chunk, start, end, next_item_id)))
+        next_item_id += int(item_counts(args.seed, chunk, end - start, args.avg_items).sum())
+    print(f"   Order items: {next_item_id - 1:,}")
+
+    started = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(args.workers, initializer=_init_worker, initargs=(config,)) as pool:
+        print("\n📝 Loading users and products...")
+        run_phase(pool, [("users", r) for r in chunk_ranges(args.users)]
+                  + [("products", r) for r in chunk_ranges(args.products)])
+        print("\n🛒 Loading orders and order items...")
+        run_phase(pool, order_tasks)
+
+    print("\n📊 Resetting sequences and analyzing...")
+    finish_tables(args.dsn)
+    print(f"\n✅ Generated data in {time.perf_counter() - started:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,92 @@
+"""
+Gunicorn configuration for serving dash_app.py in production.
+
+    gunicorn -c gunicorn.conf.py
+
+`python dash_app.py` runs Flask's development server: one process, so every
+callback's pandas and figure work shares a single GIL. Here the app is
+imported once in the master, so the layout, plotly templates and pandas
+are built before forking and shared copy-on-write, and GUNICORN_WORKERS
+processes with GUNICORN_THREADS threads each serve callbacks in parallel.
+post_fork() gives every worker its own OAuth token and connection pool.
+
+The master binds the port first and imports the app afterwards, in
+when_ready(). preload_app would import it before binding, and the Apps
+proxy answers 502 until something listens; this way connections queue in
+the listen backlog instead. Forked workers find dash_app already in
+sys.modules, so it is still imported only once.
+
+Configuration (environment variables):
+    GUNICORN_WORKERS   worker processes (default: 2 x CPU cores + 1, max 8)
+    GUNICORN_THREADS   threads per worker (default 4)
+    GUNICORN_TIMEOUT   seconds before a silent worker is restarted (default 120)
+
+Each worker opens up to DB_POOL_MAX_SIZE database connections, so the app
+can hold GUNICORN_WORKERS x DB_POOL_MAX_SIZE connections in total.
+
+Workers write their Prometheus metrics to PROMETHEUS_MULTIPROC_DIR (a fresh
+temporary directory unless set), so /metrics on any worker reports all of
+them; see metrics.py. API load tests publish their progress to LOAD_TEST_DIR
+the same way, because the polls and the Stop button of the API Testing tab
+can reach any worker. /debug/traces, /debug/queries and the /debug/profile
+and /debug/memory endpoints are per worker: each request shows or profiles
+only the worker that answers it.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+import time
+
+# Must be set before prometheus_client is imported, and start empty: values
+# left by a previous run would be added to this one's
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    for stale in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(stale)
+else:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+# Read by api_client at import, so also set before the app is imported
+if os.environ.get("LOAD_TEST_DIR"):
+    os.makedirs(os.environ["LOAD_TEST_DIR"], exist_ok=True)
+else:
+    os.environ["LOAD_TEST_DIR"] = tempfile.mkdtemp(prefix="load-tests-")
+
+wsgi_app = "dash_app:server"
+bind = f"0.0.0.0:{os.environ.get('DATABRICKS_APP_PORT', os.environ.get('PORT', '8080'))}"
+
+workers = int(os.environ.get("GUNICORN_WORKERS", min(2 * multiprocessing.cpu_count() + 1, 8)))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Vector search setup and slow custom queries can run long
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    start = time.perf_counter()
+    import dash_app
+
+    dash_app.preload_modules()
+    server.log.info("Imported dash_app in %.2fs", time.perf_counter() - start)
+
+
+def post_fork(server, worker):
+    import dash_app
+
+    dash_app.init_worker()
+    server.log.info("Worker %s ready (%s threads)", worker.pid, threads)
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (pool connections) from /metrics
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
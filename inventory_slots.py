@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Reservation Slot Manager for Hot Products
+=========================================
+Splits a best-selling product's stock into N slot rows so concurrent
+checkouts claim different rows instead of queueing on one products row lock
+(see the reservation slot section of setup_database.sql).
+
+Connection settings come from --dsn or the standard libpq environment
+variables (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT, PGSSLMODE).
+
+Usage:
+    python inventory_slots.py enable 42 --slots 16
+    python inventory_slots.py disable 42
+    python inventory_slots.py status
+    python inventory_slots.py rebalance --interval 5
+"""
+
+import argparse
+import sys
+import time
+
+import psycopg
+
+
+def slotted_products(conn):
+    """Return (product_id, name, stock_quantity, stock_slots) for slotted products."""
+    return conn.execute("""
+        SELECT product_id, name, stock_quantity, stock_slots
+        FROM ecommerce.product_inventory
+        WHERE stock_slots > 0
+        ORDER BY product_id
+    """).fetchall()
+
+
+def enable(conn, product_id, slots):
+    conn.execute("SELECT ecommerce.enable_stock_slots(%s, %s)", (product_id, slots))
+    print(f"✅ Product {product_id} now uses {slots} reservation slots")
+
+
+def disable(conn, product_id):
+    stock = conn.execute("SELECT ecommerce.disable_stock_slots(%s)", (product_id,)).fetchone()[0]
+    if stock is None:
+        print(f"Product {product_id} was not using reservation slots")
+    else:
+        print(f"✅ Product {product_id} back to single-row stock ({stock:,} units)")
+
+
+def rebalance_all(conn):
+    """Rebalance every slotted product, one short transaction per product."""
+    products = slotted_products(conn)
+    for product_id, _, _, _ in products:
+        conn.execute("SELECT ecommerce.rebalance_stock_slots(%s)", (product_id,))
+    return len(products)
+
+
+def status(conn):
+    products = slotted_products(conn)
+    if not products:
+        print("No products are using reservation slots")
+        return
+    for product_id, name, stock, slots in products:
+        quantities = [row[0] for row in conn.execute(
+            "SELECT quantity FROM ecommerce.product_stock_slots WHERE product_id = %s ORDER BY slot_no",
+            (product_id,),
+        )]
+        print(f"   - #{product_id} {name}: {stock:,} units in {slots} slots "
+              f"(min {min(quantities):,}, max {max(quantities):,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default="", help="Connection string (default: libpq environment)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enable_parser = commands.add_parser("enable", help="Split a product's stock into slots")
+    enable_parser.add_argument("product_id", type=int)
+    enable_parser.add_argument("--slots", type=int, default=16)
+
+    disable_parser = commands.add_parser("disable", help="Fold slots back into the product row")
+    disable_parser.add_argument("product_id", type=int)
+
+    rebalance_parser = commands.add_parser("rebalance", help="Rebalance all slotted products")
+    rebalance_parser.add_argument("--interval", type=float, default=0,
+                                  help="Repeat every N seconds (default: run once)")
+
+    commands.add_parser("status", help="Show slotted products")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if args.command == "enable":
+            enable(conn, args.product_id, args.slots)
+        elif args.command == "disable":
+            disable(conn, args.product_id)
+        elif args.command == "status":
+            status(conn)
+        elif args.command == "rebalance":
+            while True:
+                count = rebalance_all(conn)
+                print(f"Rebalanced {count} product(s)")
+                if not args.interval:
+                    break
+                time.sleep(args.interval)
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(0 if main() else 1)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,148 @@
+"""
+Prometheus metrics for the Dash app, served at /metrics.
+
+    lakebase_pool_connections{state}          pool connections: size, in_use, available, max
+    lakebase_pool_requests_waiting            callers queued for a connection
+    lakebase_pool_wait_seconds                time to check a connection out (histogram)
+    lakebase_db_query_seconds                 execute_query latency incl. network (histogram)
+    lakebase_db_errors_total{operation,error} failed connects and queries by exception class
+    lakebase_cache_requests_total{cache,result}  hit/miss per in-process cache
+    lakebase_oauth_refresh_total{result}      OAuth token refreshes
+    lakebase_oauth_refresh_seconds            OAuth token refresh time (histogram)
+    dash_callback_seconds{callback}           callback request latency per output id (histogram)
+    dash_callback_errors_total{callback}      callback requests answered with a 5xx
+
+Under gunicorn every worker has its own pool and counters. gunicorn.conf.py
+sets PROMETHEUS_MULTIPROC_DIR before the app is imported, so prometheus_client
+keeps the values in files there and any worker answering a scrape reports
+the sum over all of them; the pool gauges count live workers only.
+
+A good autoscaling signal is the pool saturation,
+sum(lakebase_pool_connections{state="in_use"}) / sum(lakebase_pool_connections{state="max"}),
+or lakebase_pool_requests_waiting > 0; alert on rate(lakebase_db_errors_total[5m])
+and on rate(lakebase_oauth_refresh_total{result="error"}[15m]).
+
+Everything here is a no-op if prometheus_client is not installed.
+"""
+
+import os
+import time
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+
+# Seconds; pool waits and queries are mostly well under a second
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+if prometheus_client:
+    POOL_CONNECTIONS = Gauge("lakebase_pool_connections", "Connection pool connections by state",
+                             ["state"], multiprocess_mode="livesum")
+    POOL_WAITING = Gauge("lakebase_pool_requests_waiting", "Callers waiting for a pooled connection",
+                         multiprocess_mode="livesum")
+    POOL_WAIT = Histogram("lakebase_pool_wait_seconds", "Time to check out a pooled connection",
+                          buckets=LATENCY_BUCKETS)
+    QUERY_DURATION = Histogram("lakebase_db_query_seconds", "LakebaseConnection.execute_query latency",
+                               buckets=LATENCY_BUCKETS)
+    DB_ERRORS = Counter("lakebase_db_errors_total", "Failed database operations",
+                        ["operation", "error"])
+    CACHE_REQUESTS = Counter("lakebase_cache_requests_total", "In-process cache lookups",
+                             ["cache", "result"])
+    OAUTH_REFRESHES = Counter("lakebase_oauth_refresh_total", "OAuth token refreshes", ["result"])
+    OAUTH_REFRESH_DURATION = Histogram("lakebase_oauth_refresh_seconds", "OAuth token refresh time",
+                                       buckets=LATENCY_BUCKETS)
+    CALLBACK_DURATION = Histogram("dash_callback_seconds", "Dash callback request latency",
+                                  ["callback"], buckets=LATENCY_BUCKETS)
+    CALLBACK_ERRORS = Counter("dash_callback_errors_total", "Dash callback requests that failed",
+                              ["callback"])
+
+
+def pool_checkout(pool, seconds):
+    """Record a connection checkout and the pool's occupancy after it."""
+    if prometheus_client:
+        POOL_WAIT.observe(seconds)
+        pool_state(pool)
+
+
+def pool_state(pool):
+    if prometheus_client:
+        stats = pool.get_stats()
+        POOL_CONNECTIONS.labels("size").set(stats["pool_size"])
+        POOL_CONNECTIONS.labels("available").set(stats["pool_available"])
+        POOL_CONNECTIONS.labels("in_use").set(stats["pool_size"] - stats["pool_available"])
+        POOL_CONNECTIONS.labels("max").set(stats["pool_max"])
+        POOL_WAITING.set(stats["requests_waiting"])
+
+
+def query(seconds, error=None):
+    if prometheus_client:
+        QUERY_DURATION.observe(seconds)
+        if error is not None:
+            db_error("query", error)
+
+
+def db_error(operation, error):
+    if prometheus_client:
+        DB_ERRORS.labels(operation, type(error).__name__).inc()
+
+
+def cache_lookup(cache, hits=0, misses=0):
+    if prometheus_client:
+        if hits:
+            CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+        if misses:
+            CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+def oauth_refresh(seconds, error=None):
+    if prometheus_client:
+        OAUTH_REFRESHES.labels("error" if error is not None else "success").inc()
+        OAUTH_REFRESH_DURATION.observe(seconds)
+
+
+def registry():
+    """The registry to expose: every worker's files under gunicorn, this process otherwise."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        collector_registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return collector_registry
+    return prometheus_client.REGISTRY
+
+
+def configure(server, dash_app=None):
+    """Serve /metrics on `server` and time the callbacks of `dash_app`."""
+    if not prometheus_client:
+        return
+    from flask import Response, abort, g, request
+
+    import tracing
+
+    @server.route("/metrics")
+    def metrics_endpoint():
+        if not tracing.debug_allowed(request):
+            abort(403)
+        return Response(prometheus_client.generate_latest(registry()),
+                        content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+    if dash_app is None:
+        return
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path.endswith("/_dash-update-component"):
+            g.callback_started = time.perf_counter()
+
+    @server.after_request
+    def observe_callback(response):
+        started = g.pop("callback_started", None)
+        if started is not None:
+            output = (request.get_json(silent=True) or {}).get("output")
+            # Only registered outputs become label values
+            callback = output if isinstance(output, str) and output in dash_app.callback_map else "unknown"
+            CALLBACK_DURATION.labels(callback).observe(time.perf_counter() - started)
+            if response.status_code >= 500:
+                CALLBACK_ERRORS.labels(callback).inc()
+        return response
@@ -0,0 +1,70 @@
+"""
+Order creation helpers shared by the Dash and Streamlit apps.
+
+Orders are created by the ecommerce.create_order() database function defined
+in setup_database.sql, so the order header, all order_items, the total and the
+stock decrements are one atomic round trip no matter how many line items the
+order has.
+"""
+
+import json
+
+CREATE_ORDER_QUERY = """
+    SELECT order_id, total_amount
+    FROM ecommerce.create_order(%s, %s::jsonb, %s::jsonb, %s)
+"""
+
+PAYMENT_METHODS = ["credit_card", "paypal", "bank_transfer"]
+
+# SQLSTATE raised by ecommerce.create_order() for empty orders and stock-outs
+INSUFFICIENT_STOCK_SQLSTATE = "23514"
+
+
+def parse_order_items(text):
+    """Parse 'product_id:quantity' pairs separated by commas or newlines.
+
+    A bare product_id means a quantity of 1.
+    """
+    items = []
+    for token in (text or "").replace(",", "\n").splitlines():
+        token = token.strip()
+        if not token:
+            continue
+        product_id, sep, quantity = token.partition(":")
+        try:
+            items.append({
+                "product_id": int(product_id),
+                "quantity": int(quantity) if sep else 1,
+            })
+        except ValueError:
+            raise ValueError(f"Invalid order item '{token}', expected product_id:quantity")
+    if not items:
+        raise ValueError("Order must contain at least one item")
+    return items
+
+
+def create_order(db, user_id, items, shipping_address=None, payment_method=None):
+    """Create an order in a single round trip.
+
+    `db` is an open LakebaseConnection from either app. Returns a dict with
+    order_id and total_amount; raises the driver's CheckViolation error when
+    any product has insufficient stock.
+    """
+    result = db.execute_query(
+        CREATE_ORDER_QUERY,
+        (
+            user_id,
+            json.dumps(items),
+            json.dumps(shipping_address) if shipping_address else None,
+            payment_method,
+        ),
+        commit=True,
+    )
+    return result[0]
+
+
+def is_insufficient_stock(error):
+    """Return True if `error` is the stock check raised by create_order()."""
+    # psycopg 3 exposes .sqlstate, psycopg2 exposes .pgcode
+    code = getattr(error, "sqlstate", None) or getattr(error, "pgcode", None)
+    return code == INSUFFICIENT_STOCK_SQLSTATE
@@ -0,0 +1,118 @@
+"""
+SQL used by the Dash and Streamlit apps.
+
+Keeping the statements in one place lets both apps and the benchmark suite
+(benchmarks/run_benchmarks.py) run exactly the same queries.
+"""
+
+# ========================================
+# Dashboard
+# ========================================
+USERS_COUNT = "SELECT COUNT(*) as count FROM ecommerce.users"
+
+PRODUCTS_COUNT = "SELECT COUNT(*) as count FROM ecommerce.products"
+
+ORDERS_COUNT = "SELECT COUNT(*) as count FROM ecommerce.orders"
+
+COMPLETED_REVENUE = """
+    SELECT COALESCE(SUM(total_amount), 0) as revenue
+    FROM ecommerce.orders
+    WHERE status='completed'
+"""
+
+TOP_STOCK_PRODUCTS = """
+    SELECT name, stock_quantity, category
+    FROM ecommerce.product_inventory
+    ORDER BY stock_quantity DESC
+    LIMIT 10
+"""
+
+DAILY_REVENUE = """
+    SELECT
+        DATE(order_date) as date,
+        SUM(total_amount) as daily_revenue
+    FROM ecommerce.orders
+    WHERE status = 'completed'
+    GROUP BY DATE(order_date)
+    ORDER BY date DESC
+    LIMIT 30
+"""
+
+RECENT_ORDERS = """
+    SELECT
+        o.order_id,
+        u.username,
+        o.order_date,
+        o.status,
+        o.total_amount
+    FROM ecommerce.orders o
+    JOIN ecommerce.users u ON o.user_id = u.user_id
+    ORDER BY o.order_date DESC
+    LIMIT 10
+"""
+
+# ========================================
+# Data entry
+# ========================================
+INSERT_PRODUCT = """
+    INSERT INTO ecommerce.products
+    (name, description, price, stock_quantity, category, tags)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_USER = """
+    INSERT INTO ecommerce.users
+    (email, username, full_name, metadata)
+    VALUES (%s, %s, %s, %s::jsonb)
+"""
+
+# ========================================
+# Query Builder sample queries (value -> label, SQL)
+# ========================================
+SAMPLE_QUERIES = {
+    "top_products": {
+        "label": "Top selling products",
+        "sql": """
+            SELECT p.name, COUNT(oi.order_item_id) as times_ordered,
+                   SUM(oi.quantity) as total_quantity
+            FROM ecommerce.products p
+            JOIN ecommerce.order_items oi ON p.product_id = oi.product_id
+            GROUP BY p.product_id, p.name
+            ORDER BY times_ordered DESC
+            LIMIT 10
+        """,
+    },
+    "user_history": {
+        "label": "User purchase history",
+        "sql": """
+            SELECT u.username, COUNT(o.order_id) as total_orders,
+                   SUM(o.total_amount) as lifetime_value
+            FROM ecommerce.users u
+            LEFT JOIN ecommerce.orders o ON u.user_id = o.user_id
+            GROUP BY u.user_id, u.username
+            ORDER BY lifetime_value DESC
+        """,
+    },
+    "low_stock": {
+        "label": "Low stock alert",
+        "sql": """
+            SELECT name, stock_quantity, category
+            FROM ecommerce.product_inventory
+            WHERE stock_quantity < 10
+            ORDER BY stock_quantity ASC
+        """,
+    },
+    "revenue_category": {
+        "label": "Revenue by category",
+        "sql": """
+            SELECT p.category, COUNT(DISTINCT o.order_id) as orders,
+                   SUM(oi.subtotal) as revenue
+            FROM ecommerce.order_items oi
+            JOIN ecommerce.orders o ON o.order_id = oi.order_id
+            JOIN ecommerce.products p ON p.product_id = oi.product_id
+            WHERE o.status = 'completed'
+            GROUP BY p.category
+            ORDER BY revenue DESC
+        """,
+    },
+}
@@ -0,0 +1,192 @@
+"""
+Application-side query statistics and slow-query log for LakebaseConnection.
+
+Like pg_stat_statements, but measured by the app, so the latency includes
+the network round trip and fetching the rows. Each statement is reduced to
+a fingerprint (literals, bind parameters and IN lists replaced by ?, comments
+and whitespace collapsed) and aggregated: calls, errors, total, mean, min and
+max time, and rows. Both apps call record() from execute_query().
+
+Statements slower than SLOW_QUERY_MS are printed to stderr as one JSON line
+with their parameters (each value truncated), and the last few are kept
+per fingerprint. configure() serves the statistics at /debug/queries:
+HTML by default, ?format=json for JSON, ?sort=calls|total_ms|mean_ms|max_ms|rows,
+and DELETE to reset them.
+
+Configuration (environment variables):
+    SLOW_QUERY_MS         slow-query threshold in milliseconds (default 500)
+    SLOW_QUERY_PARAMS     "false" leaves parameters out of the slow-query log
+    SLOW_QUERY_SAMPLES    slow executions kept per fingerprint (default 5)
+    QUERY_STATS_MAX       fingerprints tracked; the least-called is evicted (default 1000)
+"""
+
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '500'))
+SLOW_QUERY_PARAMS = os.getenv('SLOW_QUERY_PARAMS', 'true').lower() != 'false'
+SLOW_QUERY_SAMPLES = int(os.getenv('SLOW_QUERY_SAMPLES', '5'))
+QUERY_STATS_MAX = int(os.getenv('QUERY_STATS_MAX', '1000'))
+MAX_PARAM_LENGTH = 100
+SORT_KEYS = ["total_ms", "mean_ms", "max_ms", "calls", "rows", "errors"]
+
+# Strings and comments in one pass, so quotes in comments and dashes in
+# strings are each handled by whichever comes first
+_STRINGS_AND_COMMENTS = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.S)
+_NUMBERS = re.compile(r"(?<![\w.$?])[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?\b", re.I)
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)|\[\s*\?(?:\s*,\s*\?)+\s*\]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "query", "calls", "errors", "total_ms", "min_ms", "max_ms", "rows",
+                 "last_seen", "slow")
+
+    def __init__(self, fingerprint, query):
+        self.fingerprint = fingerprint
+        self.query = query
+        self.calls = self.errors = self.rows = 0
+        self.total_ms = self.max_ms = 0.0
+        self.min_ms = float("inf")
+        self.last_seen = None
+        self.slow = deque(maxlen=SLOW_QUERY_SAMPLES)
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "query": self.query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "min_ms": self.min_ms if self.calls else 0.0,
+            "max_ms": self.max_ms,
+            "rows": self.rows,
+            "last_seen": self.last_seen,
+            "slow": list(self.slow),
+        }
+
+
+_stats = {}
+_lock = threading.Lock()
+_since = time.time()
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(query):
+    """Return (fingerprint id, normalized statement) for a SQL string."""
+    normalized = _STRINGS_AND_COMMENTS.sub(lambda m: "?" if m.group().startswith("'") else " ", query)
+    normalized = _PLACEHOLDERS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _LISTS.sub(lambda m: m.group()[0] + "?..." + m.group()[-1], normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().rstrip(";")
+    return hashlib.sha1(normalized.lower().encode()).hexdigest()[:16], normalized
+
+
+def _sample_params(params):
+    if params is None:
+        return None
+    items = params.items() if isinstance(params, dict) else enumerate(params)
+    return {str(key): (value if isinstance(value, (int, float, bool)) or value is None
+                       else repr(value)[:MAX_PARAM_LENGTH])
+            for key, value in items}
+
+
+def record(query, duration_ms, rows=0, params=None, error=None):
+    """Add one execution of `query` to the statistics; returns its fingerprint id."""
+    query_id, normalized = fingerprint(query)
+    slow = duration_ms >= SLOW_QUERY_MS
+    sample = None
+    if slow:
+        sample = {"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "ms": round(duration_ms, 1), "rows": rows,
+                  "params": _sample_params(params) if SLOW_QUERY_PARAMS else None}
+        if error is not None:
+            sample["error"] = f"{type(error).__name__}: {error}"[:200]
+    with _lock:
+        stats = _stats.get(query_id)
+        if stats is None:
+            if len(_stats) >= QUERY_STATS_MAX:
+                del _stats[min(_stats.values(), key=lambda s: s.calls).fingerprint]
+            stats = _stats[query_id] = QueryStats(query_id, normalized)
+        stats.calls += 1
+        stats.errors += error is not None
+        # rowcount is -1 when the driver can't tell
+        stats.rows += max(rows or 0, 0)
+        stats.total_ms += duration_ms
+        stats.min_ms = min(stats.min_ms, duration_ms)
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.last_seen = time.time()
+        if sample:
+            stats.slow.append(sample)
+    if slow:
+        print(json.dumps({"slow_query": query_id, "query": normalized[:500], **sample}, default=str),
+              file=sys.stderr, flush=True)
+    return query_id
+
+
+def snapshot(sort="total_ms", limit=None):
+    """Statistics per fingerprint as dicts, largest `sort` value first."""
+    with _lock:
+        rows = [s.as_dict() for s in _stats.values()]
+    rows.sort(key=lambda r: -r[sort if sort in SORT_KEYS else "total_ms"])
+    return rows[:limit]
+
+
+def reset():
+    global _since
+    with _lock:
+        _stats.clear()
+        _since = time.time()
+
+
+def configure(server):
+    """Serve the statistics at /debug/queries on `server` (guarded by DEBUG_TOKEN)."""
+    from flask import abort, jsonify, request
+
+    import tracing
+
+    @server.route("/debug/queries", methods=["GET", "DELETE"])
+    def queries_page():
+        if not tracing.debug_allowed(request):
+            abort(403)
+        if request.method == "DELETE":
+            reset()
+            return "", 204
+        rows = snapshot(request.args.get("sort", "total_ms"), request.args.get("limit", 100, type=int))
+        if request.args.get("format") == "json":
+            return jsonify({"since": _since, "slow_query_ms": SLOW_QUERY_MS, "queries": rows})
+        return render_html(rows)
+
+
+def render_html(rows):
+    columns = ["calls", "errors", "total_ms", "mean_ms", "min_ms", "max_ms", "rows"]
+    header = "".join(f'<th><a href="?sort={c}">{c}</a></th>' if c in SORT_KEYS else f"<th>{c}</th>"
+                     for c in columns)
+    body = []
+    for r in rows:
+        slow = (f'<p>Slow executions:</p><pre>{html.escape(json.dumps(r["slow"], indent=1, default=str))}</pre>'
+                if r["slow"] else "")
+        cells = "".join(f"<td>{r[c]:,.1f}</td>" if isinstance(r[c], float) else f"<td>{r[c]:,}</td>"
+                        for c in columns)
+        body.append(f'<tr><td><details><summary><code>{html.escape(r["query"][:120])}</code></summary>'
+                    f'<pre>{html.escape(r["query"])}</pre>{slow}</details></td>{cells}</tr>')
+    return f"""<!DOCTYPE html>
+<html><head><title>Query statistics</title><style>
+body{{font-family:Arial,sans-serif;margin:24px}} table{{border-collapse:collapse;font-size:13px}}
+td,th{{padding:4px 8px;border-bottom:1px solid #eee;text-align:left;vertical-align:top}}
+pre{{white-space:pre-wrap;max-width:900px}}
+</style></head><body>
+<h2>Query statistics</h2>
+<p>Measured in the app since {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_since))}, including network
+time; slow means over {SLOW_QUERY_MS:,.0f} ms. <a href="?format=json">JSON</a></p>
+<table><tr><th>statement</th>{header}</tr>
+{"".join(body)}</table></body></html>"""
@@ -0,0 +1,121 @@
+"""
+Fast JSON serialization and response compression for the Dash app.
+
+Dash serializes every callback response (DataTable records, whole plotly
+figures) with plotly's JSON engine, which uses orjson when it is installed
+but falls back to a slow recursive clean-up pass as soon as one value
+orjson cannot encode natively, such as a Decimal from a NUMERIC column,
+turns up. dash_app.py therefore loads NUMERIC as float (see
+DISPLAY_ADAPTERS there), and everything else that returns JSON from the
+Flask server goes through dumps() below, which encodes Decimal, datetime,
+NumPy and pandas values directly.
+
+Responses larger than COMPRESS_MIN_SIZE are compressed with brotli or gzip,
+whichever the client accepts (brotli preferred), via flask-compress.
+
+Configuration (environment variables):
+    JSON_ENGINE        "auto" (orjson if installed), "orjson" or "json"
+    COMPRESS_MIN_SIZE  smallest response body, in bytes, worth compressing
+"""
+
+import datetime
+import decimal
+import json
+import os
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_ENGINE = os.getenv('JSON_ENGINE', 'auto')
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+
+# orjson options: NumPy arrays and non-string dict keys encode natively
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def engine():
+    """Return the JSON engine in use, "orjson" or "json"."""
+    if JSON_ENGINE not in ("auto", "orjson", "json"):
+        raise ValueError(f"Unknown JSON_ENGINE '{JSON_ENGINE}', expected auto, orjson or json")
+    if JSON_ENGINE == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+
+def default(obj):
+    """Encode the values neither engine handles on its own."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # NumPy arrays/scalars and pandas Timestamps, without importing either
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "to_plotly_json"):
+        return obj.to_plotly_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize to compact JSON bytes."""
+    if engine() == "orjson":
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=default, separators=(",", ":")).encode()
+
+
+def loads(data):
+    if engine() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider (jsonify, request.get_json) backed by dumps()."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype="application/json")
+
+
+def compression_available():
+    try:
+        import flask_compress  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def configure(server):
+    """Use fast JSON for Flask and plotly, and configure response compression.
+
+    Call before creating the Dash app on `server`, then pass
+    compress=compression_available() to dash.Dash().
+    """
+    import plotly.io as pio
+
+    pio.json.config.default_engine = engine()
+    server.json = FastJSONProvider(server)
+    server.config.setdefault("COMPRESS_MIN_SIZE", COMPRESS_MIN_SIZE)
+    server.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"] if brotli else ["gzip"])
+    # Callback responses are generated per request; favour speed over ratio
+    server.config.setdefault("COMPRESS_BR_LEVEL", 4)
+    server.config.setdefault("COMPRESS_LEVEL", 6)
@@ -58,6 +58,420 @@ CREATE INDEX IF NOT EXISTS idx_products_category ON ecommerce.products(category)
 CREATE INDEX IF NOT EXISTS idx_orders_user_id ON ecommerce.orders(user_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON ecommerce.orders(status);
 CREATE INDEX IF NOT EXISTS idx_users_metadata ON ecommerce.users USING GIN(metadata);
+CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON ecommerce.order_items(order_id);
+
+-- ========================================
+-- Reservation slots for hot products (optional inventory mode)
+-- ========================================
+-- A best-selling product serializes every checkout on its products row lock.
+-- enable_stock_slots() splits its stock across N slot rows; buyers claim from
+-- a random unlocked slot (FOR UPDATE SKIP LOCKED) and never touch the
+-- products row. rebalance_stock_slots() evens the slots out and writes the
+-- total back to products.stock_quantity; ecommerce.product_inventory always
+-- shows the exact figure. While a product is slotted, change its stock by
+-- disabling slots, updating stock_quantity and enabling them again.
+CREATE TABLE IF NOT EXISTS ecommerce.product_stock_slots (
+    product_id INTEGER NOT NULL REFERENCES ecommerce.products(product_id) ON DELETE CASCADE,
+    slot_no SMALLINT NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
+    PRIMARY KEY (product_id, slot_no)
+);
+
+-- Exact visible stock for dashboards: slot totals for slotted products
+CREATE OR REPLACE VIEW ecommerce.product_inventory AS
+SELECT p.product_id,
+       p.name,
+       p.category,
+       p.price,
+       COALESCE(s.quantity, p.stock_quantity) AS stock_quantity,
+       COALESCE(s.slots, 0) AS stock_slots
+FROM ecommerce.products p
+LEFT JOIN (
+    SELECT product_id, SUM(quantity)::INTEGER AS quantity, COUNT(*)::INTEGER AS slots
+    FROM ecommerce.product_stock_slots
+    GROUP BY product_id
+) s ON s.product_id = p.product_id;
+
+CREATE OR REPLACE FUNCTION ecommerce.enable_stock_slots(p_product_id INTEGER, p_slots INTEGER DEFAULT 16)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_stock INTEGER;
+BEGIN
+    IF p_slots < 1 THEN
+        RAISE EXCEPTION 'p_slots must be at least 1' USING ERRCODE = 'check_violation';
+    END IF;
+    PERFORM ecommerce.disable_stock_slots(p_product_id);
+
+    SELECT stock_quantity INTO v_stock
+    FROM ecommerce.products
+    WHERE product_id = p_product_id
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Product % does not exist', p_product_id USING ERRCODE = 'no_data_found';
+    END IF;
+
+    INSERT INTO ecommerce.product_stock_slots (product_id, slot_no, quantity)
+    SELECT p_product_id, slot_no,
+           COALESCE(v_stock, 0) / p_slots + CASE WHEN slot_no < COALESCE(v_stock, 0) % p_slots THEN 1 ELSE 0 END
+    FROM generate_series(0, p_slots - 1) AS slot_no;
+    RETURN p_slots;
+END;
+$$;
+
+-- Folds the slots back into products.stock_quantity; returns the final stock
+CREATE OR REPLACE FUNCTION ecommerce.disable_stock_slots(p_product_id INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_total INTEGER;
+BEGIN
+    WITH removed AS (
+        DELETE FROM ecommerce.product_stock_slots
+        WHERE product_id = p_product_id
+        RETURNING quantity
+    )
+    SELECT SUM(quantity)::INTEGER INTO v_total FROM removed;
+
+    IF v_total IS NOT NULL THEN
+        UPDATE ecommerce.products
+        SET stock_quantity = v_total
+        WHERE product_id = p_product_id;
+    END IF;
+    RETURN v_total;
+END;
+$$;
+
+-- Evens out a product's slots and syncs products.stock_quantity.
+-- Takes all slot locks, so run it per product in its own short transaction.
+CREATE OR REPLACE FUNCTION ecommerce.rebalance_stock_slots(p_product_id INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_slots INTEGER;
+    v_total INTEGER;
+BEGIN
+    SELECT COUNT(*), SUM(quantity)
+    INTO v_slots, v_total
+    FROM (
+        SELECT quantity
+        FROM ecommerce.product_stock_slots
+        WHERE product_id = p_product_id
+        ORDER BY slot_no
+        FOR UPDATE
+    ) s;
+    IF v_slots = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE ecommerce.product_stock_slots
+    SET quantity = v_total / v_slots + CASE WHEN slot_no < v_total % v_slots THEN 1 ELSE 0 END
+    WHERE product_id = p_product_id;
+
+    UPDATE ecommerce.products
+    SET stock_quantity = v_total
+    WHERE product_id = p_product_id AND stock_quantity IS DISTINCT FROM v_total;
+    RETURN v_total;
+END;
+$$;
+
+-- Takes p_quantity from one random slot with enough stock. Slots locked by
+-- other buyers are skipped. When no free slot holds p_quantity (it is bigger
+-- than any slot, or the big ones are busy), every slot of the product is
+-- locked in slot order and the quantity drained across them, fullest first.
+-- Returns false only when all the slots together hold less than p_quantity.
+CREATE OR REPLACE FUNCTION ecommerce.claim_stock_slot(p_product_id INTEGER, p_quantity INTEGER)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_slot_no SMALLINT;
+    v_total INTEGER;
+BEGIN
+    SELECT slot_no INTO v_slot_no
+    FROM ecommerce.product_stock_slots
+    WHERE product_id = p_product_id AND quantity >= p_quantity
+    ORDER BY random()
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF FOUND THEN
+        UPDATE ecommerce.product_stock_slots
+        SET quantity = quantity - p_quantity
+        WHERE product_id = p_product_id AND slot_no = v_slot_no;
+        RETURN TRUE;
+    END IF;
+
+    SELECT COALESCE(SUM(quantity), 0) INTO v_total
+    FROM (
+        SELECT quantity
+        FROM ecommerce.product_stock_slots
+        WHERE product_id = p_product_id
+        ORDER BY slot_no
+        FOR UPDATE
+    ) s;
+    IF v_total < p_quantity THEN
+        RETURN FALSE;
+    END IF;
+
+    -- Each slot gives what is still missing after the fuller slots before it
+    UPDATE ecommerce.product_stock_slots s
+    SET quantity = s.quantity - d.take
+    FROM (
+        SELECT slot_no,
+               LEAST(quantity, p_quantity - (SUM(quantity) OVER (ORDER BY quantity DESC, slot_no) - quantity)) AS take
+        FROM ecommerce.product_stock_slots
+        WHERE product_id = p_product_id
+    ) d
+    WHERE s.product_id = p_product_id AND s.slot_no = d.slot_no AND d.take > 0;
+    RETURN TRUE;
+END;
+$$;
+
+-- ========================================
+-- Change tracking
+-- ========================================
+-- Every UPDATE that changes what a product is (name, description, price,
+-- category, tags), including direct SQL, bumps updated_at, so ann_index.py
+-- can refresh incrementally from it. Stock changes and embedding writes
+-- leave it alone. The WHEN lists the columns rather than comparing whole
+-- rows: a BEFORE trigger may not reference NEW's generated columns
+-- (search_vector, content_hash).
+CREATE OR REPLACE FUNCTION ecommerce.touch_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_products_updated_at ON ecommerce.products;
+CREATE TRIGGER trg_products_updated_at
+    BEFORE UPDATE ON ecommerce.products
+    FOR EACH ROW
+    WHEN ((OLD.name, OLD.description, OLD.price, OLD.category, OLD.tags)
+          IS DISTINCT FROM (NEW.name, NEW.description, NEW.price, NEW.category, NEW.tags))
+    EXECUTE FUNCTION ecommerce.touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON ecommerce.products(updated_at);
+
+-- ========================================
+-- Table change versions
+-- ========================================
+-- The data API templates turn these into ETag/Last-Modified headers and
+-- answer If-None-Match without running the main query. Every statement that
+-- writes a tracked table bumps one of 16 counter rows for that table,
+-- skipping rows other transactions hold, so concurrent writers (e.g.
+-- checkouts) rarely wait on each other. A table's version is the sum of its
+-- rows, committed with the data it describes.
+CREATE TABLE IF NOT EXISTS ecommerce.table_versions (
+    table_name TEXT NOT NULL,
+    shard SMALLINT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, shard)
+);
+
+INSERT INTO ecommerce.table_versions (table_name, shard)
+SELECT t, s
+FROM unnest(ARRAY['users', 'products', 'orders', 'order_items', 'product_stock_slots']) AS t,
+     generate_series(0, 15) AS s
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION ecommerce.bump_table_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_shard SMALLINT;
+BEGIN
+    -- Start from a per-backend shard; a row this transaction already holds
+    -- is never skipped
+    SELECT shard INTO v_shard
+    FROM ecommerce.table_versions
+    WHERE table_name = TG_TABLE_NAME
+    ORDER BY (shard + pg_backend_pid()) % 16
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    INSERT INTO ecommerce.table_versions AS tv (table_name, shard, version, changed_at)
+    VALUES (TG_TABLE_NAME, COALESCE(v_shard, pg_backend_pid() % 16), 1, clock_timestamp())
+    ON CONFLICT (table_name, shard) DO UPDATE
+    SET version = tv.version + 1,
+        changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['users', 'products', 'orders', 'order_items', 'product_stock_slots'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_version ON ecommerce.%I', v_table, v_table);
+        EXECUTE format('CREATE TRIGGER trg_%s_version
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ecommerce.%I
+                            FOR EACH STATEMENT
+                            EXECUTE FUNCTION ecommerce.bump_table_version()', v_table, v_table);
+    END LOOP;
+END;
+$$;
+
+-- ========================================
+-- Product full-text search
+-- ========================================
+-- search_vector is maintained by Postgres on every insert/update; name ranks
+-- above description, which ranks above tags.
+CREATE OR REPLACE FUNCTION ecommerce.tags_text(p_tags TEXT[])
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    -- array_to_string() is only STABLE, which generated columns do not accept
+    SELECT array_to_string(p_tags, ' ');
+$$;
+
+ALTER TABLE ecommerce.products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(name, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(ecommerce.tags_text(tags), '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON ecommerce.products USING GIN(search_vector);
+
+-- ========================================
+-- Product trigram search
+-- ========================================
+-- "Traditional" search and type-ahead rank by word_similarity(); the
+-- `<%` operator they filter with is served by these indexes instead of
+-- a full scan.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON ecommerce.products USING GIN(name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_products_description_trgm ON ecommerce.products USING GIN(description gin_trgm_ops);
+
+-- ========================================
+-- Order creation (single round trip)
+-- ========================================
+-- Creates the order header, all order_items and the stock decrements in one
+-- atomic call. p_items is a JSON array of {"product_id": int, "quantity": int};
+-- duplicate product_ids are merged. Product rows are locked in product_id
+-- order so concurrent multi-item orders cannot deadlock, and the stock check
+-- is part of the UPDATE so it is re-evaluated after waiting on a row lock.
+-- Slotted products are claimed from their reservation slots instead.
+-- Raises check_violation (SQLSTATE 23514) without creating anything when any
+-- product is missing or has insufficient stock.
+CREATE OR REPLACE FUNCTION ecommerce.create_order(
+    p_user_id INTEGER,
+    p_items JSONB,
+    p_shipping_address JSONB DEFAULT NULL,
+    p_payment_method VARCHAR DEFAULT NULL,
+    p_status VARCHAR DEFAULT 'pending'
+)
+RETURNS TABLE (order_id INTEGER, total_amount DECIMAL(10, 2))
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_product_ids INTEGER[];
+    v_quantities INTEGER[];
+    v_prices DECIMAL(10, 2)[];
+    v_slotted_ids INTEGER[];
+    v_decremented_ids INTEGER[];
+    v_item RECORD;
+    v_order_id INTEGER;
+    v_total DECIMAL(10, 2);
+BEGIN
+    SELECT array_agg(r.product_id ORDER BY r.product_id),
+           array_agg(r.quantity ORDER BY r.product_id)
+    INTO v_product_ids, v_quantities
+    FROM (
+        SELECT (item->>'product_id')::INTEGER AS product_id,
+               SUM((item->>'quantity')::INTEGER)::INTEGER AS quantity
+        FROM jsonb_array_elements(p_items) AS item
+        GROUP BY 1
+    ) r;
+
+    IF v_product_ids IS NULL THEN
+        RAISE EXCEPTION 'Order must contain at least one item'
+            USING ERRCODE = 'check_violation';
+    END IF;
+    IF EXISTS (SELECT 1 FROM unnest(v_quantities) AS q WHERE q IS NULL OR q <= 0) THEN
+        RAISE EXCEPTION 'Order item quantities must be positive'
+            USING ERRCODE = 'check_violation';
+    END IF;
+
+    SELECT COALESCE(array_agg(DISTINCT s.product_id), '{}')
+    INTO v_slotted_ids
+    FROM ecommerce.product_stock_slots s
+    WHERE s.product_id = ANY(v_product_ids);
+
+    -- Lock in a deterministic order, then decrement only rows with enough stock
+    PERFORM 1
+    FROM ecommerce.products p
+    WHERE p.product_id = ANY(v_product_ids)
+      AND NOT p.product_id = ANY(v_slotted_ids)
+    ORDER BY p.product_id
+    FOR UPDATE;
+
+    WITH decremented AS (
+        UPDATE ecommerce.products p
+        SET stock_quantity = p.stock_quantity - r.quantity
+        FROM unnest(v_product_ids, v_quantities) AS r(product_id, quantity)
+        WHERE p.product_id = r.product_id
+          AND NOT p.product_id = ANY(v_slotted_ids)
+          AND p.stock_quantity >= r.quantity
+        RETURNING p.product_id
+    )
+    SELECT COALESCE(array_agg(d.product_id), '{}')
+    INTO v_decremented_ids
+    FROM decremented d;
+
+    FOR v_item IN
+        SELECT r.product_id, r.quantity
+        FROM unnest(v_product_ids, v_quantities) AS r(product_id, quantity)
+        WHERE r.product_id = ANY(v_slotted_ids)
+        ORDER BY r.product_id
+    LOOP
+        IF ecommerce.claim_stock_slot(v_item.product_id, v_item.quantity) THEN
+            v_decremented_ids := v_decremented_ids || v_item.product_id;
+        END IF;
+    END LOOP;
+
+    IF array_length(v_decremented_ids, 1) IS DISTINCT FROM array_length(v_product_ids, 1) THEN
+        RAISE EXCEPTION 'Insufficient stock for product(s) %',
+            (SELECT array_agg(id)
+             FROM unnest(v_product_ids) AS id
+             WHERE NOT id = ANY(v_decremented_ids))
+            USING ERRCODE = 'check_violation';
+    END IF;
+
+    SELECT array_agg(p.price ORDER BY p.product_id)
+    INTO v_prices
+    FROM ecommerce.products p
+    WHERE p.product_id = ANY(v_product_ids);
+
+    SELECT SUM(r.quantity * r.price)
+    INTO v_total
+    FROM unnest(v_quantities, v_prices) AS r(quantity, price);
+
+    INSERT INTO ecommerce.orders (user_id, status, total_amount, shipping_address, payment_method)
+    VALUES (p_user_id, p_status, v_total, p_shipping_address, p_payment_method)
+    RETURNING orders.order_id INTO v_order_id;
+
+    INSERT INTO ecommerce.order_items (order_id, product_id, quantity, unit_price)
+    SELECT v_order_id, r.product_id, r.quantity, r.price
+    FROM unnest(v_product_ids, v_quantities, v_prices) AS r(product_id, quantity, price);
+
+    RETURN QUERY SELECT v_order_id, v_total;
+END;
+$$;
 
 -- Insert sample users
 INSERT INTO ecommerce.users (email, username, full_name, metadata) VALUES
@@ -0,0 +1,216 @@
+-- ========================================
+-- Lakebase Training: pgvector Semantic Search
+-- ========================================
+-- Requires the pgvector extension (run after setup_database.sql).
+-- The 384 dimensions and HNSW build parameters below are the defaults;
+-- `python vector_search.py setup --dim N --m M --ef-construction E`
+-- applies the same DDL with other values.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+ALTER TABLE ecommerce.products ADD COLUMN IF NOT EXISTS embedding vector(384);
+
+-- m: graph degree (recall and memory grow with it)
+-- ef_construction: build-time candidate list (recall and build time grow with it)
+CREATE INDEX IF NOT EXISTS idx_products_embedding_hnsw
+    ON ecommerce.products USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Embedding backfill queue (embedding_backfill.py). content_hash follows the
+-- text that is embedded; embedded_hash records the content_hash the current
+-- embedding was computed from, so a product needs (re-)embedding exactly
+-- when the two differ, whether it was added or edited by the apps, a bulk
+-- import or direct SQL. Needs tags_text() from setup_database.sql.
+ALTER TABLE ecommerce.products ADD COLUMN IF NOT EXISTS content_hash TEXT
+    GENERATED ALWAYS AS (md5(
+        COALESCE(name, '') || E'\x1f' || COALESCE(description, '') || E'\x1f' ||
+        COALESCE(category, '') || E'\x1f' || COALESCE(ecommerce.tags_text(tags), '')
+    )) STORED;
+
+ALTER TABLE ecommerce.products ADD COLUMN IF NOT EXISTS embedded_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_products_embedding_queue
+    ON ecommerce.products (product_id)
+    WHERE embedded_hash IS DISTINCT FROM content_hash;
+
+-- Per-worker resume position and progress
+CREATE TABLE IF NOT EXISTS ecommerce.embedding_backfill_checkpoints (
+    worker VARCHAR(100) PRIMARY KEY,
+    last_product_id INTEGER NOT NULL DEFAULT 0,
+    embedded BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Top-k cosine search in one round trip. p_ef_search is the query-time
+-- candidate list size (hnsw.ef_search): higher = better recall, slower.
+CREATE OR REPLACE FUNCTION ecommerce.semantic_search(
+    p_embedding vector,
+    p_k INTEGER DEFAULT 5,
+    p_ef_search INTEGER DEFAULT 40
+)
+RETURNS TABLE (
+    product_id INTEGER,
+    name VARCHAR,
+    description TEXT,
+    category VARCHAR,
+    price DECIMAL(10, 2),
+    similarity DOUBLE PRECISION
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('hnsw.ef_search', p_ef_search::TEXT, true);
+    RETURN QUERY
+    SELECT p.product_id, p.name, p.description, p.category, p.price,
+           1 - (p.embedding <=> p_embedding) AS similarity
+    FROM ecommerce.products p
+    WHERE p.embedding IS NOT NULL
+    ORDER BY p.embedding <=> p_embedding
+    LIMIT p_k;
+END;
+$$;
+
+-- Hybrid search: full-text top-N and vector top-N as CTEs of one statement,
+-- fused with reciprocal rank fusion, score = sum(1 / (p_rrf_k + rank)).
+-- Needs the search_vector column from setup_database.sql.
+-- Stage timings: each candidate CTE stamps its rows with clock_timestamp()
+-- once its top-N is complete, so text_done_ms / vector_done_ms are the
+-- offsets (from statement start) at which each stage finished and total_ms
+-- is when fusion finished. Stages run one after the other in a backend, so
+-- sorting those offsets gives each stage's duration.
+CREATE OR REPLACE FUNCTION ecommerce.hybrid_search(
+    p_query TEXT,
+    p_embedding vector,
+    p_k INTEGER DEFAULT 5,
+    p_candidates INTEGER DEFAULT 40,
+    p_rrf_k INTEGER DEFAULT 60
+)
+RETURNS TABLE (
+    product_id INTEGER,
+    name VARCHAR,
+    description TEXT,
+    category VARCHAR,
+    price DECIMAL(10, 2),
+    score DOUBLE PRECISION,
+    text_rank BIGINT,
+    vector_rank BIGINT,
+    similarity DOUBLE PRECISION,
+    text_done_ms DOUBLE PRECISION,
+    vector_done_ms DOUBLE PRECISION,
+    total_ms DOUBLE PRECISION
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- An HNSW scan returns at most ef_search rows
+    PERFORM set_config('hnsw.ef_search', GREATEST(p_candidates, 40)::TEXT, true);
+    RETURN QUERY
+    WITH text_hits AS MATERIALIZED (
+        SELECT t.product_id,
+               row_number() OVER (ORDER BY t.rank_score DESC, t.product_id) AS rank,
+               clock_timestamp() AS done_at
+        FROM (
+            SELECT p.product_id, ts_rank_cd(p.search_vector, q.query) AS rank_score
+            FROM ecommerce.products p, websearch_to_tsquery('english', p_query) AS q(query)
+            WHERE p.search_vector @@ q.query
+            ORDER BY rank_score DESC
+            LIMIT p_candidates
+        ) t
+    ),
+    vector_hits AS MATERIALIZED (
+        SELECT v.product_id,
+               row_number() OVER (ORDER BY v.distance, v.product_id) AS rank,
+               v.distance,
+               clock_timestamp() AS done_at
+        FROM (
+            SELECT p.product_id, p.embedding <=> p_embedding AS distance
+            FROM ecommerce.products p
+            WHERE p.embedding IS NOT NULL
+            ORDER BY p.embedding <=> p_embedding
+            LIMIT p_candidates
+        ) v
+    ),
+    fused AS (
+        SELECT COALESCE(t.product_id, v.product_id) AS product_id,
+               COALESCE(1.0 / (p_rrf_k + t.rank), 0) + COALESCE(1.0 / (p_rrf_k + v.rank), 0) AS score,
+               t.rank AS text_rank,
+               v.rank AS vector_rank,
+               1 - v.distance AS similarity
+        FROM text_hits t
+        FULL JOIN vector_hits v ON v.product_id = t.product_id
+    ),
+    stages AS (
+        SELECT (SELECT min(done_at) FROM text_hits) AS text_done,
+               (SELECT min(done_at) FROM vector_hits) AS vector_done
+    )
+    SELECT p.product_id, p.name, p.description, p.category, p.price,
+           f.score::DOUBLE PRECISION, f.text_rank, f.vector_rank, f.similarity,
+           (extract(epoch FROM s.text_done - statement_timestamp()) * 1000)::DOUBLE PRECISION,
+           (extract(epoch FROM s.vector_done - statement_timestamp()) * 1000)::DOUBLE PRECISION,
+           (extract(epoch FROM clock_timestamp() - statement_timestamp()) * 1000)::DOUBLE PRECISION
+    FROM fused f
+    JOIN ecommerce.products p ON p.product_id = f.product_id
+    CROSS JOIN stages s
+    ORDER BY f.score DESC, f.product_id
+    LIMIT p_k;
+END;
+$$;
+
+-- Quantized search (pgvector 0.7+). An expression index keeps only a
+-- halfvec (16-bit) or binary-quantized (1 bit per dimension) copy of each
+-- embedding, while the full-precision vectors stay in the table:
+--   halfvec: USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)
+--   binary:  USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)
+-- (`python vector_search.py setup --index halfvec --index binary` creates
+-- them for the configured dimension). The index returns p_k * p_overfetch
+-- candidates, which are re-ranked exactly against the full vectors.
+CREATE OR REPLACE FUNCTION ecommerce.quantized_search(
+    p_embedding vector,
+    p_k INTEGER DEFAULT 5,
+    p_quantization TEXT DEFAULT 'halfvec',
+    p_overfetch INTEGER DEFAULT 4,
+    p_ef_search INTEGER DEFAULT 40
+)
+RETURNS TABLE (
+    product_id INTEGER,
+    name VARCHAR,
+    description TEXT,
+    category VARCHAR,
+    price DECIMAL(10, 2),
+    similarity DOUBLE PRECISION
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_dims INTEGER := vector_dims(p_embedding);
+    v_candidates INTEGER := p_k * GREATEST(p_overfetch, 1);
+    v_order TEXT;
+BEGIN
+    -- The ORDER BY must match the index expression, dimension included
+    v_order := CASE p_quantization
+        WHEN 'halfvec' THEN format('p.embedding::halfvec(%s) <=> $1::halfvec(%s)', v_dims, v_dims)
+        WHEN 'binary' THEN format('binary_quantize(p.embedding)::bit(%s) <~> binary_quantize($1)', v_dims)
+    END;
+    IF v_order IS NULL THEN
+        RAISE EXCEPTION 'Unknown quantization %, expected halfvec or binary', p_quantization
+            USING ERRCODE = 'invalid_parameter_value';
+    END IF;
+
+    -- An HNSW scan returns at most ef_search rows
+    PERFORM set_config('hnsw.ef_search', GREATEST(p_ef_search, v_candidates)::TEXT, true);
+    RETURN QUERY EXECUTE format($query$
+        SELECT c.product_id, c.name, c.description, c.category, c.price,
+               1 - (c.embedding <=> $1) AS similarity
+        FROM (
+            SELECT p.product_id, p.name, p.description, p.category, p.price, p.embedding
+            FROM ecommerce.products p
+            WHERE p.embedding IS NOT NULL
+            ORDER BY %s
+            LIMIT $2
+        ) c
+        ORDER BY c.embedding <=> $1
+        LIMIT $3
+    $query$, v_order)
+    USING p_embedding, v_candidates, p_k;
+END;
+$$;
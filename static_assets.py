@@ -0,0 +1,146 @@
+"""
+Self-hosted, fingerprinted CSS bundle for the Dash app.
+
+Bootstrap, the icon subset and the app's own styles are concatenated from
+assets/src/ into one assets/dist/bundle.<hash>.css, with gzip and brotli
+variants compressed once at build time. The bundle is served from
+BUNDLE_URL with `Cache-Control: immutable` and a year's max-age: its name
+changes whenever its content does, so browsers never revalidate it and a
+repeat visit transfers no CSS at all. Nothing is loaded from a CDN.
+
+Icons are Font Awesome Free SVGs (assets/src/icons/, CC BY 4.0) drawn as CSS
+masks, so the existing `fas fa-<name>` class names keep working. To add an
+icon, copy its SVG there as <name>.svg and rebuild.
+
+The built files are committed, so deploys need no build step; rebuild after
+editing anything under assets/src/:
+
+    python static_assets.py build
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import urllib.parse
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+SOURCE_DIR = ASSETS_DIR / "src"
+DIST_DIR = ASSETS_DIR / "dist"
+MANIFEST = DIST_DIR / "manifest.json"
+# Concatenated in this order, after the generated icon rules
+STYLESHEETS = ["bootstrap.min.css", "app.css"]
+BUNDLE_URL = "/bundles/"
+# Precompressed variants, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+_ICON_BASE = """\
+/* Icons: Font Awesome Free by @fontawesome - https://fontawesome.com (CC BY 4.0) */
+.fas{display:inline-block;width:1.25em;height:1em;vertical-align:-.125em;background-color:currentColor;\
+-webkit-mask:var(--icon) no-repeat center/contain;mask:var(--icon) no-repeat center/contain}
+.fa-2x{font-size:2em}
+"""
+
+
+def icon_css():
+    """Return CSS rules drawing each assets/src/icons/<name>.svg as `.fa-<name>`."""
+    rules = [_ICON_BASE]
+    for path in sorted((SOURCE_DIR / "icons").glob("*.svg")):
+        svg = re.sub(r"<!--.*?-->", "", path.read_text()).strip()
+        rules.append(f'.fa-{path.stem}{{--icon:url("data:image/svg+xml,{urllib.parse.quote(svg)}")}}\n')
+    return "".join(rules)
+
+
+def build():
+    """Write the fingerprinted bundle and its variants; returns the manifest."""
+    parts = [icon_css()]
+    for name in STYLESHEETS:
+        css = (SOURCE_DIR / name).read_text()
+        # Source maps aren't shipped
+        parts.append(re.sub(r"/\*# sourceMappingURL=.*?\*/", "", css).strip() + "\n")
+    content = "\n".join(parts).encode()
+    filename = f"bundle.{hashlib.sha256(content).hexdigest()[:12]}.css"
+
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in DIST_DIR.glob("bundle.*"):
+        stale.unlink()
+    (DIST_DIR / filename).write_bytes(content)
+    # mtime=0 keeps the .gz byte-for-byte reproducible
+    (DIST_DIR / (filename + ENCODINGS["gzip"])).write_bytes(gzip.compress(content, 9, mtime=0))
+    if brotli:
+        (DIST_DIR / (filename + ENCODINGS["br"])).write_bytes(brotli.compress(content, quality=11))
+
+    manifest = {"bundle.css": filename}
+    MANIFEST.write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def stylesheet_url():
+    """URL of the current bundle, building it first if it has never been built."""
+    manifest = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else build()
+    return BUNDLE_URL + manifest["bundle.css"]
+
+
+def configure(server):
+    """Serve the bundle from BUNDLE_URL on `server`, precompressed and immutable."""
+    from flask import abort, request, send_file
+
+    @server.route(BUNDLE_URL + "<filename>")
+    def serve_bundle(filename):
+        if not re.fullmatch(r"bundle\.[0-9a-f]{12}\.css", filename):
+            abort(404)
+        path, encoding = DIST_DIR / filename, None
+        for name, suffix in ENCODINGS.items():
+            # Quality, so "br;q=0" refuses brotli
+            if request.accept_encodings[name] > 0 and path.with_name(filename + suffix).exists():
+                path, encoding = path.with_name(filename + suffix), name
+                break
+        if not path.exists():
+            abort(404)
+        response = send_file(path, mimetype="text/css", conditional=True, max_age=365 * 24 * 3600)
+        if encoding:
+            # Already compressed: flask-compress leaves encoded responses alone
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    @server.after_request
+    def immutable_dash_resources(response):
+        # Dash fingerprints its own JS (cached for a year already) and
+        # versions the favicon URL; `immutable` also spares the revalidation
+        # request on reload
+        fingerprinted = (
+            request.path.startswith("/_dash-component-suites/") and response.cache_control.max_age
+            or request.path == "/_favicon.ico" and "v" in request.args
+        )
+        if fingerprinted and response.status_code == 200:
+            response.cache_control.public = True
+            response.cache_control.max_age = 365 * 24 * 3600
+            response.cache_control.immutable = True
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build"])
+    parser.parse_args()
+
+    manifest = build()
+    for path in sorted(DIST_DIR.glob("bundle.*")):
+        print(f"{path.relative_to(ASSETS_DIR.parent)}  {path.stat().st_size:>9,} bytes")
+    print(f"✅ {BUNDLE_URL}{manifest['bundle.css']}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
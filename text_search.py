@@ -0,0 +1,112 @@
+"""
+Trigram product search shared by the Dash and Streamlit apps.
+
+"Traditional" search and type-ahead both rank products by pg_trgm word
+similarity, served from the GIN trigram indexes on products.name and
+products.description (see setup_database.sql), so neither scans the table
+the way ILIKE '%term%' would. Type-ahead results for recent prefixes are
+kept in a small in-process LRU, since a handful of popular prefixes make up
+most keystrokes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+# Shorter prefixes match too much of the catalog to be useful
+MIN_PREFIX_LENGTH = 3
+TYPEAHEAD_LIMIT = 8
+
+# `%s <% col` is true when word_similarity(%s, col) passes
+# pg_trgm.word_similarity_threshold and can use a gin_trgm_ops index
+TYPEAHEAD_QUERY = """
+    SELECT product_id, name, category, word_similarity(%(q)s, name) AS score
+    FROM ecommerce.products
+    WHERE %(q)s <%% name
+    ORDER BY score DESC, name
+    LIMIT %(k)s
+"""
+
+TRADITIONAL_SEARCH_QUERY = """
+    SELECT product_id, name, description, category, price,
+           GREATEST(word_similarity(%(q)s, name),
+                    word_similarity(%(q)s, description) * 0.8) AS score
+    FROM ecommerce.products
+    WHERE %(q)s <%% name OR %(q)s <%% description
+    ORDER BY score DESC, product_id
+    LIMIT %(k)s
+"""
+
+
+class PrefixCache:
+    """Thread-safe LRU of type-ahead results with a time-to-live."""
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                metrics.cache_lookup("typeahead", misses=1)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.cache_lookup("typeahead", hits=1)
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+prefix_cache = PrefixCache()
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def typeahead(db, prefix, k=TYPEAHEAD_LIMIT):
+    """Return (suggestions, cached) for a partially typed query.
+
+    `db` is a LakebaseConnection class or factory; a connection is only
+    opened on a cache miss.
+    """
+    prefix = normalize(prefix)
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return [], False
+    key = (prefix, k)
+    suggestions = prefix_cache.get(key)
+    if suggestions is not None:
+        return suggestions, True
+    with db() as conn:
+        rows = conn.execute_query(TYPEAHEAD_QUERY, {"q": prefix, "k": k})
+    suggestions = [
+        {"product_id": row['product_id'], "name": row['name'],
+         "category": row['category'], "score": float(row['score'])}
+        for row in rows
+    ]
+    prefix_cache.put(key, suggestions)
+    return suggestions, False
+
+
+def traditional_search(db, query_text, k=5):
+    """Trigram-ranked search over names and descriptions. Returns (rows, latency_ms).
+
+    `db` is an open LakebaseConnection from either app.
+    """
+    start = time.perf_counter()
+    rows = db.execute_query(TRADITIONAL_SEARCH_QUERY, {"q": normalize(query_text), "k": k})
+    return rows, (time.perf_counter() - start) * 1000
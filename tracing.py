@@ -0,0 +1,378 @@
+"""
+Lightweight request tracing for the Dash and Streamlit apps.
+
+Spans nest through a contextvar, so code only opens them and never passes
+them around:
+
+    with tracing.span("plotly.figure", rows=len(rows)):
+        fig = px.bar(...)
+
+instrument_dash() makes every Dash callback request a trace: a server span
+for the HTTP request, a child span for the callback function, and a
+"serialize" span for plotly's JSON encoding. Inside the callback,
+LakebaseConnection adds "db.pool.checkout" and "db.query" spans, figure
+building adds "plotly.*" spans and DataFrame work "pandas.*". Finished traces are
+kept in a ring buffer shown at /debug/traces (slowest first, with time per
+category: db, pandas, plotly, serialize, callback and framework), and
+optionally exported as OTLP/JSON, one ExportTraceServiceRequest per line.
+The OpenTelemetry Collector's otlpjsonfile receiver and most trace viewers
+read that format.
+
+Configuration (environment variables):
+    TRACING            "false" disables tracing (spans become no-ops)
+    TRACE_EXPORTER     "", "console" (stdout) or "file"
+    TRACE_FILE         OTLP/JSON lines file for the file exporter
+    TRACE_BUFFER_SIZE  finished traces kept for /debug/traces
+    OTEL_SERVICE_NAME  service.name resource attribute
+    DEBUG_TOKEN        if set, /debug/* pages require ?token= or a Bearer header
+"""
+
+import contextlib
+import contextvars
+import functools
+import hmac
+import html
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+
+TRACING = os.getenv('TRACING', 'true').lower() != 'false'
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', '')
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '500'))
+SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'lakebase-training')
+DEBUG_TOKEN = os.getenv('DEBUG_TOKEN')
+
+# Breakdown categories by span name prefix; anything else counts as "callback"
+CATEGORIES = [("db.", "db"), ("pandas.", "pandas"), ("plotly.", "plotly"), ("serialize", "serialize")]
+BREAKDOWN = ["db", "pandas", "plotly", "serialize", "callback", "framework"]
+# OTLP SpanKind values
+KINDS = {"internal": 1, "server": 2, "client": 3}
+MAX_ATTRIBUTE_LENGTH = 1000
+
+_current = contextvars.ContextVar("tracing_span", default=None)
+_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+_export_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent", "root", "attributes",
+                 "start_ns", "start_perf", "duration_ns", "error", "spans", "_token")
+
+    def __init__(self, name, kind="internal", parent=None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.start_perf = time.perf_counter_ns()
+        self.duration_ns = None
+        self.error = None
+        # Finished spans of the whole trace, collected on the root
+        self.spans = [] if parent is None else None
+        self._token = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self):
+        return (self.duration_ns or 0) / 1e6
+
+    @property
+    def category(self):
+        if self.kind == "server":
+            return "framework"
+        return next((category for prefix, category in CATEGORIES if self.name.startswith(prefix)), "callback")
+
+    def end(self, error=None):
+        self.duration_ns = time.perf_counter_ns() - self.start_perf
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.root.spans.append(self)
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # Ended in a different context than it started in
+                _current.set(self.parent)
+        if self.root is self:
+            _finish(self)
+
+
+class _NoopSpan:
+    def set(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def current_span():
+    return _current.get()
+
+
+def start_span(name, kind="internal", **attributes):
+    """Start a span as a child of the current one and make it current; end it with span.end()."""
+    if not TRACING:
+        return _NOOP
+    span = Span(name, kind, _current.get(), **attributes)
+    span._token = _current.set(span)
+    return span
+
+
+@contextlib.contextmanager
+def span(name, kind="internal", **attributes):
+    current = start_span(name, kind, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    current.end()
+
+
+def traced(name=None, kind="internal"):
+    """Decorator: run the function inside a span named `name` (default: its qualified name)."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ========================================
+# Finished traces and export
+# ========================================
+def _finish(root):
+    _traces.append(root)
+    if TRACE_EXPORTER:
+        line = json.dumps(to_otlp(root), separators=(",", ":"))
+        with _export_lock:
+            if TRACE_EXPORTER == "console":
+                print(line, file=sys.stdout, flush=True)
+            elif TRACE_EXPORTER == "file":
+                with open(TRACE_FILE, "a") as f:
+                    f.write(line + "\n")
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)[:MAX_ATTRIBUTE_LENGTH]}
+
+
+def to_otlp(root):
+    """Return the trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in root.spans:
+        spans.append({
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent.span_id if s.parent else "",
+            "name": s.name,
+            "kind": KINDS[s.kind],
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.start_ns + (s.duration_ns or 0)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+    }]}
+
+
+def breakdown(root):
+    """Milliseconds of self time per category; the values add up to the trace duration."""
+    child_ns = {}
+    for s in root.spans:
+        if s.parent is not None:
+            child_ns[s.parent.span_id] = child_ns.get(s.parent.span_id, 0) + (s.duration_ns or 0)
+    totals = dict.fromkeys(BREAKDOWN, 0.0)
+    for s in root.spans:
+        totals[s.category] += max(0, (s.duration_ns or 0) - child_ns.get(s.span_id, 0)) / 1e6
+    return totals
+
+
+def recent_traces():
+    return list(_traces)
+
+
+def slowest(limit=50, name=None):
+    traces = [t for t in list(_traces) if name is None or t.name == name]
+    return sorted(traces, key=lambda t: -(t.duration_ns or 0))[:limit]
+
+
+def summary(root):
+    """Plain-dict view of a finished trace for pages and JSON endpoints."""
+    return {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "started": time.strftime("%H:%M:%S", time.localtime(root.start_ns / 1e9)),
+        "duration_ms": root.duration_ms,
+        "error": root.error,
+        "breakdown_ms": breakdown(root),
+        "spans": [
+            {"name": s.name, "depth": _depth(s), "offset_ms": (s.start_perf - root.start_perf) / 1e6,
+             "duration_ms": s.duration_ms, "attributes": s.attributes, "error": s.error}
+            for s in sorted(root.spans, key=lambda s: s.start_perf)
+        ],
+    }
+
+
+def _depth(s):
+    depth = 0
+    while s.parent is not None:
+        s, depth = s.parent, depth + 1
+    return depth
+
+
+# ========================================
+# Dash / Flask instrumentation
+# ========================================
+def debug_allowed(request, token_required=False):
+    """True if the request carries DEBUG_TOKEN, or DEBUG_TOKEN is unset and not `token_required`."""
+    if not DEBUG_TOKEN:
+        return not token_required
+    supplied = request.args.get("token") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return hmac.compare_digest(supplied.encode(), DEBUG_TOKEN.encode())
+
+
+def instrument_dash(app):
+    """Trace every callback registered on `app` from now on and serve /debug/traces.
+
+    Call right after creating the Dash app, before any @app.callback.
+    """
+    if not TRACING:
+        return
+    from flask import abort, g, jsonify, request
+    import plotly.io.json as pio_json
+
+    server = app.server
+
+    def traced_request():
+        return request.path.endswith("/_dash-update-component") or request.path.startswith("/api/")
+
+    @server.before_request
+    def start_request_span():
+        if traced_request():
+            g.trace_span = start_span(f"{request.method} {request.path}", kind="server",
+                                      **{"http.method": request.method, "http.route": request.path})
+
+    @server.after_request
+    def record_response(response):
+        trace_span = g.get("trace_span")
+        if trace_span is not None:
+            trace_span.set("http.status_code", response.status_code)
+            if not response.is_streamed:
+                trace_span.set("http.response_content_length", response.calculate_content_length() or 0)
+        return response
+
+    @server.teardown_request
+    def end_request_span(error=None):
+        trace_span = g.pop("trace_span", None)
+        if trace_span is not None:
+            trace_span.end(error=error)
+
+    register = app.callback
+
+    @functools.wraps(register)
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+
+        def wrap(func):
+            @functools.wraps(func)
+            def traced_callback(*func_args, **func_kwargs):
+                root = _current.get()
+                if root is not None and root.kind == "server":
+                    root.name = f"callback {func.__name__}"
+                with span(f"callback.{func.__name__}"):
+                    return func(*func_args, **func_kwargs)
+            return decorator(traced_callback)
+        return wrap
+
+    app.callback = callback
+
+    # Dash encodes every callback response with plotly's to_json_plotly,
+    # looked up at call time
+    to_json_plotly = pio_json.to_json_plotly
+
+    @functools.wraps(to_json_plotly)
+    def traced_to_json(*args, **kwargs):
+        if _current.get() is None:
+            return to_json_plotly(*args, **kwargs)
+        with span("serialize") as s:
+            result = to_json_plotly(*args, **kwargs)
+            s.set("bytes", len(result))
+            return result
+
+    pio_json.to_json_plotly = traced_to_json
+
+    @server.route("/debug/traces")
+    def traces_page():
+        if not debug_allowed(request):
+            abort(403)
+        limit = request.args.get("limit", 50, type=int)
+        traces = [summary(t) for t in slowest(limit, request.args.get("name"))]
+        if request.args.get("format") == "json":
+            return jsonify(traces)
+        return render_html(traces)
+
+
+def render_html(traces):
+    """Slowest traces as a self-contained HTML page with a stacked breakdown bar each."""
+    colors = {"db": "#4c78a8", "pandas": "#f58518", "plotly": "#54a24b", "serialize": "#e45756",
+              "callback": "#b279a2", "framework": "#bab0ac"}
+    legend = " ".join(f'<span style="color:{c}">■</span> {k}' for k, c in colors.items())
+    rows = []
+    for t in traces:
+        total = max(t["duration_ms"], 1e-6)
+        bar = "".join(
+            f'<div title="{k} {ms:.1f} ms" style="width:{100 * ms / total:.2f}%;background:{colors[k]}"></div>'
+            for k, ms in t["breakdown_ms"].items() if ms > 0
+        )
+        spans = "".join(
+            f'<tr><td style="padding-left:{12 * s["depth"]}px">{html.escape(s["name"])}</td>'
+            f'<td>{s["offset_ms"]:.1f}</td><td>{s["duration_ms"]:.1f}</td>'
+            f'<td><code>{html.escape(json.dumps(s["attributes"], default=str))[:300]}</code>'
+            f'{" ⚠️ " + html.escape(s["error"]) if s["error"] else ""}</td></tr>'
+            for s in t["spans"]
+        )
+        cells = "".join(f"<td>{t['breakdown_ms'][k]:.1f}</td>" for k in BREAKDOWN)
+        rows.append(
+            f'<tr><td>{t["started"]}</td><td><details><summary>{html.escape(t["name"])}'
+            f'{" ⚠️" if t["error"] else ""}</summary><table class="spans"><tr><th>span</th>'
+            f'<th>start ms</th><th>ms</th><th>attributes</th></tr>{spans}</table></details></td>'
+            f'<td><b>{t["duration_ms"]:.1f}</b></td>{cells}<td><div class="bar">{bar}</div></td></tr>'
+        )
+    header = "".join(f"<th>{k} ms</th>" for k in BREAKDOWN)
+    return f"""<!DOCTYPE html>
+<html><head><title>Slowest traces</title><style>
+body{{font-family:Arial,sans-serif;margin:24px}} table{{border-collapse:collapse;font-size:13px}}
+td,th{{padding:4px 8px;border-bottom:1px solid #eee;text-align:left;vertical-align:top}}
+.bar{{display:flex;width:240px;height:14px;background:#f4f4f4}} .spans td{{border:none}}
+</style></head><body>
+<h2>Slowest recent traces</h2>
+<p>{len(traces)} of the last {len(_traces)} traces, self time per category: {legend}.
+<a href="?format=json">JSON</a></p>
+<table><tr><th>time</th><th>trace</th><th>total ms</th>{header}<th>breakdown</th></tr>
+{"".join(rows)}</table></body></html>"""
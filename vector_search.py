@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+pgvector Semantic Search
+========================
+Shared by the Dash and Streamlit Vector Search tabs.
+
+Products carry an `embedding vector(N)` column with an HNSW index (see
+setup_vector_search.sql). search() runs the approximate top-k through
+ecommerce.semantic_search() in one round trip at the requested
+hnsw.ef_search; exact_search() ranks the same rows with a sequential scan,
+which is the ground truth used to report recall. hybrid_search() fuses the
+full-text and vector rankings in one statement (ecommerce.hybrid_search()).
+
+Connection settings for the CLI come from --dsn or the standard libpq
+environment variables (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT, PGSSLMODE).
+
+Usage:
+    python vector_search.py setup --dim 384 --m 16 --ef-construction 64
+    python vector_search.py setup --index halfvec --index binary
+    python embedding_backfill.py             # embed products (see that file)
+    python vector_search.py eval --k 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from embeddings import EMBEDDING_DIM, embed_text
+
+# "pgvector" searches in Lakebase; "ann" uses the in-process index (ann_index.py)
+VECTOR_SEARCH_BACKEND = os.getenv('VECTOR_SEARCH_BACKEND', 'pgvector')
+# "none" searches the full-precision HNSW index; "halfvec" or "binary" search
+# a quantized index and re-rank VECTOR_OVERFETCH x k candidates exactly
+VECTOR_QUANTIZATION = os.getenv('VECTOR_QUANTIZATION', 'none')
+VECTOR_OVERFETCH = int(os.getenv('VECTOR_OVERFETCH', '4'))
+DEFAULT_EF_SEARCH = 40
+# Candidates taken from each of the full-text and vector rankings before fusion
+DEFAULT_HYBRID_CANDIDATES = 40
+EF_SEARCH_SWEEP = [10, 20, 40, 80, 160, 320]
+
+SETUP_SQL = Path(__file__).parent / "setup_vector_search.sql"
+
+# HNSW index per quantization level: (name, indexed expression, operator class)
+INDEXES = {
+    "none": ("idx_products_embedding_hnsw", "embedding", "vector_cosine_ops"),
+    "halfvec": ("idx_products_embedding_halfvec", "(embedding::halfvec({dim}))", "halfvec_cosine_ops"),
+    "binary": ("idx_products_embedding_binary", "(binary_quantize(embedding)::bit({dim}))", "bit_hamming_ops"),
+}
+
+SEMANTIC_SEARCH_QUERY = """
+    SELECT product_id, name, description, category, price, similarity
+    FROM ecommerce.semantic_search(%s::vector, %s, %s)
+"""
+
+QUANTIZED_SEARCH_QUERY = """
+    SELECT product_id, name, description, category, price, similarity
+    FROM ecommerce.quantized_search(%s::vector, %s, %s, %s, %s)
+"""
+
+PRODUCTS_BY_ID_QUERY = """
+    SELECT product_id, name, description, category, price
+    FROM ecommerce.products
+    WHERE product_id = ANY(%s)
+"""
+
+HYBRID_SEARCH_QUERY = """
+    SELECT product_id, name, description, category, price, score,
+           text_rank, vector_rank, similarity, text_done_ms, vector_done_ms, total_ms
+    FROM ecommerce.hybrid_search(%s, %s::vector, %s, %s)
+"""
+
+# Adding 0 to the distance stops the planner from using the HNSW index,
+# so this is an exact ranking of every embedded product
+EXACT_SEARCH_QUERY = """
+    SELECT product_id, name, description, category, price,
+           1 - (embedding <=> %s::vector) AS similarity
+    FROM ecommerce.products
+    WHERE embedding IS NOT NULL
+    ORDER BY (embedding <=> %s::vector) + 0
+    LIMIT %s
+"""
+
+
+# ========================================
+# Embeddings
+# ========================================
+def product_text(name, description=None, category=None, tags=None):
+    """Text that represents a product in the embedding space."""
+    return " ".join(filter(None, [name, description, category, " ".join(tags or [])]))
+
+
+def to_vector_literal(vector):
+    """Format a vector as pgvector text input, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(f"{x:.6g}" for x in vector.tolist()) + "]"
+
+
+# ========================================
+# Search
+# ========================================
+def _timed(db, query, params):
+    start = time.perf_counter()
+    rows = db.execute_query(query, params)
+    return rows, (time.perf_counter() - start) * 1000
+
+
+_ann_index = None
+
+
+def get_ann_index():
+    """Return the process-wide in-process index (opened on first use)."""
+    global _ann_index
+    if _ann_index is None:
+        from ann_index import AnnIndex
+        _ann_index = AnnIndex()
+    return _ann_index
+
+
+def search(db, query_text, k=5, ef_search=DEFAULT_EF_SEARCH):
+    """Approximate top-k through the HNSW index. Returns (rows, latency_ms).
+
+    `db` is an open LakebaseConnection from either app. With
+    VECTOR_SEARCH_BACKEND=ann the top-k comes from the in-process index and
+    Lakebase only serves the matching rows by primary key; ef_search does
+    not apply there.
+    """
+    if VECTOR_SEARCH_BACKEND == 'ann':
+        return _search_ann(db, query_text, k)
+    literal = to_vector_literal(embed_text(query_text))
+    return _search_literal(db, literal, k, ef_search)
+
+
+def _search_literal(db, literal, k, ef_search, quantization=None, overfetch=None):
+    quantization = quantization or VECTOR_QUANTIZATION
+    if quantization == 'none':
+        return _timed(db, SEMANTIC_SEARCH_QUERY, (literal, k, ef_search))
+    return _timed(db, QUANTIZED_SEARCH_QUERY,
+                  (literal, k, quantization, overfetch or VECTOR_OVERFETCH, ef_search))
+
+
+def quantized_search(db, query_text, k=5, quantization="halfvec", overfetch=VECTOR_OVERFETCH,
+                     ef_search=DEFAULT_EF_SEARCH):
+    """Search a quantized index, re-ranking k * overfetch candidates exactly.
+
+    Returns (rows, latency_ms); quantization "none" searches the
+    full-precision index instead.
+    """
+    literal = to_vector_literal(embed_text(query_text))
+    return _search_literal(db, literal, k, ef_search, quantization, overfetch)
+
+
+def _search_ann(db, query_text, k):
+    start = time.perf_counter()
+    ids, scores = get_ann_index().search(embed_text(query_text), k)
+    similarity = dict(zip(ids.tolist(), scores.tolist()))
+    rows = db.execute_query(PRODUCTS_BY_ID_QUERY, (list(similarity),)) if similarity else []
+    # Products deleted since the last index refresh drop out here
+    rows = sorted(({**row, 'similarity': similarity[row['product_id']]} for row in rows),
+                  key=lambda row: -row['similarity'])
+    return rows, (time.perf_counter() - start) * 1000
+
+
+def exact_search(db, query_text, k=5):
+    """Exact top-k by sequential scan. Returns (rows, latency_ms)."""
+    literal = to_vector_literal(embed_text(query_text))
+    return _timed(db, EXACT_SEARCH_QUERY, (literal, literal, k))
+
+
+def hybrid_search(db, query_text, k=5, candidates=DEFAULT_HYBRID_CANDIDATES):
+    """Full-text + vector search fused with reciprocal rank fusion.
+
+    Returns (rows, timings) where timings holds embed_ms, full_text_ms,
+    vector_ms, fusion_ms and round_trip_ms. The first database stage to
+    finish also includes planning time.
+    """
+    if VECTOR_SEARCH_BACKEND == 'ann':
+        raise ValueError("Hybrid search runs in Lakebase and needs pgvector (VECTOR_SEARCH_BACKEND=pgvector)")
+    start = time.perf_counter()
+    literal = to_vector_literal(embed_text(query_text))
+    embed_ms = (time.perf_counter() - start) * 1000
+    rows, round_trip_ms = _timed(db, HYBRID_SEARCH_QUERY, (query_text, literal, k, max(candidates, k)))
+
+    timings = {"embed_ms": embed_ms}
+    if rows:
+        # Stages run one after another, so each lasted from the previous
+        # stage's finish to its own; a stage with no hits has no timestamp
+        finished = sorted(
+            (offset, stage)
+            for stage, offset in (("full_text_ms", rows[0]['text_done_ms']),
+                                  ("vector_ms", rows[0]['vector_done_ms']))
+            if offset is not None
+        )
+        previous = 0.0
+        for offset, stage in finished:
+            timings[stage] = offset - previous
+            previous = offset
+        timings["fusion_ms"] = rows[0]['total_ms'] - previous
+    timings["round_trip_ms"] = round_trip_ms
+    return rows, timings
+
+
+def recall(approximate, exact):
+    """Fraction of the exact top-k that the approximate search returned."""
+    if not exact:
+        return 1.0
+    found = {row['product_id'] for row in approximate}
+    return sum(row['product_id'] in found for row in exact) / len(exact)
+
+
+def recall_tradeoff(db, query_text, k=5, ef_values=EF_SEARCH_SWEEP, repeats=3):
+    """Measure recall@k and median latency of search() for each ef_search.
+
+    Returns (points, exact_latency_ms) where points is a list of
+    {"ef_search", "recall", "latency_ms"} dicts.
+    """
+    if VECTOR_SEARCH_BACKEND == 'ann':
+        raise ValueError("The ef_search sweep measures pgvector; use `python ann_index.py eval` "
+                         "for the in-process index")
+    literal = to_vector_literal(embed_text(query_text))
+    exact, exact_ms = _timed(db, EXACT_SEARCH_QUERY, (literal, literal, k))
+    points = []
+    for ef_search in ef_values:
+        timings = []
+        for _ in range(repeats):
+            rows, elapsed = _search_literal(db, literal, k, ef_search)
+            timings.append(elapsed)
+        points.append({
+            "ef_search": ef_search,
+            "recall": recall(rows, exact),
+            "latency_ms": statistics.median(timings),
+        })
+    return points, exact_ms
+
+
+# ========================================
+# CLI
+# ========================================
+class _Database:
+    """execute_query() adapter so the CLI reuses the helpers above."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute_query(self, query, params=None):
+        return self.conn.execute(query, params).fetchall()
+
+
+def create_index(conn, quantization, dim, m=16, ef_construction=64):
+    """(Re)build the HNSW index for one quantization level. Returns seconds taken."""
+    from psycopg import sql
+
+    name, expression, opclass = INDEXES[quantization]
+    started = time.perf_counter()
+    conn.execute(sql.SQL("DROP INDEX IF EXISTS ecommerce.{name}").format(name=sql.Identifier(name)))
+    conn.execute(sql.SQL("""
+        CREATE INDEX {name}
+        ON ecommerce.products USING hnsw ({expression} {opclass})
+        WITH (m = {m}, ef_construction = {ef_construction})
+    """).format(
+        name=sql.Identifier(name),
+        expression=sql.SQL(expression.format(dim=int(dim))),
+        opclass=sql.SQL(opclass),
+        m=sql.Literal(m),
+        ef_construction=sql.Literal(ef_construction),
+    ))
+    return time.perf_counter() - started
+
+
+def setup(conn, dim, m, ef_construction, indexes=("none",)):
+    """Apply setup_vector_search.sql, then resize the column and rebuild the indexes."""
+    from psycopg import sql
+
+    conn.execute(SETUP_SQL.read_text())
+    current = conn.execute("""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'ecommerce.products'::regclass AND attname = 'embedding'
+    """).fetchone()[0]
+    if current != f"vector({dim})":
+        # Quantized index expressions carry the old dimension
+        for name, _, _ in INDEXES.values():
+            conn.execute(sql.SQL("DROP INDEX IF EXISTS ecommerce.{name}").format(name=sql.Identifier(name)))
+        conn.execute(sql.SQL(
+            "ALTER TABLE ecommerce.products ALTER COLUMN embedding TYPE vector({dim}) USING NULL"
+        ).format(dim=sql.Literal(dim)))
+        conn.execute("UPDATE ecommerce.products SET embedded_hash = NULL")
+        print(f"⚠️  Embedding column changed from {current} to vector({dim}); existing embeddings cleared")
+
+    for quantization in indexes:
+        elapsed = create_index(conn, quantization, dim, m, ef_construction)
+        print(f"✅ HNSW index {INDEXES[quantization][0]} built (m={m}, ef_construction={ef_construction}) "
+              f"in {elapsed:.1f}s")
+
+
+def evaluate(conn, queries, k, repeats):
+    """Print mean recall@k and latency per ef_search over sample queries."""
+    if not queries:
+        queries = [row['name'] for row in conn.execute(
+            "SELECT name FROM ecommerce.products WHERE embedding IS NOT NULL ORDER BY random() LIMIT 20"
+        ).fetchall()]
+    if not queries:
+        print("❌ No embedded products; run `python embedding_backfill.py` first")
+        return False
+
+    db = _Database(conn)
+    by_ef = {ef: {"recall": [], "latency_ms": []} for ef in EF_SEARCH_SWEEP}
+    exact_latencies = []
+    for query_text in queries:
+        points, exact_ms = recall_tradeoff(db, query_text, k, repeats=repeats)
+        exact_latencies.append(exact_ms)
+        for point in points:
+            by_ef[point["ef_search"]]["recall"].append(point["recall"])
+            by_ef[point["ef_search"]]["latency_ms"].append(point["latency_ms"])
+
+    print(f"\nRecall@{k} over {len(queries)} queries "
+          f"(exact scan p50 {statistics.median(exact_latencies):.2f}ms)")
+    print(f"{'ef_search':>10} {'recall':>8} {'p50 ms':>8}")
+    for ef_search, values in by_ef.items():
+        print(f"{ef_search:>10} {statistics.mean(values['recall']):>8.1%} "
+              f"{statistics.median(values['latency_ms']):>8.2f}")
+    return True
+
+
+def main():
+    import psycopg
+    from psycopg.rows import dict_row
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default="", help="libpq connection string (default: PG* environment)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    setup_cmd = commands.add_parser("setup", help="Create the embedding column and HNSW index")
+    setup_cmd.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    setup_cmd.add_argument("--m", type=int, default=16)
+    setup_cmd.add_argument("--ef-construction", type=int, default=64)
+    setup_cmd.add_argument("--index", action="append", choices=list(INDEXES),
+                           help="Index to build, repeatable (default: none = full precision)")
+
+    eval_cmd = commands.add_parser("eval", help="Report recall/latency for each ef_search")
+    eval_cmd.add_argument("--query", action="append", default=[], help="Query text (repeatable)")
+    eval_cmd.add_argument("--k", type=int, default=10)
+    eval_cmd.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True, row_factory=dict_row) as conn:
+        if args.command == "setup":
+            setup(conn, args.dim, args.m, args.ef_construction, args.index or ["none"])
+        elif args.command == "eval":
+            return evaluate(conn, args.query, args.k, args.repeats)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)